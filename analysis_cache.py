@@ -0,0 +1,353 @@
+"""
+Cache persistente das análises retornadas pela API OpenAI
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """Cache em SQLite das análises, com expiração (TTL) e limite de tamanho (LRU)"""
+
+    def __init__(self, db_path: str = None, max_size_mb: int = None, ttl_hours: float = None):
+        self.db_path = db_path or Config.ANALYSIS_CACHE_FILE
+        max_size_mb = Config.ANALYSIS_CACHE_MAX_MB if max_size_mb is None else max_size_mb
+        ttl_hours = Config.ANALYSIS_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+        # Consultas ao cache de notas por atributo (todas, parte ou nenhuma das notas encontradas)
+        self.score_hits = 0
+        self.score_partial_hits = 0
+        self.score_misses = 0
+        self._conn = None
+        self._total_size = 0
+
+    @staticmethod
+    def make_key(cv_text: str, job_profile: Dict[str, List[str]], model: str, temperature: float,
+                 max_tokens: int, prompt_version: str) -> str:
+        """
+        Monta a chave de uma análise
+
+        O perfil da vaga é normalizado (espaços e ordem dos atributos) para que
+        mudanças cosméticas no arquivo de perfil não invalidem o cache.
+
+        Args:
+            cv_text: Texto do currículo exatamente como enviado no prompt
+            job_profile: Perfil da vaga
+            model: Modelo usado
+            temperature: Temperatura da requisição
+            max_tokens: Máximo de tokens da resposta
+            prompt_version: Versão do template do prompt
+
+        Returns:
+            Chave hexadecimal
+        """
+        cv_hash = hashlib.sha256(cv_text.encode('utf-8')).hexdigest()
+        profile = {
+            category: sorted(" ".join(attr.split()) for attr in job_profile.get(category, []))
+            for category in ('requeridos', 'desejaveis')
+        }
+        profile_hash = hashlib.sha256(json.dumps(profile, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+        parts = [cv_hash, profile_hash, model, repr(float(temperature)), str(max_tokens), prompt_version]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_candidate_key(cv_text: str, model: str, temperature: float, prompt_version: str, max_length: int,
+                           compressed: bool = False) -> str:
+        """
+        Monta a chave de um currículo no cache de notas por atributo
+
+        Não depende do perfil da vaga: as notas de cada atributo são guardadas
+        separadamente e reaproveitadas quando o perfil muda. Por isso o texto é
+        o extraído do documento, e não o enviado no prompt, que a compressão
+        monta a partir dos atributos do perfil.
+
+        Args:
+            cv_text: Texto extraído do documento
+            model: Modelo usado
+            temperature: Temperatura da requisição
+            prompt_version: Versão do template do prompt
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            compressed: O modelo recebeu trechos selecionados, e não o texto inteiro
+
+        Returns:
+            Chave hexadecimal
+        """
+        cv_hash = hashlib.sha256(cv_text.encode('utf-8')).hexdigest()
+        parts = [cv_hash, model, repr(float(temperature)), prompt_version, str(max_length), repr(compressed)]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _normalize_attribute(attribute: str) -> str:
+        """Texto do atributo sem diferenças de espaçamento"""
+        return " ".join(attribute.split())
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão com o banco sob demanda"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analises (
+                    chave TEXT PRIMARY KEY,
+                    analise TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analises_acesso ON analises (ultimo_acesso)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analises_criacao ON analises (criado_em)")
+            # Nota de cada atributo por currículo, com o resumo da análise que a produziu
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(notas_atributos)")}
+            if columns and 'tamanho' not in columns:
+                # Tabela de uma versão sem controle de tamanho: as notas são descartadas
+                self._conn.execute("DROP TABLE notas_atributos")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS notas_atributos (
+                    curriculo TEXT NOT NULL,
+                    atributo TEXT NOT NULL,
+                    nota INTEGER NOT NULL,
+                    resumo TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL NOT NULL,
+                    ultimo_acesso REAL NOT NULL,
+                    PRIMARY KEY (curriculo, atributo)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_notas_acesso ON notas_atributos (ultimo_acesso)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_notas_criacao ON notas_atributos (criado_em)")
+            self._conn.commit()
+
+            self._total_size = self._stored_size(self._conn)
+
+        return self._conn
+
+    @staticmethod
+    def _stored_size(conn: sqlite3.Connection) -> int:
+        """Tamanho somado das análises e das notas por atributo"""
+        return conn.execute(
+            "SELECT (SELECT COALESCE(SUM(tamanho), 0) FROM analises) + (SELECT COALESCE(SUM(tamanho), 0) FROM notas_atributos)"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca uma análise no cache
+
+        Args:
+            key: Chave gerada por make_key
+
+        Returns:
+            Análise ou None se não houver entrada válida
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT analise, tamanho, criado_em FROM analises WHERE chave = ?", (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            if self.ttl_seconds and now - row[2] > self.ttl_seconds:
+                conn.execute("DELETE FROM analises WHERE chave = ?", (key,))
+                conn.commit()
+                self._total_size -= row[1]
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE analises SET ultimo_acesso = ? WHERE chave = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"Erro ao consultar cache de análises: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, analysis: Dict[str, Any]):
+        """
+        Armazena uma análise no cache, aplicando expiração e limite de tamanho
+
+        Args:
+            key: Chave gerada por make_key
+            analysis: Análise retornada pelo modelo
+        """
+        try:
+            conn = self._connect()
+            analysis_json = json.dumps(analysis, ensure_ascii=False)
+            size = len(analysis_json.encode('utf-8'))
+            now = time.time()
+
+            previous = conn.execute("SELECT tamanho FROM analises WHERE chave = ?", (key,)).fetchone()
+            if previous:
+                self._total_size -= previous[0]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO analises (chave, analise, tamanho, criado_em, ultimo_acesso) VALUES (?, ?, ?, ?, ?)",
+                (key, analysis_json, size, now, now)
+            )
+            self._total_size += size
+
+            self._evict(conn, now)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar no cache de análises: {e}")
+
+    def get_scores(self, candidate_key: str, attributes: List[str]) -> Dict[str, Tuple[int, str]]:
+        """
+        Busca as notas já conhecidas de um currículo
+
+        Cada consulta conta como hit (todos os atributos encontrados), hit
+        parcial (parte deles) ou miss (nenhum).
+
+        Args:
+            candidate_key: Chave gerada por make_candidate_key
+            attributes: Atributos do perfil atual
+
+        Returns:
+            Atributo -> (nota, resumo da análise que a produziu), apenas para os atributos encontrados
+        """
+        try:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT atributo, nota, resumo, criado_em FROM notas_atributos WHERE curriculo = ?", (candidate_key,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao consultar notas por atributo: {e}")
+            self.score_misses += 1
+            return {}
+
+        now = time.time()
+        stored = {
+            attribute: (score, summary) for attribute, score, summary, created in rows
+            if not self.ttl_seconds or now - created <= self.ttl_seconds
+        }
+        scores = {}
+        used = []
+        for attribute in attributes:
+            normalized = self._normalize_attribute(attribute)
+            entry = stored.get(normalized)
+            if entry is not None:
+                scores[attribute] = entry
+                used.append((now, candidate_key, normalized))
+
+        if not scores:
+            self.score_misses += 1
+            return scores
+        if len(scores) == len(attributes):
+            self.score_hits += 1
+        else:
+            self.score_partial_hits += 1
+
+        try:
+            conn.executemany("UPDATE notas_atributos SET ultimo_acesso = ? WHERE curriculo = ? AND atributo = ?", used)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao atualizar acesso às notas por atributo: {e}")
+        return scores
+
+    def put_scores(self, candidate_key: str, analysis: Dict[str, Any]):
+        """
+        Armazena as notas de uma análise válida, uma por atributo
+
+        Args:
+            candidate_key: Chave gerada por make_candidate_key
+            analysis: Análise com 'pontuacoes' e 'resumo'
+        """
+        now = time.time()
+        summary = analysis.get('resumo', '')
+        rows = []
+        for attribute, score in (analysis.get('pontuacoes') or {}).items():
+            if isinstance(score, int) and 1 <= score <= 5:
+                attribute = self._normalize_attribute(attribute)
+                size = len(candidate_key) + len(attribute.encode('utf-8')) + len(summary.encode('utf-8'))
+                rows.append((candidate_key, attribute, score, summary, size, now, now))
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            previous = conn.execute(
+                f"SELECT COALESCE(SUM(tamanho), 0) FROM notas_atributos WHERE curriculo = ? AND atributo IN ({', '.join('?' * len(rows))})",
+                [candidate_key] + [row[1] for row in rows]
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT OR REPLACE INTO notas_atributos (curriculo, atributo, nota, resumo, tamanho, criado_em, ultimo_acesso) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._total_size += sum(row[4] for row in rows) - previous
+
+            self._evict(conn, now)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar notas por atributo: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """
+        Remove entradas expiradas e, se preciso, as menos usadas recentemente
+
+        Chamado a cada gravação. Análises e notas por atributo dividem o mesmo
+        limite de tamanho e saem na ordem do último acesso, qualquer que seja a tabela.
+        """
+        if self.ttl_seconds:
+            expired = conn.execute("DELETE FROM analises WHERE criado_em < ?", (now - self.ttl_seconds,)).rowcount
+            expired += conn.execute("DELETE FROM notas_atributos WHERE criado_em < ?", (now - self.ttl_seconds,)).rowcount
+            if expired:
+                self._total_size = self._stored_size(conn)
+
+        if self._total_size <= self.max_size_bytes:
+            return
+
+        rows = conn.execute("""
+            SELECT 'analises', chave, NULL, tamanho, ultimo_acesso FROM analises
+            UNION ALL
+            SELECT 'notas_atributos', curriculo, atributo, tamanho, ultimo_acesso FROM notas_atributos
+            ORDER BY ultimo_acesso ASC
+        """).fetchall()
+        analyses, scores = [], []
+        for table, key, attribute, size, _ in rows:
+            if self._total_size <= self.max_size_bytes:
+                break
+            if table == 'analises':
+                analyses.append((key,))
+            else:
+                scores.append((key, attribute))
+            self._total_size -= size
+        conn.executemany("DELETE FROM analises WHERE chave = ?", analyses)
+        conn.executemany("DELETE FROM notas_atributos WHERE curriculo = ? AND atributo = ?", scores)
+
+        logger.debug(f"Cache de análises: {len(analyses)} análises e {len(scores)} notas removidas (LRU)")
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM analises")
+            conn.execute("DELETE FROM notas_atributos")
+            conn.commit()
+            self._total_size = 0
+            logger.info("Cache de análises reconstruído do zero")
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao limpar cache de análises: {e}")
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
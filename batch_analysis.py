@@ -0,0 +1,266 @@
+"""
+Análise de currículos em modo batch (OpenAI Batch API)
+"""
+import os
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Estados finais de um lote na Batch API
+TERMINAL_STATUSES = frozenset({'completed', 'failed', 'expired', 'cancelled'})
+
+class BatchTransport(ABC):
+    """Interface de envio de lotes; permite substituir a API real por um servidor local"""
+
+    @abstractmethod
+    def upload(self, path: str) -> str:
+        """Envia o arquivo JSONL de requisições e retorna o id do arquivo"""
+
+    @abstractmethod
+    def create(self, input_file_id: str) -> str:
+        """Cria o lote a partir do arquivo enviado e retorna o id do lote"""
+
+    @abstractmethod
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """Consulta o lote: 'status', 'output_file_id' e 'error_file_id'"""
+
+    @abstractmethod
+    def download(self, file_id: str) -> str:
+        """Baixa o conteúdo de um arquivo de resultado"""
+
+class OpenAIBatchTransport(BatchTransport):
+    """Transporte pela Files API e Batch API do cliente OpenAI"""
+
+    def __init__(self, client, completion_window: str = None):
+        self.client = client
+        self.completion_window = completion_window or Config.BATCH_COMPLETION_WINDOW
+
+    def upload(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            return self.client.files.create(file=f, purpose='batch').id
+
+    def create(self, input_file_id: str) -> str:
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint='/v1/chat/completions',
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.client.batches.retrieve(batch_id)
+        return {
+            'status': batch.status,
+            'output_file_id': batch.output_file_id,
+            'error_file_id': batch.error_file_id
+        }
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+class BatchJob:
+    """
+    Lote de análises com estado persistido em disco
+
+    O estado (arquivos enviados, ids dos lotes e status) é gravado a cada etapa,
+    então uma execução interrompida retoma de onde parou, sem reenviar nada.
+    """
+
+    def __init__(self, transport: BatchTransport, state_dir: str = None, max_requests: int = None):
+        self.transport = transport
+        self.state_dir = state_dir or Config.BATCH_STATE_DIR
+        self.max_requests = max_requests or Config.BATCH_MAX_REQUESTS
+        self.state = self._load_state()
+
+    @property
+    def _state_file(self) -> str:
+        return os.path.join(self.state_dir, 'estado.json')
+
+    @property
+    def _candidates_file(self) -> str:
+        return os.path.join(self.state_dir, 'candidatos.jsonl')
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        """Lê o estado salvo, se houver"""
+        if not os.path.exists(self._state_file):
+            return None
+        with open(self._state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self):
+        """Grava o estado de forma atômica"""
+        temp_file = f"{self._state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self._state_file)
+
+    def pending(self) -> bool:
+        """Indica se há um lote preparado ou enviado cujos resultados ainda não foram importados"""
+        return self.state is not None and self.state.get('fase') != 'concluido'
+
+    @property
+    def job_profile(self) -> Dict[str, List[str]]:
+        return self.state['perfil']
+
+    def prepare(self, records: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]):
+        """
+        Grava as requisições e os dados dos candidatos
+
+        Cada registro tem 'id', 'arquivo', 'contato' e 'texto'. Registros com
+        'requisicao' (corpo de /v1/chat/completions) geram uma linha do lote;
+        os demais já têm 'analise' (cache) ou 'duplicata_de'.
+
+        Args:
+            records: Registros dos candidatos, consumidos sob demanda
+            job_profile: Perfil da vaga
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        parts = []
+        requests_file = None
+        total = 0
+
+        try:
+            with open(self._candidates_file, 'w', encoding='utf-8') as candidates:
+                for record in records:
+                    request = record.pop('requisicao', None)
+                    if request is not None:
+                        if requests_file is None or parts[-1]['requisicoes'] >= self.max_requests:
+                            if requests_file is not None:
+                                requests_file.close()
+                            path = os.path.join(self.state_dir, f"requisicoes_{len(parts) + 1:03d}.jsonl")
+                            parts.append({'arquivo_entrada': path, 'requisicoes': 0, 'status': 'preparado'})
+                            requests_file = open(path, 'w', encoding='utf-8')
+
+                        line = {'custom_id': record['id'], 'method': 'POST', 'url': '/v1/chat/completions', 'body': request}
+                        requests_file.write(json.dumps(line, ensure_ascii=False) + "\n")
+                        parts[-1]['requisicoes'] += 1
+
+                    candidates.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    total += 1
+        finally:
+            if requests_file is not None:
+                requests_file.close()
+
+        self.state = {
+            'fase': 'preparado',
+            'perfil': job_profile,
+            'candidatos': total,
+            'lotes': parts,
+            'criado_em': datetime.now().isoformat(timespec='seconds')
+        }
+        self._save_state()
+        logger.info(f"Lote preparado: {total} candidatos, {sum(p['requisicoes'] for p in parts)} requisições em {len(parts)} arquivo(s)")
+
+    def submit(self):
+        """Envia os arquivos ainda não enviados e cria os lotes"""
+        for part in self.state['lotes']:
+            if 'input_file_id' not in part:
+                part['input_file_id'] = self.transport.upload(part['arquivo_entrada'])
+                self._save_state()
+            if 'batch_id' not in part:
+                part['batch_id'] = self.transport.create(part['input_file_id'])
+                part['status'] = 'enviado'
+                self._save_state()
+                logger.info(f"Lote criado: {part['batch_id']} ({part['requisicoes']} requisições)")
+
+        self.state['fase'] = 'enviado'
+        self._save_state()
+
+    def wait(self, poll_interval: float = None, max_wait: float = None) -> bool:
+        """
+        Consulta os lotes até todos terminarem
+
+        Args:
+            poll_interval: Intervalo entre consultas em segundos (padrão: Config.BATCH_POLL_INTERVAL)
+            max_wait: Tempo máximo de espera em segundos (None = sem limite)
+
+        Returns:
+            True se todos os lotes terminaram
+        """
+        poll_interval = Config.BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+
+        while True:
+            running = 0
+            for part in self.state['lotes']:
+                if part['status'] in TERMINAL_STATUSES:
+                    continue
+                info = self.transport.retrieve(part['batch_id'])
+                if info['status'] != part['status']:
+                    logger.info(f"Lote {part['batch_id']}: {info['status']}")
+                part.update({key: value for key, value in info.items() if value is not None})
+                if part['status'] not in TERMINAL_STATUSES:
+                    running += 1
+            self._save_state()
+
+            if not running:
+                return True
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                logger.info(f"{running} lote(s) ainda em processamento; execute novamente para retomar")
+                return False
+            time.sleep(poll_interval)
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre as respostas dos lotes terminados
+
+        Returns:
+            Iterador de dicionários com 'id' e 'conteudo' (texto da resposta) ou 'erro'
+        """
+        for number, part in enumerate(self.state['lotes'], 1):
+            for key, name in (('output_file_id', 'saida'), ('error_file_id', 'erros')):
+                file_id = part.get(key)
+                if not file_id:
+                    continue
+
+                path = os.path.join(self.state_dir, f"{name}_{number:03d}.jsonl")
+                if not os.path.exists(path):
+                    content = self.transport.download(file_id)
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield self._parse_result_line(json.loads(line))
+
+    @staticmethod
+    def _parse_result_line(line: Dict[str, Any]) -> Dict[str, Any]:
+        """Extrai o conteúdo ou o erro de uma linha do arquivo de saída"""
+        result = {'id': line.get('custom_id')}
+        response = line.get('response') or {}
+        body = response.get('body') or {}
+
+        if line.get('error'):
+            error = line['error']
+            result['erro'] = error.get('message') if isinstance(error, dict) else str(error)
+        elif response.get('status_code', 200) != 200:
+            message = (body.get('error') or {}).get('message', '')
+            result['erro'] = f"HTTP {response.get('status_code')}: {message}".strip()
+        else:
+            try:
+                result['conteudo'] = body['choices'][0]['message']['content']
+            except (KeyError, IndexError, TypeError):
+                result['erro'] = "resposta sem conteúdo"
+        return result
+
+    def iter_candidates(self) -> Iterator[Dict[str, Any]]:
+        """Percorre os registros dos candidatos na ordem em que foram preparados"""
+        with open(self._candidates_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def finish(self):
+        """Marca o lote como importado; a próxima execução começa um lote novo"""
+        self.state['fase'] = 'concluido'
+        self.state['concluido_em'] = datetime.now().isoformat(timespec='seconds')
+        self._save_state()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do pipeline completo (TalentScan.run) contra o servidor local
+Mede vazão e latência das requisições com latência simulada e respostas 429, sem custo
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+from openai_analyzer import create_analyzer_backend
+from talent_scan import TalentScan
+
+PALAVRAS = (
+    "Desenvolvedor Python sênior com experiência em Django Flask PostgreSQL "
+    "MySQL Docker Kubernetes AWS Azure GCP metodologias ágeis Scrum integração "
+    "contínua testes automatizados APIs REST microserviços liderança técnica "
+    "formação Ciência da Computação certificações inglês avançado"
+).split()
+
+PERFIL = """ATRIBUTOS REQUERIDOS:
+- Experiência com Python
+- Django ou Flask
+- PostgreSQL
+ATRIBUTOS DESEJÁVEIS:
+- Docker e Kubernetes
+- Inglês avançado
+"""
+
+def gerar_curriculos(diretorio: str, quantidade: int, palavras_por_cv: int, seed: int = 42):
+    """Grava currículos sintéticos em TXT, com contatos distintos"""
+    rng = random.Random(seed)
+    for i in range(quantidade):
+        corpo = " ".join(rng.choice(PALAVRAS) for _ in range(palavras_por_cv))
+        with open(os.path.join(diretorio, f"cv_{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Candidato Exemplo {i}\nEXPERIÊNCIA PROFISSIONAL\n{corpo}\n"
+                    f"Contato: candidato{i}@email.com - (11) 9{i % 10000:04d}-{i % 10000:04d}\n")
+
+def executar(diretorio: str, perfil: str, concorrencia: int, args) -> dict:
+    """Executa TalentScan.run uma vez e retorna as métricas da execução"""
+    backend = create_analyzer_backend('local', latency=args.latencia, rate_limit_ratio=args.taxa_429,
+                                      retry_after=args.retry_after, seed=args.seed)
+    try:
+        app = TalentScan(
+            workers=args.workers, use_cache=False, use_analysis_cache=False, concurrency=concorrencia,
+            pack_size=args.pack, dead_letter_file=os.path.join(diretorio, "pendentes.jsonl"),
+            analyzer_backend=backend
+        )
+        app.document_reader.isolate = not args.sem_isolamento
+        inicio = time.perf_counter()
+        app.run(os.path.join(diretorio, "cvs"), perfil, os.path.join(diretorio, "relatorio.csv"), 'csv')
+        segundos = time.perf_counter() - inicio
+    finally:
+        backend.close()
+
+    latencias = 1000 * np.asarray(app.openai_analyzer.request_latencies or [0.0])
+    return {
+        'segundos': segundos,
+        'requisicoes': backend.server.chat_requests,
+        'respostas_429': backend.server.rate_limited,
+        'falhas': len(app.analysis_failures),
+        'p50': np.percentile(latencias, 50),
+        'p95': np.percentile(latencias, 95),
+        'p99': np.percentile(latencias, 99),
+    }
+
+def main():
+    """Função principal do teste de carga"""
+    parser = argparse.ArgumentParser(description="Teste de carga do TalentScan contra o servidor local da API")
+    parser.add_argument('-n', '--curriculos', type=int, default=200, help='Número de currículos sintéticos')
+    parser.add_argument('--palavras', type=int, default=400, help='Palavras por currículo')
+    parser.add_argument('--concorrencia', default='4,8,16', help='Níveis de concorrência, separados por vírgula')
+    parser.add_argument('--latencia', default='lognormal:800,0.5', help='Latência simulada em ms (ver mock_openai_server.py)')
+    parser.add_argument('--taxa-429', type=float, default=0.05, help='Fração das requisições respondidas com 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='retry-after (s) das respostas 429')
+    parser.add_argument('--pack', type=int, default=1, help='Currículos por requisição (0 = pela janela de contexto)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Processos de leitura dos currículos')
+    parser.add_argument('--sem-isolamento', action='store_true', help='Extrai no próprio processo, sem o sandbox')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da latência e das respostas 429')
+    args = parser.parse_args()
+
+    # O log por candidato (e por 429) do TalentScan atrapalharia a leitura da tabela
+    logging.getLogger().setLevel(logging.ERROR)
+
+    diretorio = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(diretorio, "cvs"))
+        gerar_curriculos(os.path.join(diretorio, "cvs"), args.curriculos, args.palavras, args.seed)
+        perfil = os.path.join(diretorio, "perfil.txt")
+        with open(perfil, "w", encoding="utf-8") as f:
+            f.write(PERFIL)
+
+        print("📊 TALENTSCAN - TESTE DE CARGA DA ANÁLISE")
+        print("=" * 78)
+        print(f"{args.curriculos} currículos, latência {args.latencia} ms, {100 * args.taxa_429:.0f}% de respostas 429")
+        print()
+        print(f"{'concorrência':>12} {'total (s)':>10} {'CVs/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+              f"{'p99 (ms)':>9} {'req.':>6} {'429':>5} {'falhas':>6}")
+
+        for concorrencia in (int(valor) for valor in args.concorrencia.split(',')):
+            m = executar(diretorio, perfil, concorrencia, args)
+            print(f"{concorrencia:>12} {m['segundos']:>10.1f} {args.curriculos / m['segundos']:>8.1f} "
+                  f"{m['p50']:>9.0f} {m['p95']:>9.0f} {m['p99']:>9.0f} {m['requisicoes']:>6} "
+                  f"{m['respostas_429']:>5} {m['falhas']:>6}")
+    finally:
+        shutil.rmtree(diretorio)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
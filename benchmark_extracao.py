@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da sanitização, da extração de contatos e da leitura de DOCX
+Compara a implementação atual com a versão original em um corpus sintético
+"""
+import os
+import re
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+from docx import Document
+
+from document_reader import DocumentReader
+
+PALAVRAS = (
+    "Desenvolvedor Python sênior com experiência em Django Flask PostgreSQL "
+    "MySQL Docker Kubernetes AWS Azure GCP metodologias ágeis Scrum integração "
+    "contínua testes automatizados APIs REST microserviços liderança técnica "
+    "formação Ciência da Computação certificações inglês avançado"
+).split()
+
+def gerar_corpus(quantidade: int, palavras_por_cv: int, seed: int = 42) -> list:
+    """Gera currículos sintéticos com contatos e alguns caracteres de controle"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(quantidade):
+        corpo = " ".join(rng.choice(PALAVRAS) for _ in range(palavras_por_cv))
+        if i % 10 == 0:
+            corpo = corpo.replace(" ", "\x00 ", 3)
+        corpus.append(
+            f"Candidato Exemplo {chr(65 + i % 26)}\n"
+            f"EXPERIÊNCIA PROFISSIONAL\n{corpo}\n"
+            f"Contato: candidato{i}@email.com - (11) 9{i % 10000:04d}-{i % 10000:04d}\n"
+        )
+    return corpus
+
+def sanitize_original(text: str) -> str:
+    """Implementação original de DocumentReader.sanitize_text"""
+    if not text:
+        return ""
+    text = "".join(char for char in text if char.isprintable() or char in ['\n', '\r', '\t'])
+    return text.strip()
+
+def contato_original(text: str) -> dict:
+    """Implementação original de DocumentReader.extract_contact_info"""
+    contact_info = {'nome': None, 'email': None, 'telefone': None}
+    if not text:
+        return contact_info
+    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+    if email_match:
+        contact_info['email'] = email_match.group()
+    phone_match = re.search(r'(\(?\d{2}\)?\s?\d{4,5}-?\d{4})', text)
+    if phone_match:
+        contact_info['telefone'] = phone_match.group()
+    for line in text.split('\n')[:5]:
+        line = line.strip()
+        if line and not re.search(r'[0-9@]', line) and len(line) > 3:
+            if not any(header in line.lower() for header in ['curriculum', 'curriculo', 'cv', 'resume']):
+                contact_info['nome'] = line
+                break
+    return contact_info
+
+def gerar_docx(diretorio: str, quantidade: int, paragrafos: int, seed: int = 42) -> list:
+    """Gera arquivos DOCX sintéticos com cabeçalho, parágrafos e uma tabela"""
+    rng = random.Random(seed)
+    arquivos = []
+    for i in range(quantidade):
+        doc = Document()
+        doc.sections[0].header.paragraphs[0].text = f"Candidato Exemplo {i} - candidato{i}@email.com"
+        for _ in range(paragrafos):
+            doc.add_paragraph(" ".join(rng.choice(PALAVRAS) for _ in range(25)))
+        tabela = doc.add_table(rows=5, cols=2)
+        for linha in range(5):
+            tabela.cell(linha, 0).text = rng.choice(PALAVRAS)
+            tabela.cell(linha, 1).text = f"{rng.randint(1, 10)} anos"
+        caminho = os.path.join(diretorio, f"cv_{i}.docx")
+        doc.save(caminho)
+        arquivos.append(caminho)
+    return arquivos
+
+def docx_original(file_path: str) -> str:
+    """Leitura original de DOCX via python-docx (apenas parágrafos do corpo)"""
+    doc = Document(file_path)
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs)
+
+def medir_docx(funcao, arquivos: list) -> tuple:
+    """Retorna latência média por arquivo (ms) e pico de memória (KB) da leitura"""
+    latencias = []
+    pico = 0
+    for caminho in arquivos:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        funcao(caminho)
+        latencias.append(time.perf_counter() - inicio)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return 1000 * sum(latencias) / len(latencias), pico / 1024
+
+def medir(funcao, corpus: list, repeticoes: int) -> float:
+    """Retorna o melhor tempo (segundos) de várias execuções sobre o corpus"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(corpus)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de sanitização, extração de contatos e leitura de DOCX")
+    parser.add_argument('-n', '--documentos', type=int, default=2000, help='Número de currículos sintéticos')
+    parser.add_argument('--palavras', type=int, default=800, help='Palavras por currículo')
+    parser.add_argument('-r', '--repeticoes', type=int, default=3, help='Repetições por medição')
+    parser.add_argument('--docx', type=int, default=30, help='Número de arquivos DOCX sintéticos (0 = pular)')
+    parser.add_argument('--paragrafos', type=int, default=200, help='Parágrafos por DOCX')
+    args = parser.parse_args()
+
+    reader = DocumentReader(full_text=True)
+    corpus = gerar_corpus(args.documentos, args.palavras)
+    megabytes = sum(len(text.encode('utf-8')) for text in corpus) / (1024 * 1024)
+
+    casos = [
+        ("sanitize_text (original)", lambda c: [sanitize_original(t) for t in c]),
+        ("sanitize_text (atual)", lambda c: [reader.sanitize_text(t) for t in c]),
+        ("extract_contact_info (original)", lambda c: [contato_original(t) for t in c]),
+        ("extract_contact_info_many (atual)", reader.extract_contact_info_many),
+    ]
+
+    print("📊 TALENTSCAN - BENCHMARK DE EXTRAÇÃO")
+    print("=" * 60)
+    print(f"Corpus: {len(corpus)} currículos, {megabytes:.1f} MB")
+    print()
+
+    for nome, funcao in casos:
+        segundos = medir(funcao, corpus, args.repeticoes)
+        print(f"{nome:<36} {segundos * 1000:9.1f} ms  {megabytes / segundos:9.1f} MB/s")
+
+    if args.docx > 0:
+        diretorio = tempfile.mkdtemp()
+        try:
+            arquivos = gerar_docx(diretorio, args.docx, args.paragrafos)
+            print()
+            print(f"DOCX: {len(arquivos)} arquivos, {args.paragrafos} parágrafos cada")
+            for nome, funcao in [
+                ("read_docx (python-docx original)", docx_original),
+                ("read_docx (XML em streaming)", reader._read_docx_xml),
+            ]:
+                latencia, pico = medir_docx(funcao, arquivos)
+                print(f"{nome:<36} {latencia:9.2f} ms/arquivo  pico {pico:9.0f} KB")
+        finally:
+            shutil.rmtree(diretorio)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,14 +16,71 @@ class Config:
     OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '1000'))
     OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.3'))
     
+    # Backend do analisador: 'openai' (API da OpenAI ou servidor compatível em OPENAI_BASE_URL)
+    # ou 'local' (servidor simulado no próprio processo, para testes de carga sem custo)
+    ANALYZER_BACKEND = os.getenv('ANALYZER_BACKEND', 'openai')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
+    
+    # Servidor local: latência das respostas em ms (ver mock_openai_server.latency_distribution) e fração de respostas 429
+    LOCAL_LATENCY = os.getenv('LOCAL_LATENCY', 'lognormal:800,0.5')
+    LOCAL_RATE_LIMIT_RATIO = float(os.getenv('LOCAL_RATE_LIMIT_RATIO', '0'))
+    
     # Limites de processamento
     MAX_CV_LENGTH = int(os.getenv('MAX_CV_LENGTH', '3000'))  # Caracteres
     MAX_CANDIDATES = int(os.getenv('MAX_CANDIDATES', '100'))
     
+    # Requisições simultâneas à API durante a análise dos currículos
+    ANALYSIS_CONCURRENCY = int(os.getenv('ANALYSIS_CONCURRENCY', '8'))
+    
+    # Limites da conta na API (0 = aprendidos pelos cabeçalhos de resposta)
+    OPENAI_RPM_LIMIT = int(os.getenv('OPENAI_RPM_LIMIT', '0'))
+    OPENAI_TPM_LIMIT = int(os.getenv('OPENAI_TPM_LIMIT', '0'))
+    
+    # Novas tentativas de análise após falhas transitórias da API
+    ANALYSIS_MAX_RETRIES = int(os.getenv('ANALYSIS_MAX_RETRIES', '5'))
+    ANALYSIS_RETRY_BASE_DELAY = float(os.getenv('ANALYSIS_RETRY_BASE_DELAY', '1.0'))
+    ANALYSIS_RETRY_MAX_DELAY = float(os.getenv('ANALYSIS_RETRY_MAX_DELAY', '60'))
+    
+    # Análises que falharam definitivamente, para reprocessamento com --retry-failed
+    DEAD_LETTER_FILE = os.getenv('DEAD_LETTER_FILE', 'analises_pendentes.jsonl')
+    
+    # Modo batch (Batch API): diretório de estado, intervalo de consulta (s) e requisições por lote
+    BATCH_STATE_DIR = os.getenv('BATCH_STATE_DIR', '.talentscan_batch')
+    BATCH_POLL_INTERVAL = float(os.getenv('BATCH_POLL_INTERVAL', '60'))
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '50000'))
+    BATCH_COMPLETION_WINDOW = os.getenv('BATCH_COMPLETION_WINDOW', '24h')
+    
+    # Empacotamento: janela de contexto e limite de resposta do modelo, e máximo de currículos por requisição
+    MODEL_CONTEXT_TOKENS = int(os.getenv('MODEL_CONTEXT_TOKENS', '16385'))
+    MODEL_MAX_OUTPUT_TOKENS = int(os.getenv('MODEL_MAX_OUTPUT_TOKENS', '4096'))
+    PACK_MAX_SIZE = int(os.getenv('PACK_MAX_SIZE', '8'))
+    
+    # Orçamento de extração de PDFs (0 = sem limite). A margem sobre MAX_CV_LENGTH
+    # cobre caracteres removidos na sanitização.
+    EXTRACTION_CHAR_BUDGET = int(os.getenv('EXTRACTION_CHAR_BUDGET', str(MAX_CV_LENGTH * 2)))
+    EXTRACTION_MAX_PAGES = int(os.getenv('EXTRACTION_MAX_PAGES', '0'))
+    
+    # Extração isolada: tempo máximo (s) e memória adicional (MB) por arquivo (0 = sem limite)
+    EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '120'))
+    EXTRACTION_MAX_MEMORY_MB = int(os.getenv('EXTRACTION_MAX_MEMORY_MB', '1024'))
+    
+    # Leitura de arquivos compactados (.zip/.tar.gz)
+    ARCHIVE_MAX_MEMBER_MB = int(os.getenv('ARCHIVE_MAX_MEMBER_MB', '50'))
+    ARCHIVE_MAX_DEPTH = int(os.getenv('ARCHIVE_MAX_DEPTH', '3'))
+    
     # Arquivos e diretórios
     DEFAULT_OUTPUT_DIR = os.getenv('DEFAULT_OUTPUT_DIR', 'relatorios')
     LOG_FILE = os.getenv('LOG_FILE', 'talent_scan.log')
     
+    # Cache de extração de documentos
+    EXTRACTION_CACHE_FILE = os.getenv('EXTRACTION_CACHE_FILE', os.path.join('.talentscan_cache', 'extracao.db'))
+    EXTRACTION_CACHE_MAX_MB = int(os.getenv('EXTRACTION_CACHE_MAX_MB', '512'))
+    
+    # Cache das respostas da API (TTL em horas; 0 = sem expiração)
+    ANALYSIS_CACHE_FILE = os.getenv('ANALYSIS_CACHE_FILE', os.path.join('.talentscan_cache', 'analises.db'))
+    ANALYSIS_CACHE_MAX_MB = int(os.getenv('ANALYSIS_CACHE_MAX_MB', '256'))
+    ANALYSIS_CACHE_TTL_HOURS = float(os.getenv('ANALYSIS_CACHE_TTL_HOURS', '720'))
+    
     # Formatação Excel
     EXCEL_HEADER_COLOR = os.getenv('EXCEL_HEADER_COLOR', '366092')
     EXCEL_GOOD_SCORE_COLOR = os.getenv('EXCEL_GOOD_SCORE_COLOR', 'C6EFCE')  # Verde
@@ -35,6 +92,27 @@ class Config:
     REQUIRED_WEIGHT = int(os.getenv('REQUIRED_WEIGHT', '2'))
     DESIRED_WEIGHT = int(os.getenv('DESIRED_WEIGHT', '1'))
     
+    # Cascata: modelo mais forte que reanalisa candidatos cuja pontuação total fica a até
+    # CASCADE_BAND de MIN_SCORE_THRESHOLD (vazio = desativa; o primeiro passo usa OPENAI_MODEL)
+    CASCADE_MODEL = os.getenv('CASCADE_MODEL', '')
+    CASCADE_BAND = float(os.getenv('CASCADE_BAND', '0.5'))
+    
+    # Orçamento de tokens do currículo enviado ao modelo após a compressão por relevância (0 = desativa)
+    COMPRESSION_TOKEN_BUDGET = int(os.getenv('COMPRESSION_TOKEN_BUDGET', str(MAX_CV_LENGTH // 4)))
+    
+    # Similaridade de Jaccard estimada a partir da qual currículos são quase duplicatas (0 = desativa)
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.9'))
+    
+    # Pré-triagem BM25: quantos currículos seguem para a análise e pontuação mínima de 0 a 1 (0 = desativa)
+    PRESCREEN_TOP_N = int(os.getenv('PRESCREEN_TOP_N', '0'))
+    PRESCREEN_THRESHOLD = float(os.getenv('PRESCREEN_THRESHOLD', '0'))
+    
+    # Pré-seleção semântica: quantos currículos seguem para a análise (0 = desativa), gerador de embeddings e índice
+    SEMANTIC_TOP_K = int(os.getenv('SEMANTIC_TOP_K', '0'))
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'local')
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+    SEMANTIC_INDEX_DIR = os.getenv('SEMANTIC_INDEX_DIR', os.path.join('.talentscan_cache', 'vetores'))
+    
     @classmethod
     def validate(cls):
         """Valida as configurações"""
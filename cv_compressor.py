@@ -0,0 +1,184 @@
+"""
+Compressão de currículos por relevância para caber em um orçamento de tokens
+"""
+import re
+from typing import Any, Dict, List, Tuple
+import logging
+from config import Config
+from text_utils import tokenize
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Aproximação usual para modelos GPT: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima a quantidade de tokens de um texto
+
+    Args:
+        text: Texto
+
+    Returns:
+        Número aproximado de tokens
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def score_agreement(analysis: Dict[str, Any], baseline: Dict[str, Any], job_profile: Dict[str, List[str]]) -> float:
+    """
+    Mede a concordância entre duas análises do mesmo currículo
+
+    Args:
+        analysis: Análise avaliada (ex.: texto comprimido)
+        baseline: Análise de referência (ex.: texto completo)
+        job_profile: Perfil da vaga
+
+    Returns:
+        Fração dos atributos com a mesma nota nas duas análises (0-1)
+    """
+    attributes = job_profile['requeridos'] + job_profile['desejaveis']
+    if not attributes:
+        return 1.0
+
+    scores = analysis.get('pontuacoes', {})
+    baseline_scores = baseline.get('pontuacoes', {})
+    equal = sum(1 for attr in attributes if scores.get(attr) == baseline_scores.get(attr))
+    return equal / len(attributes)
+
+class CVCompressor:
+    """Seleciona os trechos do currículo mais relevantes para o perfil da vaga"""
+
+    def __init__(self, token_budget: int = None, max_chunk_tokens: int = 120):
+        self.token_budget = token_budget or Config.COMPRESSION_TOKEN_BUDGET
+        self.max_chunk_tokens = max_chunk_tokens
+
+    @staticmethod
+    def _is_heading(line: str) -> bool:
+        """Linhas curtas em maiúsculas ou terminadas em ':' marcam uma nova seção"""
+        stripped = line.strip()
+        if not stripped or len(stripped) > 40:
+            return False
+        return stripped.endswith(':') or (stripped.isupper() and any(c.isalpha() for c in stripped))
+
+    def segment(self, text: str) -> List[str]:
+        """
+        Divide o currículo em seções e, dentro delas, em trechos de tamanho limitado
+
+        Args:
+            text: Texto do currículo
+
+        Returns:
+            Trechos na ordem original
+        """
+        sections = []
+        for block in _PARAGRAPH_RE.split(text):
+            current = []
+            for line in block.split('\n'):
+                if self._is_heading(line) and current:
+                    sections.append(current)
+                    current = []
+                if line.strip():
+                    current.append(line.strip())
+            if current:
+                sections.append(current)
+
+        max_chars = self.max_chunk_tokens * CHARS_PER_TOKEN
+        chunks = []
+        for lines in sections:
+            current, size = [], 0
+            for line in lines:
+                # Linhas muito longas (comuns em PDFs) são quebradas por palavras
+                pieces = [line] if len(line) <= max_chars else self._split_words(line, max_chars)
+                for piece in pieces:
+                    if current and size + len(piece) + 1 > max_chars:
+                        chunks.append("\n".join(current))
+                        current, size = [], 0
+                    current.append(piece)
+                    size += len(piece) + 1
+            if current:
+                chunks.append("\n".join(current))
+
+        return chunks
+
+    @staticmethod
+    def _split_words(line: str, max_chars: int) -> List[str]:
+        """Quebra uma linha longa em pedaços de até max_chars caracteres"""
+        pieces, current = [], ""
+        for word in line.split():
+            if current and len(current) + len(word) + 1 > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _attribute_terms(self, job_profile: Dict[str, List[str]]) -> List[Tuple[frozenset, float]]:
+        """Termos de cada atributo com o peso da sua categoria"""
+        weighted = []
+        for attr in job_profile['requeridos']:
+            weighted.append((frozenset(tokenize(attr)), Config.REQUIRED_WEIGHT))
+        for attr in job_profile['desejaveis']:
+            weighted.append((frozenset(tokenize(attr)), Config.DESIRED_WEIGHT))
+        return [(terms, weight) for terms, weight in weighted if terms]
+
+    def rank(self, chunks: List[str], job_profile: Dict[str, List[str]]) -> List[float]:
+        """
+        Pontua cada trecho pela cobertura ponderada dos termos dos atributos
+
+        Args:
+            chunks: Trechos do currículo
+            job_profile: Perfil da vaga
+
+        Returns:
+            Relevância de cada trecho, na mesma ordem
+        """
+        attribute_terms = self._attribute_terms(job_profile)
+        scores = []
+        for chunk in chunks:
+            chunk_terms = set(tokenize(chunk))
+            score = 0.0
+            for terms, weight in attribute_terms:
+                score += weight * len(terms & chunk_terms) / len(terms)
+            scores.append(score)
+        return scores
+
+    def compress(self, text: str, job_profile: Dict[str, List[str]]) -> Tuple[str, Dict[str, int]]:
+        """
+        Monta a versão do currículo que cabe no orçamento de tokens
+
+        Os trechos mais relevantes são escolhidos primeiro e recolocados na
+        ordem original; trechos sem relevância só entram se sobrar orçamento.
+
+        Args:
+            text: Texto do currículo
+            job_profile: Perfil da vaga
+
+        Returns:
+            Tupla (texto comprimido, estatísticas com tokens originais e enviados)
+        """
+        original_tokens = estimate_tokens(text)
+        if original_tokens <= self.token_budget:
+            return text, {'tokens_originais': original_tokens, 'tokens_enviados': original_tokens}
+
+        chunks = self.segment(text)
+        relevance = self.rank(chunks, job_profile)
+        order = sorted(range(len(chunks)), key=lambda i: (-relevance[i], i))
+
+        selected = []
+        used = 0
+        for index in order:
+            cost = estimate_tokens(chunks[index]) + 1
+            if used + cost > self.token_budget:
+                continue
+            selected.append(index)
+            used += cost
+
+        compressed = "\n".join(chunks[index] for index in sorted(selected))
+        sent_tokens = estimate_tokens(compressed)
+        return compressed, {'tokens_originais': original_tokens, 'tokens_enviados': sent_tokens}
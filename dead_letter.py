@@ -0,0 +1,108 @@
+"""
+Fila persistente de análises que falharam definitivamente
+"""
+import os
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DeadLetterQueue:
+    """Arquivo JSONL com os currículos cuja análise falhou, para reprocessamento posterior"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.DEAD_LETTER_FILE
+        self.added = 0
+
+    @property
+    def _draining_path(self) -> str:
+        return f"{self.path}.reprocessando"
+
+    def add(self, doc: Dict[str, Any], job_profile: Dict[str, List[str]], error: str, attempts: int = 1):
+        """
+        Registra um currículo cuja análise falhou
+
+        Cada entrada guarda o texto e o perfil da vaga, para que o reprocessamento
+        não dependa dos arquivos originais.
+
+        Args:
+            doc: Documento lido ('arquivo', 'texto', 'contato')
+            job_profile: Perfil da vaga usado na análise
+            error: Motivo da falha
+            attempts: Tentativas realizadas
+        """
+        entry = {
+            'arquivo': doc.get('arquivo', ''),
+            'contato': doc.get('contato', {}),
+            'texto': doc.get('texto', ''),
+            'perfil': job_profile,
+            'erro': error,
+            'tentativas': attempts,
+            'data': datetime.now().isoformat(timespec='seconds')
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Gravado imediatamente: uma interrupção não perde as falhas já registradas
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.added += 1
+
+    @staticmethod
+    def _read(path: str) -> List[Dict[str, Any]]:
+        """Lê as entradas de um arquivo JSONL, ignorando linhas corrompidas"""
+        entries = []
+        if not os.path.exists(path):
+            return entries
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Linha {number} inválida em {path}; ignorada")
+        return entries
+
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Lê as entradas pendentes sem alterá-las
+
+        Returns:
+            Lista de entradas
+        """
+        return self._read(self._draining_path) + self._read(self.path)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        Retira as entradas pendentes para reprocessamento
+
+        O arquivo é apenas renomeado até commit(); se o reprocessamento for
+        interrompido, as entradas voltam a ser lidas na próxima execução.
+        Falhas do reprocessamento são registradas de novo com add().
+
+        Returns:
+            Lista de entradas
+        """
+        pending = self._read(self._draining_path)
+        if os.path.exists(self.path):
+            pending += self._read(self.path)
+            with open(self._draining_path, 'w', encoding='utf-8') as f:
+                for entry in pending:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.remove(self.path)
+        return pending
+
+    def commit(self):
+        """Descarta as entradas retiradas por drain() após o reprocessamento"""
+        if os.path.exists(self._draining_path):
+            os.remove(self._draining_path)
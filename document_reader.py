@@ -1,22 +1,109 @@
 """
 Módulo para leitura de arquivos PDF e DOCX
 """
+import io
 import os
+import itertools
 import re
-from typing import List, Dict, Optional
+import string
+import tarfile
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import List, Dict, Optional, Tuple, Iterator, Iterable, Union, Callable
 import PyPDF2
 from docx import Document
 import logging
+from config import Config
+from extraction_sandbox import ExtractionSandbox
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Versão do extrator; incrementar quando a extração mudar para invalidar o cache
+EXTRACTOR_VERSION = '3'
+
+# Quebras de linha e tabulações são mantidas mesmo não sendo "imprimíveis"
+_KEPT_CONTROLS = '\n\r\t'
+
+def _build_non_printable_class() -> str:
+    """Monta uma classe de caracteres com os intervalos não imprimíveis do BMP"""
+    bad = [code for code in range(0x10000)
+           if not chr(code).isprintable() and chr(code) not in _KEPT_CONTROLS]
+    
+    ranges = []
+    start = end = bad[0]
+    for code in bad[1:] + [None]:
+        if code is not None and code == end + 1:
+            end = code
+            continue
+        ranges.append(f"\\u{start:04x}" if start == end else f"\\u{start:04x}-\\u{end:04x}")
+        start = end = code
+    return "[" + "".join(ranges) + "]+"
+
+_NON_PRINTABLE_RE = re.compile(_build_non_printable_class())
+
+# Padrões de contato compilados uma única vez. O lookahead do telefone não altera
+# o que é encontrado, mas permite ao motor de regex pular direto para "(" ou dígitos.
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+_PHONE_RE = re.compile(r'(?=[(\d])(\(?\d{2}\)?\s?\d{4,5}-?\d{4})')
+
+# Elementos WordprocessingML usados na leitura direta do XML de arquivos DOCX
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_PARAGRAPH = _W_NS + 'p'
+_W_TEXT = _W_NS + 't'
+_W_TAB = _W_NS + 'tab'
+_W_BREAKS = (_W_NS + 'br', _W_NS + 'cr')
+# Caixas de texto aparecem duplicadas em mc:Fallback (VML); só a versão mc:Choice é lida
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_HEADER_RE = re.compile(r'word/header\d*\.xml$')
+_DOCX_FOOTER_RE = re.compile(r'word/footer\d*\.xml$')
+
+# Arquivos compactados aceitos como entrada (lidos em memória, sem descompactar em disco)
+_ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+_NAME_REJECT_RE = re.compile(r'[0-9@]')
+_NAME_HEADERS = ('curriculum', 'curriculo', 'cv', 'resume')
+
 class DocumentReader:
     """Classe para leitura de documentos PDF e DOCX"""
     
-    def __init__(self):
+    def __init__(self, cache=None, full_text: bool = False, isolate: bool = False,
+                 timeout: float = None, max_memory_mb: int = None):
         self.supported_extensions = ['.pdf', '.docx', '.txt']
+        self.failed_files = []
+        self.cache = cache
+        
+        # Extração em processos isolados com limite de tempo e memória por arquivo.
+        # Com mais de um worker a extração é sempre feita em processos separados.
+        self.isolate = isolate
+        self.timeout = Config.EXTRACTION_TIMEOUT if timeout is None else timeout
+        self.max_memory_mb = Config.EXTRACTION_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+        
+        # Limites para leitura de arquivos compactados
+        self.archive_max_member_bytes = Config.ARCHIVE_MAX_MEMBER_MB * 1024 * 1024
+        self.archive_max_depth = Config.ARCHIVE_MAX_DEPTH
+        
+        # Orçamento de extração de PDFs e DOCX; None desativa o limite (modo texto completo)
+        self.char_budget = None if full_text else (Config.EXTRACTION_CHAR_BUDGET or None)
+        self.page_budget = None if full_text else (Config.EXTRACTION_MAX_PAGES or None)
+    
+    def __getstate__(self):
+        # O cache permanece no processo principal; os workers apenas extraem
+        state = self.__dict__.copy()
+        state['cache'] = None
+        return state
+    
+    def cache_version(self) -> str:
+        """
+        Identifica a versão/configuração do extrator usada na chave do cache
+        
+        Returns:
+            Versão do extrator
+        """
+        return f"{EXTRACTOR_VERSION}:{self.char_budget or 0}:{self.page_budget or 0}"
     
     def sanitize_text(self, text: str) -> str:
         """
@@ -33,13 +120,23 @@ class DocumentReader:
         
         # Remover caracteres nulos e outros controles não imprimíveis (exceto \n, \r, \t)
         # Mantém caracteres acentuados e pontuação
-        text = "".join(char for char in text if char.isprintable() or char in ['\n', '\r', '\t'])
+        if text.replace('\n', '').replace('\r', '').replace('\t', '').isprintable():
+            # Caminho rápido: nada a remover
+            return text.strip()
+        
+        text = _NON_PRINTABLE_RE.sub('', text)
+        if not text.isascii() and max(text) > '\uffff':
+            # Caracteres fora do BMP são raros; verificação caractere a caractere
+            text = "".join(char for char in text if char.isprintable() or char in _KEPT_CONTROLS)
         return text.strip()
 
     def read_pdf(self, file_path: str) -> str:
         """
         Lê o conteúdo de um arquivo PDF
         
+        A extração para assim que o orçamento de caracteres ou de páginas é
+        atingido, já que a análise usa apenas o início do currículo.
+        
         Args:
             file_path: Caminho para o arquivo PDF
             
@@ -53,33 +150,65 @@ class DocumentReader:
                 return ""
 
             with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Verificar se PDF é válido/encriptado
-                if pdf_reader.is_encrypted:
-                    logger.warning(f"PDF encriptado (não suportado): {file_path}")
-                    return ""
-                    
-                text = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    try:
-                        page = pdf_reader.pages[page_num]
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    except Exception as e:
-                        logger.warning(f"Erro ao ler página {page_num} de {file_path}: {e}")
-                        continue
-                
-                return self.sanitize_text(text)
+                return self._read_pdf_stream(file, file_path)
+        except MemoryError:
+            # Propagada para que o processo de extração isolado seja reciclado
+            raise
         except Exception as e:
             logger.error(f"Erro ao ler PDF {file_path}: {str(e)}")
             return ""
     
+    def _read_pdf_stream(self, stream, label: str) -> str:
+        """
+        Extrai o texto de um PDF a partir de um arquivo aberto ou buffer
+        
+        Args:
+            stream: Objeto binário com o conteúdo do PDF
+            label: Nome usado nas mensagens de log
+            
+        Returns:
+            Texto extraído do PDF
+        """
+        pdf_reader = PyPDF2.PdfReader(stream)
+        
+        # Verificar se PDF é válido/encriptado
+        if pdf_reader.is_encrypted:
+            logger.warning(f"PDF encriptado (não suportado): {label}")
+            return ""
+        
+        total_pages = len(pdf_reader.pages)
+        if self.page_budget:
+            total_pages = min(total_pages, self.page_budget)
+        
+        parts = []
+        collected = 0
+        for page_num in range(total_pages):
+            try:
+                page = pdf_reader.pages[page_num]
+                page_text = page.extract_text()
+                if page_text:
+                    parts.append(page_text)
+                    collected += len(page_text) + 1
+            except MemoryError:
+                raise
+            except Exception as e:
+                logger.warning(f"Erro ao ler página {page_num} de {label}: {e}")
+                continue
+            
+            if self.char_budget and collected >= self.char_budget:
+                logger.debug(f"Orçamento de extração atingido na página {page_num + 1} de {label}")
+                break
+        
+        return self.sanitize_text("\n".join(parts))
+    
     def read_docx(self, file_path: str) -> str:
         """
         Lê o conteúdo de um arquivo DOCX
         
+        O XML do documento é lido diretamente do pacote zip, incluindo tabelas,
+        caixas de texto, cabeçalhos e rodapés. O python-docx é usado como
+        alternativa quando a leitura direta falha.
+        
         Args:
             file_path: Caminho para o arquivo DOCX
             
@@ -91,18 +220,133 @@ class DocumentReader:
             if os.path.getsize(file_path) == 0:
                 logger.warning(f"Arquivo vazio: {file_path}")
                 return ""
-
-            doc = Document(file_path)
-            text = ""
+        except OSError as e:
+            logger.error(f"Erro ao ler DOCX {file_path}: {str(e)}")
+            return ""
+        
+        return self._read_docx_source(file_path, file_path)
+    
+    def _read_docx_source(self, source: Union[str, io.BytesIO], label: str) -> str:
+        """
+        Extrai o texto de um DOCX a partir de um caminho ou buffer
+        
+        Args:
+            source: Caminho ou objeto binário com o conteúdo do DOCX
+            label: Nome usado nas mensagens de log
             
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+        Returns:
+            Texto extraído do DOCX
+        """
+        try:
+            text = self._read_docx_xml(source)
+            if text:
+                return self.sanitize_text(text)
+            logger.debug(f"Leitura direta do DOCX sem texto, usando python-docx: {label}")
+        except MemoryError:
+            raise
+        except Exception as e:
+            logger.debug(f"Leitura direta do DOCX falhou, usando python-docx: {label}: {e}")
+        
+        try:
+            if not isinstance(source, str):
+                source.seek(0)
+            doc = Document(source)
+            text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
             
             return self.sanitize_text(text)
+        except MemoryError:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao ler DOCX {file_path}: {str(e)}")
+            logger.error(f"Erro ao ler DOCX {label}: {str(e)}")
             return ""
     
+    def _read_docx_xml(self, source: Union[str, io.BytesIO]) -> str:
+        """
+        Extrai o texto de um DOCX lendo as partes XML em streaming
+        
+        Args:
+            source: Caminho ou objeto binário com o conteúdo do DOCX
+            
+        Returns:
+            Texto com um parágrafo por linha (cabeçalhos, corpo e rodapés)
+        """
+        with zipfile.ZipFile(source) as package:
+            names = package.namelist()
+            headers = sorted(name for name in names if _DOCX_HEADER_RE.match(name))
+            footers = sorted(name for name in names if _DOCX_FOOTER_RE.match(name))
+            
+            parts = []
+            seen = set()
+            for name in headers:
+                part_text = "\n".join(self._iter_docx_paragraphs(package, name))
+                # Cabeçalhos de primeira página/páginas pares costumam repetir o padrão
+                if part_text and part_text not in seen:
+                    seen.add(part_text)
+                    parts.append(part_text)
+            
+            body = []
+            collected = 0
+            for paragraph in self._iter_docx_paragraphs(package, 'word/document.xml'):
+                body.append(paragraph)
+                collected += len(paragraph) + 1
+                if self.char_budget and collected >= self.char_budget:
+                    break
+            parts.append("\n".join(body))
+            
+            for name in footers:
+                part_text = "\n".join(self._iter_docx_paragraphs(package, name))
+                if part_text and part_text not in seen:
+                    seen.add(part_text)
+                    parts.append(part_text)
+        
+        return "\n".join(part for part in parts if part)
+    
+    def _iter_docx_paragraphs(self, package: zipfile.ZipFile, part_name: str) -> Iterator[str]:
+        """
+        Percorre os parágrafos de uma parte XML do DOCX com um parser incremental
+        
+        Args:
+            package: Pacote zip do DOCX
+            part_name: Nome da parte (ex.: word/document.xml)
+            
+        Yields:
+            Texto de cada parágrafo, incluindo os de tabelas e caixas de texto
+        """
+        stack = []
+        skip_depth = 0
+        
+        with package.open(part_name) as part:
+            for event, element in ET.iterparse(part, events=('start', 'end')):
+                tag = element.tag
+                
+                if tag == _MC_FALLBACK:
+                    skip_depth += 1 if event == 'start' else -1
+                    if event == 'end':
+                        element.clear()
+                    continue
+                
+                if skip_depth:
+                    continue
+                
+                if event == 'start':
+                    if tag == _W_PARAGRAPH:
+                        stack.append([])
+                    continue
+                
+                if tag == _W_TEXT:
+                    if stack and element.text:
+                        stack[-1].append(element.text)
+                elif tag == _W_TAB:
+                    if stack:
+                        stack[-1].append('\t')
+                elif tag in _W_BREAKS:
+                    if stack:
+                        stack[-1].append('\n')
+                elif tag == _W_PARAGRAPH:
+                    # Parágrafos aninhados (caixas de texto) saem antes do parágrafo externo
+                    yield "".join(stack.pop())
+                    element.clear()
+    
     def read_txt(self, file_path: str) -> str:
         """
         Lê o conteúdo de um arquivo TXT
@@ -123,6 +367,8 @@ class DocumentReader:
                 text = f.read()
             
             return self.sanitize_text(text)
+        except MemoryError:
+            raise
         except Exception as e:
             logger.error(f"Erro ao ler TXT {file_path}: {str(e)}")
             return ""
@@ -146,33 +392,50 @@ class DocumentReader:
         if not text:
             return contact_info
         
-        # Extrair email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
-        if email_match:
-            contact_info['email'] = email_match.group()
+        # Extrair email: todo email contém "@", então a busca começa no trecho
+        # de caracteres válidos imediatamente anterior ao primeiro "@"
+        at = text.find('@')
+        if at != -1:
+            start = at
+            while start > 0 and text[start - 1] in _EMAIL_LOCAL_CHARS:
+                start -= 1
+            email_match = _EMAIL_RE.search(text, start)
+            if email_match:
+                contact_info['email'] = email_match.group()
         
         # Extrair telefone (formato brasileiro)
-        phone_pattern = r'(\(?\d{2}\)?\s?\d{4,5}-?\d{4})'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = _PHONE_RE.search(text)
         if phone_match:
             contact_info['telefone'] = phone_match.group()
         
         # Tentar extrair nome (primeira linha ou após "Nome:")
-        lines = text.split('\n')
-        for line in lines[:5]:  # Verificar as primeiras 5 linhas
+        for line in text.split('\n', 5)[:5]:  # Verificar as primeiras 5 linhas
             line = line.strip()
-            if line and not re.search(r'[0-9@]', line) and len(line) > 3:
+            if line and len(line) > 3 and not _NAME_REJECT_RE.search(line):
                 # Verificar se não é um cabeçalho comum
-                if not any(header in line.lower() for header in ['curriculum', 'curriculo', 'cv', 'resume']):
+                lowered = line.lower()
+                if not any(header in lowered for header in _NAME_HEADERS):
                     contact_info['nome'] = line
                     break
         
         return contact_info
     
+    def extract_contact_info_many(self, texts: Iterable[str]) -> List[Dict[str, Optional[str]]]:
+        """
+        Extrai informações de contato de vários textos
+        
+        Args:
+            texts: Textos dos currículos
+            
+        Returns:
+            Lista de dicionários com nome, email e telefone, na ordem de entrada
+        """
+        extract = self.extract_contact_info
+        return [extract(text) for text in texts]
+    
     def read_document(self, file_path: str) -> Dict[str, str]:
         """
-        Lê um documento e extrai informações
+        Lê um documento e extrai informações, usando o cache quando disponível
         
         Args:
             file_path: Caminho para o arquivo
@@ -184,6 +447,25 @@ class DocumentReader:
             logger.error(f"Arquivo não encontrado: {file_path}")
             return {'texto': '', 'contato': {}}
         
+        content_hash, cached = self._cache_lookup(file_path)
+        if cached is not None:
+            return cached
+        
+        doc_info = self._extract_document(file_path)
+        self._cache_store(content_hash, doc_info)
+        
+        return doc_info
+    
+    def _extract_document(self, file_path: str) -> Dict[str, str]:
+        """
+        Extrai texto e contato de um documento, sem consultar o cache
+        
+        Args:
+            file_path: Caminho para o arquivo
+            
+        Returns:
+            Dicionário com texto e informações de contato
+        """
         file_extension = os.path.splitext(file_path)[1].lower()
         
         if file_extension == '.pdf':
@@ -196,26 +478,167 @@ class DocumentReader:
             logger.error(f"Formato não suportado: {file_extension}")
             return {'texto': '', 'contato': {}}
         
+        return self._build_document(texto, file_path, os.path.basename(file_path))
+    
+    def _extract_bytes(self, name: str, data: bytes) -> Dict[str, str]:
+        """
+        Extrai texto e contato de um documento em memória (membro de arquivo compactado)
+        
+        Args:
+            name: Nome do documento, incluindo o arquivo compactado de origem
+            data: Conteúdo binário do documento
+            
+        Returns:
+            Dicionário com texto e informações de contato
+        """
+        file_extension = os.path.splitext(name)[1].lower()
+        
+        if not data:
+            logger.warning(f"Arquivo vazio: {name}")
+            return self._build_document("", name, name)
+        
+        try:
+            if file_extension == '.pdf':
+                texto = self._read_pdf_stream(io.BytesIO(data), name)
+            elif file_extension == '.docx':
+                texto = self._read_docx_source(io.BytesIO(data), name)
+            elif file_extension == '.txt':
+                texto = self.sanitize_text(data.decode('utf-8', errors='ignore'))
+            else:
+                logger.error(f"Formato não suportado: {file_extension}")
+                return {'texto': '', 'contato': {}}
+        except MemoryError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao ler {name}: {str(e)}")
+            texto = ""
+        
+        return self._build_document(texto, name, name)
+    
+    def _build_document(self, texto: str, label: str, arquivo: str) -> Dict[str, str]:
+        """
+        Monta o dicionário de um documento extraído
+        
+        Args:
+            texto: Texto sanitizado
+            label: Caminho/nome usado nas mensagens de log
+            arquivo: Nome exibido no relatório
+            
+        Returns:
+            Dicionário com texto e informações de contato
+        """
         if not texto:
-            logger.warning(f"Nenhum texto extraído de: {file_path}")
+            logger.warning(f"Nenhum texto extraído de: {label}")
         
         contato = self.extract_contact_info(texto)
         
         return {
             'texto': texto,
             'contato': contato,
-            'arquivo': os.path.basename(file_path)
+            'arquivo': arquivo
         }
     
-    def read_directory(self, directory_path: str) -> List[Dict[str, str]]:
+    def _extract_source(self, source: Union[str, Tuple[str, bytes]]) -> Dict[str, str]:
         """
-        Lê todos os documentos suportados em um diretório
+        Extrai um documento a partir de um caminho ou de um membro em memória
+        
+        Args:
+            source: Caminho do arquivo ou tupla (nome, conteúdo)
+            
+        Returns:
+            Dicionário com texto e informações de contato
+        """
+        if isinstance(source, str):
+            return self._extract_document(source)
+        return self._extract_bytes(*source)
+    
+    @staticmethod
+    def _source_name(source: Union[str, Tuple[str, bytes]]) -> str:
+        """Nome exibido de uma fonte (arquivo ou membro de arquivo compactado)"""
+        return os.path.basename(source) if isinstance(source, str) else source[0]
+    
+    def _cache_lookup(self, source: Union[str, Tuple[str, bytes]]) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
+        """
+        Consulta o cache de extração para um arquivo ou membro em memória
+        
+        Args:
+            source: Caminho do arquivo ou tupla (nome, conteúdo)
+            
+        Returns:
+            Tupla (hash do conteúdo, documento em cache ou None)
+        """
+        if self.cache is None:
+            return None, None
+        
+        name = self._source_name(source)
+        if os.path.splitext(name)[1].lower() not in self.supported_extensions:
+            return None, None
+        
+        try:
+            if isinstance(source, str):
+                content_hash = self.cache.hash_file(source)
+            else:
+                content_hash = self.cache.hash_bytes(source[1])
+        except OSError as e:
+            logger.warning(f"Não foi possível calcular o hash de {name}: {e}")
+            return None, None
+        
+        cached = self.cache.get(content_hash, self.cache_version())
+        if cached is None:
+            return content_hash, None
+        
+        logger.debug(f"Extração recuperada do cache: {name}")
+        cached['arquivo'] = name
+        return content_hash, cached
+    
+    def _cache_store(self, content_hash: Optional[str], doc_info: Dict[str, str]):
+        """
+        Armazena o resultado de uma extração no cache
+        
+        Args:
+            content_hash: Hash do conteúdo (None quando o cache está desativado)
+            doc_info: Documento extraído
+        """
+        if self.cache is None or content_hash is None or 'arquivo' not in doc_info:
+            return
+        
+        self.cache.put(content_hash, self.cache_version(), doc_info['texto'], doc_info['contato'])
+    
+    def is_archive(self, path: str) -> bool:
+        """
+        Verifica se um caminho/nome corresponde a um arquivo compactado suportado
+        
+        Args:
+            path: Caminho ou nome do arquivo
+            
+        Returns:
+            True para .zip, .tar, .tar.gz e .tgz
+        """
+        return path.lower().endswith(_ARCHIVE_SUFFIXES)
+    
+    def list_inputs(self, path: str) -> List[str]:
+        """
+        Lista as entradas de um diretório ou de um único arquivo compactado
+        
+        Args:
+            path: Diretório com currículos ou arquivo .zip/.tar.gz
+            
+        Returns:
+            Lista ordenada de caminhos (documentos e arquivos compactados)
+        """
+        if os.path.isfile(path) and self.is_archive(path):
+            return [path]
+        return self.list_directory(path)
+    
+    def list_directory(self, directory_path: str) -> List[str]:
+        """
+        Lista os arquivos suportados de um diretório em ordem estável
         
         Args:
             directory_path: Caminho para o diretório
             
         Returns:
-            Lista de dicionários com informações dos documentos
+            Lista ordenada com os caminhos dos arquivos suportados e compactados
         """
         if not os.path.exists(directory_path):
             logger.error(f"Diretório não encontrado: {directory_path}")
@@ -225,21 +648,310 @@ class DocumentReader:
             logger.error(f"Caminho não é um diretório: {directory_path}")
             return []
         
-        documentos = []
+        file_paths = []
         
         try:
-            for filename in os.listdir(directory_path):
+            for filename in sorted(os.listdir(directory_path)):
                 file_path = os.path.join(directory_path, filename)
                 
                 if os.path.isfile(file_path):
                     file_extension = os.path.splitext(filename)[1].lower()
                     
-                    if file_extension in self.supported_extensions:
-                        logger.info(f"Processando arquivo: {filename}")
-                        doc_info = self.read_document(file_path)
-                        if doc_info['texto']: # Só adiciona se conseguiu extrair texto
-                            documentos.append(doc_info)
+                    if file_extension in self.supported_extensions or self.is_archive(filename):
+                        file_paths.append(file_path)
         except Exception as e:
             logger.error(f"Erro ao ler diretório {directory_path}: {e}")
         
-        return documentos
+        return file_paths
+    
+    def iter_archive(self, archive_path: str) -> Iterator[Tuple[str, bytes]]:
+        """
+        Percorre os documentos de um arquivo compactado sem descompactá-lo em disco
+        
+        Args:
+            archive_path: Caminho para o arquivo .zip/.tar/.tar.gz
+            
+        Yields:
+            Tuplas (nome, conteúdo) dos documentos suportados, incluindo os de
+            arquivos compactados aninhados
+        """
+        yield from self._iter_archive_members(archive_path, os.path.basename(archive_path), 0)
+    
+    def _iter_archive_members(self, source: Union[str, io.BytesIO], label: str, depth: int) -> Iterator[Tuple[str, bytes]]:
+        """
+        Percorre recursivamente os membros de um arquivo compactado
+        
+        Args:
+            source: Caminho ou buffer do arquivo compactado
+            label: Nome do arquivo compactado (prefixo dos membros)
+            depth: Nível de aninhamento atual
+            
+        Yields:
+            Tuplas (nome, conteúdo) dos documentos suportados
+        """
+        try:
+            if label.lower().endswith('.zip'):
+                members = self._iter_zip_members(source)
+            else:
+                members = self._iter_tar_members(source)
+            
+            for member_name, size, read in members:
+                name = f"{label}/{member_name}"
+                is_nested = self.is_archive(member_name)
+                
+                if not is_nested and os.path.splitext(member_name)[1].lower() not in self.supported_extensions:
+                    continue
+                
+                if is_nested and depth + 1 > self.archive_max_depth:
+                    self._register_failure(name, ValueError("limite de aninhamento de arquivos compactados excedido"))
+                    continue
+                
+                if size > self.archive_max_member_bytes:
+                    self._register_failure(name, ValueError(f"membro excede o limite de {self.archive_max_member_bytes} bytes"))
+                    continue
+                
+                # O tamanho declarado pode ser falso (zip bomb): a leitura também é limitada
+                data = read(self.archive_max_member_bytes + 1)
+                if len(data) > self.archive_max_member_bytes:
+                    self._register_failure(name, ValueError(f"membro excede o limite de {self.archive_max_member_bytes} bytes"))
+                    continue
+                
+                if is_nested:
+                    yield from self._iter_archive_members(io.BytesIO(data), name, depth + 1)
+                else:
+                    yield name, data
+        except (zipfile.BadZipFile, tarfile.TarError, OSError, EOFError) as e:
+            self._register_failure(label, e)
+    
+    @staticmethod
+    def _iter_zip_members(source: Union[str, io.BytesIO]) -> Iterator[Tuple[str, int, Callable[[int], bytes]]]:
+        """Membros de um .zip como tuplas (nome, tamanho declarado, função de leitura)"""
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                
+                def read(limit, info=info):
+                    with archive.open(info) as member:
+                        return member.read(limit)
+                
+                yield info.filename, info.file_size, read
+    
+    @staticmethod
+    def _iter_tar_members(source: Union[str, io.BytesIO]) -> Iterator[Tuple[str, int, Callable[[int], bytes]]]:
+        """Membros de um .tar/.tar.gz lidos sequencialmente, sem acesso aleatório"""
+        if isinstance(source, str):
+            archive = tarfile.open(source, mode='r|*')
+        else:
+            archive = tarfile.open(fileobj=source, mode='r|*')
+        
+        with archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                
+                def read(limit, member=member):
+                    extracted = archive.extractfile(member)
+                    return extracted.read(limit) if extracted else b''
+                
+                yield member.name, member.size, read
+    
+    def iter_sources(self, paths: List[str]) -> Iterator[Union[str, Tuple[str, bytes]]]:
+        """
+        Expande arquivos compactados em seus documentos
+        
+        Args:
+            paths: Caminhos de documentos e arquivos compactados
+            
+        Yields:
+            Caminhos de documentos ou tuplas (nome, conteúdo) de membros
+        """
+        for _, source in self._iter_located_sources(paths):
+            yield source
+    
+    def _iter_located_sources(self, paths: List[str]) -> Iterator[Tuple[str, Union[str, Tuple[str, bytes]]]]:
+        """
+        Expande arquivos compactados guardando o caminho completo de cada documento
+        
+        Args:
+            paths: Caminhos de documentos e arquivos compactados
+            
+        Yields:
+            Tuplas (caminho completo, fonte); membros de compactados usam o
+            caminho do arquivo compactado seguido do nome do membro
+        """
+        for path in paths:
+            if self.is_archive(path):
+                directory = os.path.dirname(path)
+                for member in self.iter_archive(path):
+                    yield os.path.join(directory, member[0]), member
+            else:
+                yield path, path
+    
+    def read_directory(self, directory_path: str, workers: int = 1) -> List[Dict[str, str]]:
+        """
+        Lê todos os documentos suportados em um diretório
+        
+        Args:
+            directory_path: Caminho para o diretório (ou arquivo compactado)
+            workers: Número de processos para extração em paralelo (1 = sequencial)
+            
+        Returns:
+            Lista de dicionários com informações dos documentos, na ordem dos arquivos
+        """
+        return list(self.iter_directory(directory_path, workers))
+    
+    def iter_directory(self, directory_path: str, workers: int = 1) -> Iterator[Dict[str, str]]:
+        """
+        Lê os documentos de um diretório sob demanda, um de cada vez
+        
+        Args:
+            directory_path: Caminho para o diretório (ou arquivo compactado)
+            workers: Número de processos para extração em paralelo (1 = sequencial)
+            
+        Yields:
+            Dicionários com informações dos documentos, na ordem dos arquivos
+        """
+        return self.iter_documents(self.list_inputs(directory_path), workers)
+    
+    def iter_documents(self, file_paths: List[str], workers: int = 1) -> Iterator[Dict[str, str]]:
+        """
+        Lê uma lista de arquivos sob demanda, um de cada vez
+        
+        Arquivos compactados são expandidos em memória e seus documentos passam
+        pelo mesmo caminho de extração, cache e paralelismo.
+        
+        Args:
+            file_paths: Caminhos dos arquivos (documentos ou compactados)
+            workers: Número de processos para extração em paralelo (1 = sequencial)
+            
+        Yields:
+            Dicionários com informações dos documentos, na ordem de entrada
+        """
+        self.failed_files = []
+        # Os resultados saem na ordem das fontes, um por fonte
+        paths = deque()
+        
+        def sources():
+            for path, source in self._iter_located_sources(file_paths):
+                paths.append(path)
+                yield source
+        
+        if workers > 1 or self.isolate:
+            results = self._iter_parallel(sources(), workers)
+        else:
+            results = (self._read_safely(source) for source in sources())
+        
+        try:
+            for doc_info in results:
+                path = paths.popleft()
+                # Só entrega documentos dos quais foi possível extrair texto
+                if doc_info and doc_info['texto']:
+                    # O nome exibido pode se repetir entre pastas e compactados; o caminho não
+                    doc_info['caminho'] = path
+                    yield doc_info
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
+    
+    def _read_safely(self, source: Union[str, Tuple[str, bytes]]) -> Optional[Dict[str, str]]:
+        """
+        Lê um documento registrando a falha sem interromper o lote
+        
+        Args:
+            source: Caminho do arquivo ou tupla (nome, conteúdo)
+            
+        Returns:
+            Informações do documento ou None em caso de falha
+        """
+        name = self._source_name(source)
+        logger.info(f"Processando arquivo: {name}")
+        try:
+            if isinstance(source, str):
+                return self.read_document(source)
+            
+            content_hash, cached = self._cache_lookup(source)
+            if cached is not None:
+                return cached
+            
+            doc_info = self._extract_bytes(*source)
+            self._cache_store(content_hash, doc_info)
+            return doc_info
+        except Exception as e:
+            self._register_failure(name, e)
+            return None
+    
+    def _iter_parallel(self, sources: Iterable[Union[str, Tuple[str, bytes]]], workers: int) -> Iterator[Optional[Dict[str, str]]]:
+        """
+        Lê documentos em processos isolados mantendo a ordem de entrada
+        
+        Apenas uma janela limitada de arquivos fica em processamento ao mesmo
+        tempo, para que a memória não cresça com o tamanho do diretório.
+        Arquivos que excedem o tempo ou a memória, ou que derrubam o processo,
+        são registrados em failed_files e o worker é substituído.
+        
+        Args:
+            sources: Caminhos de arquivos ou tuplas (nome, conteúdo)
+            workers: Número de processos
+            
+        Yields:
+            Resultados na ordem de entrada (None para arquivos que falharam)
+        """
+        logger.info(f"Lendo arquivos com {workers} processos")
+        window = workers * 4
+        remaining = iter(sources)
+        pending = deque()
+        completed = {}
+        
+        task_ids = itertools.count()
+        
+        sandbox = ExtractionSandbox(self._extract_source, workers, self.timeout, self.max_memory_mb)
+        with sandbox:
+            while True:
+                # Consultas ao cache ficam no processo principal; só os misses vão para os workers
+                while len(pending) < window:
+                    source = next(remaining, None)
+                    if source is None:
+                        break
+                    
+                    task_id = next(task_ids)
+                    name = self._source_name(source)
+                    content_hash, cached = self._cache_lookup(source)
+                    pending.append((task_id, name, content_hash))
+                    if cached is not None:
+                        completed[task_id] = (cached, None)
+                    else:
+                        sandbox.submit(task_id, source)
+                
+                if not pending:
+                    break
+                
+                head_id, name, content_hash = pending[0]
+                while head_id not in completed:
+                    for done_id, doc_info, error in sandbox.collect():
+                        completed[done_id] = (doc_info, error)
+                
+                pending.popleft()
+                doc_info, error = completed.pop(head_id)
+                if error is not None:
+                    self._register_failure(name, RuntimeError(error))
+                    yield None
+                    continue
+                
+                self._cache_store(content_hash, doc_info)
+                logger.info(f"Arquivo processado: {name}")
+                yield doc_info
+    
+    def _register_failure(self, name: str, error: Exception):
+        """
+        Registra um arquivo cuja leitura falhou
+        
+        Args:
+            name: Nome exibido do arquivo
+            error: Exceção ocorrida
+        """
+        logger.error(f"Erro ao processar arquivo {name}: {error}")
+        self.failed_files.append({
+            'arquivo': name,
+            'erro': str(error)
+        })
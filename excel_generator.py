@@ -1,13 +1,17 @@
 """
 Módulo para geração de planilhas Excel com análise de currículos
 """
+import os
 import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from typing import List, Dict, Any
 import logging
+import numpy as np
 from datetime import datetime
+from score_matrix import ScoreMatrix
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -84,6 +88,110 @@ class ExcelGenerator:
         
         return output_file
     
+    def export_skipped_to_csv(self, skipped_files: List[Dict[str, str]], output_file: str) -> str:
+        """
+        Exporta a lista de arquivos ignorados para um CSV ao lado do relatório
+        
+        Args:
+            skipped_files: Arquivos ignorados ('arquivo' e 'erro')
+            output_file: Caminho do relatório CSV principal
+            
+        Returns:
+            Caminho do arquivo gerado
+        """
+        base, extension = os.path.splitext(output_file)
+        skipped_file = f"{base}_ignorados{extension or '.csv'}"
+        
+        df = pd.DataFrame(
+            [{'Arquivo': f.get('arquivo', ''), 'Motivo': f.get('erro', '')} for f in skipped_files],
+            columns=['Arquivo', 'Motivo']
+        )
+        df.to_csv(skipped_file, index=False, encoding='utf-8-sig', sep=';')
+        logger.info(f"Arquivos ignorados salvos em: {skipped_file}")
+        
+        return skipped_file
+    
+    def create_best_fit_report(self, profile_names: List[str], profile_candidates: List[List[Dict[str, Any]]],
+                               output_file: str, format: str = 'xlsx') -> str:
+        """
+        Cria o relatório com a melhor vaga de cada candidato entre vários perfis
+        
+        Args:
+            profile_names: Nome de cada perfil
+            profile_candidates: Dados dos candidatos de cada perfil, na ordem de profile_names
+            output_file: Nome do arquivo de saída
+            format: Formato do arquivo ('xlsx' ou 'csv')
+            
+        Returns:
+            Caminho do arquivo gerado
+        """
+        df = self._create_best_fit_dataframe(profile_names, profile_candidates)
+        
+        if format.lower() == 'csv':
+            df.to_csv(output_file, index=False, encoding='utf-8-sig', sep=';')
+            logger.info(f"Relatório CSV salvo em: {output_file}")
+            return output_file
+        
+        self.workbook = Workbook()
+        self.worksheet = self.workbook.active
+        self.worksheet.title = "Melhor Vaga"
+        self._add_data_to_worksheet(df)
+        self._apply_formatting(df, {})
+        
+        self.workbook.save(output_file)
+        logger.info(f"Relatório salvo em: {output_file}")
+        
+        return output_file
+    
+    def _create_best_fit_dataframe(self, profile_names: List[str], profile_candidates: List[List[Dict[str, Any]]]) -> pd.DataFrame:
+        """
+        Cria DataFrame com a pontuação de cada candidato em cada perfil e o perfil de maior pontuação
+        
+        Candidatos são identificados pelo caminho completo do arquivo (ou do
+        membro do compactado), pois o nome pode se repetir; perfis em que o
+        candidato não foi analisado (fora da pré-triagem ou com falha) ficam em branco.
+        
+        Args:
+            profile_names: Nome de cada perfil
+            profile_candidates: Dados dos candidatos de cada perfil, na ordem de profile_names
+            
+        Returns:
+            DataFrame ordenado pela pontuação na melhor vaga (maior para menor)
+        """
+        candidates = {}
+        for name, candidates_data in zip(profile_names, profile_candidates):
+            for candidate in candidates_data:
+                key = candidate.get('caminho') or candidate.get('arquivo', '')
+                entry = candidates.setdefault(key, {
+                    'arquivo': candidate.get('arquivo', ''), 'contato': candidate.get('contato') or {}, 'pontuacoes': {}
+                })
+                entry['pontuacoes'][name] = candidate.get('pontuacao_total', 0)
+        
+        rows = []
+        for entry in candidates.values():
+            scores = entry['pontuacoes']
+            # Empates ficam com o primeiro perfil informado
+            best = max(scores, key=scores.get)
+            row = {
+                # Sem nome extraído, o arquivo identifica o candidato
+                'Nome': entry['contato'].get('nome') or entry['arquivo'],
+                'E-mail': entry['contato'].get('email') or 'Não informado',
+                'Arquivo': entry['arquivo'],
+                'Melhor Vaga': best,
+                'Pontuação Total': scores[best]
+            }
+            for name in profile_names:
+                row[f'Pontuação - {name}'] = scores.get(name, '')
+            rows.append(row)
+        
+        columns = ['Nome', 'E-mail', 'Arquivo', 'Melhor Vaga', 'Pontuação Total'] + [f'Pontuação - {name}' for name in profile_names]
+        df = pd.DataFrame(rows, columns=columns)
+        
+        # Ordenar pela pontuação na melhor vaga (maior para menor)
+        df = df.sort_values('Pontuação Total', ascending=False, kind='stable')
+        
+        return df
+    
     def _create_dataframe(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> pd.DataFrame:
         """
         Cria DataFrame com dados dos candidatos
@@ -96,6 +204,12 @@ class ExcelGenerator:
             DataFrame com dados formatados
         """
         rows = []
+        has_duplicates = any(candidate.get('duplicata_de') for candidate in candidates_data)
+        has_prescreen = any('pre_triagem' in candidate for candidate in candidates_data)
+        has_semantic = any('similaridade_semantica' in candidate for candidate in candidates_data)
+        has_compression = any('tokens_economizados' in candidate for candidate in candidates_data)
+        has_agreement = any('concordancia_texto_completo' in candidate for candidate in candidates_data)
+        has_rescoring = any('reavaliados' in candidate.get('analise', {}) for candidate in candidates_data)
         
         for candidate in candidates_data:
             row = {
@@ -114,6 +228,27 @@ class ExcelGenerator:
             # Adicionar resumo
             row['Resumo das Qualidades'] = candidate.get('analise', {}).get('resumo', '')
             
+            # Pontuação da pré-triagem BM25 (0 a 1)
+            if has_prescreen:
+                row['Pré-triagem (BM25)'] = candidate.get('pre_triagem', '')
+            if has_semantic:
+                row['Similaridade Semântica'] = candidate.get('similaridade_semantica', '')
+            
+            # Sinalizar quase duplicatas que reaproveitaram a análise de outro currículo
+            if has_duplicates:
+                row['Duplicata de'] = candidate.get('duplicata_de') or ''
+            
+            # Economia da compressão e, quando avaliada, concordância com o texto completo
+            if has_compression:
+                row['Tokens Economizados'] = candidate.get('tokens_economizados', 0)
+            if has_agreement:
+                agreement = candidate.get('concordancia_texto_completo')
+                row['Concordância c/ Texto Completo'] = f"{agreement:.0%}" if agreement is not None else ''
+            
+            # Atributos novos ou alterados no perfil; as demais notas vieram do cache
+            if has_rescoring:
+                row['Atributos Reavaliados'] = "; ".join(candidate.get('analise', {}).get('reavaliados', []))
+            
             rows.append(row)
         
         df = pd.DataFrame(rows)
@@ -166,25 +301,22 @@ class ExcelGenerator:
         """
         # Ajustar largura das colunas
         column_widths = {
-            'A': 25,  # Nome
-            'B': 30,  # E-mail
-            'C': 20,  # Telefone
-            'D': 30,  # Arquivo
-            'E': 15,  # Pontuação Total
+            'Nome': 25,
+            'E-mail': 30,
+            'Telefone': 20,
+            'Arquivo': 30,
+            'Pontuação Total': 15,
+            'Resumo das Qualidades': 50,
+            'Duplicata de': 30,
+            'Concordância c/ Texto Completo': 28,
+            'Melhor Vaga': 25,
+            'Atributos Reavaliados': 40,
         }
         
-        # Ajustar largura das colunas de notas
-        note_col_start = 6
-        for i, attr in enumerate(job_profile['requeridos'] + job_profile['desejaveis']):
-            col_letter = chr(ord('A') + note_col_start + i)
-            column_widths[col_letter] = 20
-        
-        # Ajustar largura da coluna de resumo
-        resumo_col = chr(ord('A') + len(df.columns) - 1)
-        column_widths[resumo_col] = 50
-        
-        for col_letter, width in column_widths.items():
-            self.worksheet.column_dimensions[col_letter].width = width
+        # Colunas de notas dos atributos usam a largura padrão
+        for col_num, column_name in enumerate(df.columns, 1):
+            width = column_widths.get(column_name, 20)
+            self.worksheet.column_dimensions[get_column_letter(col_num)].width = width
         
         # Adicionar bordas
         thin_border = Border(
@@ -202,15 +334,17 @@ class ExcelGenerator:
         self.worksheet.freeze_panes = 'A2'
         
         # Adicionar filtros
-        self.worksheet.auto_filter.ref = f"A1:{chr(ord('A') + len(df.columns) - 1)}{len(df) + 1}"
+        self.worksheet.auto_filter.ref = f"A1:{get_column_letter(len(df.columns))}{len(df) + 1}"
     
-    def create_summary_sheet(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]]):
+    def create_summary_sheet(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]],
+                             score_matrix: ScoreMatrix = None):
         """
         Cria planilha de resumo com estatísticas
         
         Args:
             candidates_data: Lista com dados dos candidatos
             job_profile: Perfil da vaga
+            score_matrix: Matriz de notas na ordem de candidates_data (opcional; montada se ausente)
         """
         if not self.workbook:
             return
@@ -218,9 +352,13 @@ class ExcelGenerator:
         # Criar nova planilha
         summary_sheet = self.workbook.create_sheet("Resumo")
         
+        if score_matrix is None:
+            score_matrix = ScoreMatrix.from_analyses((c.get('analise', {}) for c in candidates_data), job_profile)
+        totals = np.array([c.get('pontuacao_total', 0) for c in candidates_data], dtype=float)
+        
         # Estatísticas gerais
         total_candidates = len(candidates_data)
-        avg_score = sum(c.get('pontuacao_total', 0) for c in candidates_data) / total_candidates if total_candidates > 0 else 0
+        avg_score = totals.mean() if total_candidates > 0 else 0
         
         # Dados do resumo
         summary_data = [
@@ -232,8 +370,8 @@ class ExcelGenerator:
         ]
         
         # Top 5 candidatos
-        sorted_candidates = sorted(candidates_data, key=lambda x: x.get('pontuacao_total', 0), reverse=True)
-        for i, candidate in enumerate(sorted_candidates[:5], 1):
+        for i, position in enumerate(np.argsort(-totals, kind='stable')[:5], 1):
+            candidate = candidates_data[position]
             nome = candidate.get('contato', {}).get('nome', 'Não informado')
             score = candidate.get('pontuacao_total', 0)
             summary_data.append([f"{i}º lugar", f"{nome} - {score} pontos"])
@@ -243,19 +381,16 @@ class ExcelGenerator:
             ["ATRIBUTOS MAIS BEM AVALIADOS", ""],
         ])
         
-        # Análise por atributo
-        attribute_scores = {}
-        for candidate in candidates_data:
-            pontuacoes = candidate.get('analise', {}).get('pontuacoes', {})
-            for attr, score in pontuacoes.items():
-                if attr not in attribute_scores:
-                    attribute_scores[attr] = []
-                attribute_scores[attr].append(score)
-        
-        # Calcular média por atributo
-        for attr, scores in attribute_scores.items():
-            avg_score = sum(scores) / len(scores) if scores else 0
-            summary_data.append([attr, f"{round(avg_score, 2)} pontos"])
+        # Média e quartis por atributo, da maior para a menor média
+        means = score_matrix.attribute_means()
+        quartiles = score_matrix.attribute_percentiles((25, 50, 75))
+        attribute_scores = [column for column in np.argsort(-np.nan_to_num(means, nan=-1), kind='stable') if not np.isnan(means[column])]
+        for column in attribute_scores:
+            p25, p50, p75 = quartiles[:, column]
+            summary_data.append([
+                score_matrix.attributes[column],
+                f"{means[column]:.2f} pontos (P25 {p25:.0f}, mediana {p50:.0f}, P75 {p75:.0f})"
+            ])
         
         # Adicionar dados à planilha
         for row_num, (label, value) in enumerate(summary_data, 1):
@@ -270,3 +405,27 @@ class ExcelGenerator:
         # Ajustar largura das colunas
         summary_sheet.column_dimensions['A'].width = 30
         summary_sheet.column_dimensions['B'].width = 30
+
+    def create_skipped_sheet(self, skipped_files: List[Dict[str, str]]):
+        """
+        Cria planilha com os arquivos ignorados na extração
+        
+        Args:
+            skipped_files: Arquivos ignorados ('arquivo' e 'erro')
+        """
+        if not self.workbook:
+            return
+        
+        skipped_sheet = self.workbook.create_sheet("Arquivos Ignorados")
+        
+        for col_num, column_name in enumerate(["Arquivo", "Motivo"], 1):
+            cell = skipped_sheet.cell(row=1, column=col_num, value=column_name)
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        
+        for row_num, skipped in enumerate(skipped_files, 2):
+            skipped_sheet.cell(row=row_num, column=1, value=skipped.get('arquivo', ''))
+            skipped_sheet.cell(row=row_num, column=2, value=skipped.get('erro', ''))
+        
+        skipped_sheet.column_dimensions['A'].width = 40
+        skipped_sheet.column_dimensions['B'].width = 60
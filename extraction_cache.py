@@ -0,0 +1,212 @@
+"""
+Cache persistente de extração de documentos
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Dict, Any, Optional
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ExtractionCache:
+    """Cache em SQLite do texto extraído, endereçado pelo conteúdo do arquivo"""
+
+    def __init__(self, db_path: str = None, max_size_mb: int = None):
+        self.db_path = db_path or Config.EXTRACTION_CACHE_FILE
+        max_size_mb = Config.EXTRACTION_CACHE_MAX_MB if max_size_mb is None else max_size_mb
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._total_size = 0
+        # Último acesso das entradas lidas, gravado em uma única transação por flush()
+        self._pending_access: Dict[str, float] = {}
+
+    def __getstate__(self):
+        # Conexões SQLite não podem ser enviadas para outros processos
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_pending_access'] = {}
+        return state
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Calcula o hash SHA-256 do conteúdo de um arquivo
+
+        Args:
+            file_path: Caminho para o arquivo
+
+        Returns:
+            Hash hexadecimal do conteúdo
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """
+        Calcula o hash SHA-256 de um conteúdo em memória
+
+        Args:
+            data: Conteúdo binário
+
+        Returns:
+            Hash hexadecimal do conteúdo
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão com o banco sob demanda"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS extracoes (
+                    chave TEXT PRIMARY KEY,
+                    texto TEXT NOT NULL,
+                    contato TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON extracoes (ultimo_acesso)")
+            self._conn.commit()
+
+            row = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM extracoes").fetchone()
+            self._total_size = row[0]
+
+        return self._conn
+
+    @staticmethod
+    def _make_key(content_hash: str, extractor_version: str) -> str:
+        return f"{content_hash}:{extractor_version}"
+
+    def get(self, content_hash: str, extractor_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca uma extração no cache
+
+        Args:
+            content_hash: Hash do conteúdo do arquivo
+            extractor_version: Versão/configuração do extrator
+
+        Returns:
+            Dicionário com 'texto' e 'contato' ou None se não houver entrada
+        """
+        try:
+            conn = self._connect()
+            key = self._make_key(content_hash, extractor_version)
+            row = conn.execute("SELECT texto, contato FROM extracoes WHERE chave = ?", (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._pending_access[key] = time.time()
+            self.hits += 1
+            return {'texto': row[0], 'contato': json.loads(row[1])}
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao consultar cache de extração: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, content_hash: str, extractor_version: str, texto: str, contato: Dict[str, Optional[str]]):
+        """
+        Armazena uma extração no cache, aplicando o limite de tamanho
+
+        Args:
+            content_hash: Hash do conteúdo do arquivo
+            extractor_version: Versão/configuração do extrator
+            texto: Texto sanitizado
+            contato: Informações de contato extraídas
+        """
+        try:
+            conn = self._connect()
+            key = self._make_key(content_hash, extractor_version)
+            contato_json = json.dumps(contato, ensure_ascii=False)
+            size = len(texto.encode('utf-8')) + len(contato_json.encode('utf-8'))
+
+            previous = conn.execute("SELECT tamanho FROM extracoes WHERE chave = ?", (key,)).fetchone()
+            if previous:
+                self._total_size -= previous[0]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO extracoes (chave, texto, contato, tamanho, ultimo_acesso) VALUES (?, ?, ?, ?, ?)",
+                (key, texto, contato_json, size, time.time())
+            )
+            self._total_size += size
+
+            if self._total_size > self.max_size_bytes:
+                self._evict(conn)
+
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar no cache de extração: {e}")
+
+    def flush(self):
+        """Grava os acessos pendentes em uma única transação"""
+        if not self._pending_access:
+            return
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "UPDATE extracoes SET ultimo_acesso = ? WHERE chave = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao gravar acessos no cache de extração: {e}")
+        self._pending_access.clear()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Remove as entradas menos usadas recentemente até respeitar o limite"""
+        # A ordem LRU considera os acessos ainda não gravados
+        conn.executemany(
+            "UPDATE extracoes SET ultimo_acesso = ? WHERE chave = ?",
+            [(accessed, key) for key, accessed in self._pending_access.items()]
+        )
+        self._pending_access.clear()
+        rows = conn.execute("SELECT chave, tamanho FROM extracoes ORDER BY ultimo_acesso ASC").fetchall()
+        removed = []
+
+        for key, size in rows:
+            if self._total_size <= self.max_size_bytes:
+                break
+            removed.append((key,))
+            self._total_size -= size
+
+        conn.executemany("DELETE FROM extracoes WHERE chave = ?", removed)
+        logger.debug(f"Cache de extração: {len(removed)} entradas removidas (LRU)")
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM extracoes")
+            conn.commit()
+            self._pending_access.clear()
+            self._total_size = 0
+            logger.info("Cache de extração reconstruído do zero")
+        except sqlite3.Error as e:
+            logger.warning(f"Erro ao limpar cache de extração: {e}")
+
+    def close(self):
+        """Grava os acessos pendentes e fecha a conexão com o banco"""
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,210 @@
+"""
+Extração isolada de documentos em processos com limite de tempo e memória
+"""
+import os
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _current_address_space() -> int:
+    """Tamanho atual do espaço de endereçamento do processo (0 se indisponível)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def _sandbox_worker(conn, extract: Callable[[Any], Dict[str, Any]], max_memory_bytes: int):
+    """
+    Laço executado em cada processo de extração
+
+    Args:
+        conn: Extremidade do pipe conectada ao processo principal
+        extract: Função de extração (recebe a fonte, retorna o documento)
+        max_memory_bytes: Memória adicional permitida ao processo (0 = sem limite)
+    """
+    if max_memory_bytes and resource is not None:
+        # O limite é somado ao que o processo já ocupa após o fork/spawn
+        limit = _current_address_space() + max_memory_bytes
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            logger.debug(f"Não foi possível limitar a memória do processo de extração: {e}")
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if message is None:
+            break
+
+        task_id, source = message
+        try:
+            conn.send((task_id, extract(source), None, False))
+        except MemoryError:
+            # O processo é descartado: o heap pode ter ficado fragmentado
+            try:
+                conn.send((task_id, None, "limite de memória excedido", True))
+            except Exception:
+                pass
+            break
+        except Exception as e:
+            conn.send((task_id, None, str(e) or e.__class__.__name__, False))
+
+class _Worker:
+    """Processo de extração e a tarefa que está executando"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task_id = None
+        self.started = 0.0
+
+class ExtractionSandbox:
+    """Pool de processos de extração que mata e recicla workers travados ou sem memória"""
+
+    def __init__(self, extract: Callable[[Any], Dict[str, Any]], workers: int = 1,
+                 timeout: float = 0, max_memory_mb: int = 0):
+        self.extract = extract
+        self.workers = max(1, workers)
+        self.timeout = timeout or None
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self._context = multiprocessing.get_context()
+        self._pool: List[_Worker] = []
+        self._queue = deque()
+
+        if self.max_memory_bytes and resource is None:
+            logger.warning("Limite de memória da extração não suportado nesta plataforma")
+
+    def __enter__(self):
+        self._pool = [self._spawn() for _ in range(self.workers)]
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.shutdown()
+
+    def _spawn(self) -> _Worker:
+        """Inicia um novo processo de extração"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_sandbox_worker,
+            args=(child_conn, self.extract, self.max_memory_bytes),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _recycle(self, worker: _Worker):
+        """Mata um worker e o substitui por um processo novo"""
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join(timeout=5)
+        worker.conn.close()
+        self._pool[self._pool.index(worker)] = self._spawn()
+
+    def submit(self, task_id: Any, source: Any):
+        """
+        Enfileira uma fonte para extração
+
+        Args:
+            task_id: Identificador devolvido junto com o resultado
+            source: Fonte repassada à função de extração
+        """
+        self._queue.append((task_id, source))
+        self._dispatch()
+
+    def _dispatch(self):
+        """Envia tarefas da fila para os workers ociosos"""
+        for worker in self._pool:
+            if not self._queue:
+                break
+            if worker.task_id is None:
+                task_id, source = self._queue.popleft()
+                worker.task_id = task_id
+                worker.started = time.monotonic()
+                try:
+                    worker.conn.send((task_id, source))
+                except (OSError, ValueError):
+                    # Worker morreu ocioso; a falha aparece na próxima coleta
+                    pass
+
+    @property
+    def in_flight(self) -> int:
+        """Quantidade de tarefas enfileiradas ou em execução"""
+        return len(self._queue) + sum(1 for worker in self._pool if worker.task_id is not None)
+
+    def collect(self) -> List[Tuple[Any, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Aguarda a conclusão de ao menos uma tarefa
+
+        Returns:
+            Lista de tuplas (task_id, documento ou None, mensagem de erro ou None)
+        """
+        results = []
+
+        while not results and self.in_flight:
+            busy = [worker for worker in self._pool if worker.task_id is not None]
+            wait_timeout = None
+            if self.timeout:
+                now = time.monotonic()
+                wait_timeout = max(0.0, min(worker.started + self.timeout - now for worker in busy))
+
+            ready = wait([worker.conn for worker in busy], timeout=wait_timeout)
+            now = time.monotonic()
+
+            for worker in busy:
+                task_id = worker.task_id
+
+                if worker.conn in ready:
+                    try:
+                        _, doc_info, error, fatal = worker.conn.recv()
+                    except (EOFError, OSError):
+                        exitcode = worker.process.exitcode
+                        doc_info, error, fatal = None, f"processo de extração encerrado inesperadamente (código {exitcode})", True
+
+                    worker.task_id = None
+                    results.append((task_id, doc_info, error))
+                    if fatal:
+                        self._recycle(worker)
+                elif self.timeout and now - worker.started >= self.timeout:
+                    worker.task_id = None
+                    results.append((task_id, None, f"tempo limite de {self.timeout:g}s excedido"))
+                    self._recycle(worker)
+
+            self._dispatch()
+
+        return results
+
+    def shutdown(self):
+        """Encerra todos os workers"""
+        for worker in self._pool:
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+
+        deadline = time.monotonic() + 2
+        for worker in self._pool:
+            worker.process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join(timeout=5)
+            worker.conn.close()
+
+        self._pool = []
+        self._queue.clear()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita os endpoints da API OpenAI usados pelo TalentScan
+Permite exercitar o cliente real (chat, arquivos e lotes) sem custo e sem rede,
+inclusive em testes de carga, com latência simulada e respostas 429
+"""
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+import threading
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_SECTION_RE = re.compile(r'ATRIBUTOS (?:REQUERIDOS|DESEJÁVEIS):\n((?:- .*\n?)*)')
+_ATTRIBUTE_RE = re.compile(r'^- ([RD]\d+): (.*)$', re.MULTILINE)
+_CV_RE = re.compile(r'CURRÍCULO PARA ANÁLISE:\n(.*?)\nINSTRUÇÕES:', re.DOTALL)
+_PACKED_CV_RE = re.compile(r'=== CANDIDATO (\d+) ===\n(.*?)(?=\n=== CANDIDATO |\nINSTRUÇÕES:)', re.DOTALL)
+
+def _keyword_scores(attributes: List[Tuple[str, str]], cv_text: str) -> Dict[str, int]:
+    """Nota 5, por identificador, para atributos cujas palavras aparecem no texto; 1 caso contrário"""
+    cv_text = cv_text.lower()
+    scores = {}
+    for attr_id, attr in attributes:
+        words = [word for word in re.findall(r'\w+', attr.lower()) if len(word) > 2]
+        scores[attr_id] = 5 if words and all(word in cv_text for word in words) else 1
+    return scores
+
+def keyword_responder(body: Dict[str, Any]) -> str:
+    """
+    Resposta determinística: nota 5 para atributos cujas palavras aparecem no currículo, 1 caso contrário
+
+    Prompts com vários currículos recebem uma análise por candidato em "candidatos".
+
+    Args:
+        body: Corpo da requisição de /v1/chat/completions
+
+    Returns:
+        Conteúdo JSON da resposta do "modelo"
+    """
+    prompt = body['messages'][-1]['content']
+    attributes = [(attr_id, attr.strip()) for section in _SECTION_RE.findall(prompt) for attr_id, attr in _ATTRIBUTE_RE.findall(section)]
+
+    packed = _PACKED_CV_RE.findall(prompt)
+    if packed:
+        return json.dumps({'candidatos': [
+            {'candidato': int(number), 'pontuacoes': _keyword_scores(attributes, cv_text), 'resumo': 'Resposta do servidor local'}
+            for number, cv_text in packed
+        ]}, ensure_ascii=False)
+
+    match = _CV_RE.search(prompt)
+    cv_text = match.group(1) if match else prompt
+    return json.dumps({'pontuacoes': _keyword_scores(attributes, cv_text), 'resumo': 'Resposta do servidor local'}, ensure_ascii=False)
+
+def latency_distribution(spec: str, seed: int = None) -> Callable[[], float]:
+    """
+    Cria um gerador de latências a partir de uma especificação em milissegundos
+
+    Formatos aceitos: "fixed:MS", "uniform:MIN,MAX", "lognormal:MEDIANA,SIGMA"
+    (cauda longa, como a de uma API real) e "exponential:MÉDIA".
+
+    Args:
+        spec: Especificação da distribuição (vazia ou "0" = sem latência)
+        seed: Semente para sequências reproduzíveis (opcional)
+
+    Returns:
+        Função sem argumentos que sorteia uma latência em segundos
+
+    Raises:
+        ValueError: Especificação inválida
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    kind, _, values = (spec or '0').partition(':')
+    try:
+        params = [float(value) for value in values.split(',')] if values else []
+    except ValueError:
+        raise ValueError(f"latência inválida: {spec}") from None
+
+    if kind in ('0', 'none') and not params:
+        sample = lambda: 0.0
+    elif kind == 'fixed' and len(params) == 1:
+        sample = lambda: params[0]
+    elif kind == 'uniform' and len(params) == 2:
+        sample = lambda: rng.uniform(params[0], params[1])
+    elif kind == 'lognormal' and len(params) == 2:
+        sample = lambda: rng.lognormvariate(math.log(params[0]), params[1])
+    elif kind == 'exponential' and len(params) == 1:
+        sample = lambda: rng.expovariate(1 / params[0])
+    else:
+        raise ValueError(f"latência inválida: {spec}")
+
+    def draw() -> float:
+        # As requisições chegam em threads do servidor; o sorteio é serializado
+        with lock:
+            return max(0.0, sample()) / 1000
+    return draw
+
+class MockOpenAIServer:
+    """Servidor HTTP em segundo plano com chat completions, Files API e Batch API"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 responder: Callable[[Dict[str, Any]], str] = None, batch_polls: int = 1,
+                 latency: Callable[[], float] = None, rate_limit_ratio: float = 0.0,
+                 retry_after: float = 1.0, seed: int = None):
+        self.responder = responder or keyword_responder
+        # Consultas em andamento antes de um lote aparecer como concluído
+        self.batch_polls = batch_polls
+        # Chat completions: latência sorteada por requisição (segundos), fração de
+        # respostas 429 e o retry-after informado nelas
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.chat_requests = 0
+        self.rate_limited = 0
+        self._rng = random.Random(seed)
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[str] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+
+    def start(self):
+        """Inicia o servidor em uma thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra o servidor"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _new_id(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}-{next(self._ids)}"
+
+    def _should_rate_limit(self) -> bool:
+        """Sorteia se a requisição de chat recebe 429 e atualiza os contadores"""
+        with self._lock:
+            self.chat_requests += 1
+            limited = self.rate_limit_ratio > 0 and self._rng.random() < self.rate_limit_ratio
+            self.rate_limited += limited
+            return limited
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Monta a resposta de /v1/chat/completions"""
+        content = self.responder(body)
+        prompt_tokens = sum(len(message['content']) for message in body['messages']) // 4
+        completion_tokens = len(content) // 4
+        return {
+            'id': self._new_id('chatcmpl'),
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        }
+
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        file_id = self._new_id('file')
+        self.files[file_id] = content
+        return {'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+                'filename': filename, 'purpose': purpose, 'status': 'processed'}
+
+    def _run_batch(self, batch: Dict[str, Any]):
+        """Processa todas as requisições de um lote e grava os arquivos de saída e de erros"""
+        output, errors = [], []
+        for line in self.files[batch['input_file_id']].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                response = {'status_code': 200, 'request_id': self._new_id('req'), 'body': self.chat_completion(request['body'])}
+                output.append({'id': self._new_id('batch_req'), 'custom_id': request['custom_id'], 'response': response, 'error': None})
+            except Exception as e:
+                response = {'status_code': 500, 'request_id': self._new_id('req'), 'body': {'error': {'message': str(e)}}}
+                errors.append({'id': self._new_id('batch_req'), 'custom_id': request['custom_id'], 'response': response, 'error': None})
+
+        def to_file(lines: List[Dict[str, Any]], name: str) -> Optional[str]:
+            if not lines:
+                return None
+            content = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode('utf-8')
+            return self._store_file(content, name, 'batch_output')['id']
+
+        batch['output_file_id'] = to_file(output, 'saida.jsonl')
+        batch['error_file_id'] = to_file(errors, 'erros.jsonl')
+        batch['request_counts'] = {'total': len(output) + len(errors), 'completed': len(output), 'failed': len(errors)}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _read_body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def do_POST(self):
+                server.requests.append(f"POST {self.path}")
+                body = self._read_body()
+
+                if self.path == '/v1/chat/completions':
+                    if server._should_rate_limit():
+                        self._send_json(429, {'error': {
+                            'message': 'Rate limit reached (servidor local)', 'type': 'requests',
+                            'param': None, 'code': 'rate_limit_exceeded'
+                        }}, {'retry-after': str(server.retry_after)})
+                        return
+                    if server.latency is not None:
+                        time.sleep(server.latency())
+                    self._send_json(200, server.chat_completion(json.loads(body)))
+                elif self.path == '/v1/files':
+                    message = BytesParser(policy=default_policy).parsebytes(
+                        f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8') + body
+                    )
+                    fields, content, filename = {}, b'', 'upload.jsonl'
+                    for part in message.iter_parts():
+                        name = part.get_param('name', header='content-disposition')
+                        if name == 'file':
+                            content = part.get_payload(decode=True)
+                            filename = part.get_filename() or filename
+                        else:
+                            fields[name] = part.get_content().strip()
+                    self._send_json(200, server._store_file(content, filename, fields.get('purpose', 'batch')))
+                elif self.path == '/v1/batches':
+                    params = json.loads(body)
+                    batch = {
+                        'id': server._new_id('batch'), 'object': 'batch', 'endpoint': params['endpoint'],
+                        'input_file_id': params['input_file_id'], 'completion_window': params['completion_window'],
+                        'status': 'validating', 'created_at': int(time.time()), 'output_file_id': None,
+                        'error_file_id': None, 'polls': 0
+                    }
+                    server._run_batch(batch)
+                    server.batches[batch['id']] = batch
+                    self._send_json(200, {k: v for k, v in batch.items() if k != 'polls'})
+                else:
+                    self._send_json(404, {'error': {'message': f"rota desconhecida: {self.path}"}})
+
+            def do_GET(self):
+                server.requests.append(f"GET {self.path}")
+                parts = self.path.strip('/').split('/')
+
+                if len(parts) == 3 and parts[:2] == ['v1', 'batches'] and parts[2] in server.batches:
+                    batch = server.batches[parts[2]]
+                    batch['polls'] += 1
+                    batch['status'] = 'completed' if batch['polls'] > server.batch_polls else 'in_progress'
+                    self._send_json(200, {k: v for k, v in batch.items() if k != 'polls'})
+                elif len(parts) == 4 and parts[:2] == ['v1', 'files'] and parts[3] == 'content' and parts[2] in server.files:
+                    data = server.files[parts[2]]
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/octet-stream')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send_json(404, {'error': {'message': f"rota desconhecida: {self.path}"}})
+
+        return Handler
+
+def main():
+    """Executa o servidor local até ser interrompido"""
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API OpenAI")
+    parser.add_argument('--port', type=int, default=8765, help='Porta (padrão: 8765)')
+    parser.add_argument('--latency', default='0',
+                        help='Latência das respostas em ms: fixed:MS, uniform:MIN,MAX, lognormal:MEDIANA,SIGMA ou exponential:MÉDIA')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='Fração das requisições de chat respondidas com 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Segundos informados no retry-after das respostas 429')
+    parser.add_argument('--seed', type=int, help='Semente da latência e das respostas 429')
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        port=args.port, latency=latency_distribution(args.latency, args.seed),
+        rate_limit_ratio=args.rate_limit_ratio, retry_after=args.retry_after, seed=args.seed
+    )
+    server.start()
+    print(f"Servidor local em {server.base_url} (use OPENAI_BASE_URL={server.base_url})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
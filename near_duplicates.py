@@ -0,0 +1,138 @@
+"""
+Detecção de currículos quase duplicados com MinHash e LSH
+"""
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Primo maior que 2^32 usado nas permutações (a*x + b) mod p
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_TOKEN_RE = re.compile(r'\w+')
+
+class NearDuplicateIndex:
+    """Índice incremental de assinaturas MinHash com buckets LSH por bandas"""
+
+    def __init__(self, threshold: float = None, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm deve ser múltiplo de bands")
+
+        self.threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        # a < 2^31 e x < 2^32 garantem que a*x + b não estoura 64 bits
+        self._a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self._signatures = np.empty((256, num_perm), dtype=np.uint32)
+        self._keys: List[Any] = []
+        self._buckets: List[Dict[int, Any]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """
+        Converte o texto em hashes de 32 bits dos n-gramas de palavras
+
+        Args:
+            text: Texto sanitizado do currículo
+
+        Returns:
+            Array com os hashes únicos dos shingles
+        """
+        tokens = _TOKEN_RE.findall(text.lower())
+        size = self.shingle_size
+        if len(tokens) < size:
+            shingles = {" ".join(tokens)} if tokens else set()
+        else:
+            shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Calcula a assinatura MinHash de um texto
+
+        Args:
+            text: Texto sanitizado do currículo
+
+        Returns:
+            Assinatura com num_perm valores ou None se o texto não tiver palavras
+        """
+        hashes = self._shingles(text)
+        if hashes.size == 0:
+            return None
+
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        """Chave de bucket de cada banda da assinatura"""
+        rows = self.rows
+        return [hash(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def find_or_add(self, key: Any, text: str) -> Optional[Any]:
+        """
+        Procura um documento já indexado semelhante ao texto; se não houver, indexa o texto
+
+        Args:
+            key: Identificador do documento
+            text: Texto sanitizado do currículo
+
+        Returns:
+            Identificador do documento semelhante (acima do limiar) ou None
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        band_keys = self._band_keys(signature)
+
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, band_keys):
+            entry = bucket.get(band_key)
+            if entry is None:
+                continue
+            if isinstance(entry, list):
+                candidates.update(entry)
+            else:
+                candidates.add(entry)
+
+        if candidates:
+            indexes = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarities = (self._signatures[indexes] == signature).mean(axis=1)
+            best = int(similarities.argmax())
+            if similarities[best] >= self.threshold:
+                return self._keys[indexes[best]]
+
+        self._add(key, signature, band_keys)
+        return None
+
+    def _add(self, key: Any, signature: np.ndarray, band_keys: List[int]):
+        """Indexa uma assinatura como representante de um novo grupo"""
+        index = len(self._keys)
+        if index == len(self._signatures):
+            self._signatures = np.resize(self._signatures, (index * 2, self.num_perm))
+        self._signatures[index] = signature
+        self._keys.append(key)
+
+        for bucket, band_key in zip(self._buckets, band_keys):
+            entry = bucket.get(band_key)
+            if entry is None:
+                bucket[band_key] = index
+            elif isinstance(entry, list):
+                entry.append(index)
+            else:
+                bucket[band_key] = [entry, index]
@@ -3,11 +3,26 @@ Módulo para análise de currículos usando a API OpenAI
 """
 import os
 import json
+import math
 import re
-from typing import Dict, List, Any
-from openai import OpenAI, RateLimitError, APIError
+import time
+import random
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple, Union
+from openai import (
+    OpenAI, AsyncOpenAI, RateLimitError, APIError, APIConnectionError, APITimeoutError,
+    APIStatusError, InternalServerError
+)
 import logging
+import numpy as np
 from dotenv import load_dotenv
+from config import Config
+from cv_compressor import estimate_tokens, score_agreement
+from analysis_cache import AnalysisCache
+from score_matrix import ScoreMatrix
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -16,17 +31,432 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class OpenAIAnalyzer:
-    """Classe para análise de currículos usando OpenAI"""
+# Versão do template do prompt; altere ao mudar o prompt para invalidar o cache de análises
+PROMPT_VERSION = '3'
+
+# Modelos que aceitam saída estruturada (response_format com JSON Schema)
+STRUCTURED_OUTPUT_MODELS = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')
+# Modelos de raciocínio: recusam max_tokens e temperatura diferente da padrão
+REASONING_MODELS = ('gpt-5', 'o1', 'o3', 'o4')
+
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+def parse_reset_duration(value: str) -> float:
+    """
+    Converte durações dos cabeçalhos de limite da OpenAI ("20ms", "1s", "6m0s") em segundos
+
+    Args:
+        value: Valor do cabeçalho
+
+    Returns:
+        Duração em segundos (0 se não for possível interpretar)
+    """
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_RE.findall(value))
+
+def compile_job_profile(job_profile: Dict[str, List[str]]) -> Dict[str, str]:
+    """
+    Atribui identificadores curtos aos atributos da vaga
+
+    O prompt e a resposta usam os identificadores (R1, R2... para requeridos,
+    D1, D2... para desejáveis) no lugar do texto completo dos atributos.
+
+    Args:
+        job_profile: Perfil da vaga com atributos
+
+    Returns:
+        Dicionário ordenado identificador -> atributo
+    """
+    ids = {f"R{number}": attr for number, attr in enumerate(job_profile['requeridos'], 1)}
+    ids.update({f"D{number}": attr for number, attr in enumerate(job_profile['desejaveis'], 1)})
+    return ids
+
+class RateLimiter:
+    """
+    Limitador compartilhado de requisições e tokens por minuto (RPM/TPM)
+
+    Cada requisição reserva uma vaga e os tokens estimados antes de ser enviada.
+    A concorrência é ajustada por AIMD: cresce aos poucos enquanto as respostas
+    chegam sem erro e cai pela metade a cada 429. Enquanto os cabeçalhos
+    indicam que a cota está se esgotando, ela deixa de crescer.
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None, max_concurrency: int = None):
+        # 0 = limite desconhecido; é aprendido pelos cabeçalhos x-ratelimit-limit-*
+        self.rpm = Config.OPENAI_RPM_LIMIT if rpm is None else rpm
+        self.tpm = Config.OPENAI_TPM_LIMIT if tpm is None else tpm
+        self.max_concurrency = max(1, Config.ANALYSIS_CONCURRENCY if max_concurrency is None else max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.rate_limited = 0
+
+        now = time.monotonic()
+        self._available_requests = float(self.rpm)
+        self._available_tokens = float(self.tpm)
+        self._updated = now
+        self._blocked_until = now
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """Ajusta o teto de concorrência, mantendo o valor aprendido se for menor"""
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = min(self.concurrency, self.max_concurrency)
+
+    def _refill(self, now: float):
+        """Repõe a cota proporcionalmente ao tempo decorrido"""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._available_requests = min(self.rpm, self._available_requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._available_tokens = min(self.tpm, self._available_tokens + elapsed * self.tpm / 60)
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Tenta reservar cota para uma requisição
+
+        Returns:
+            0 se reservou; caso contrário, segundos a aguardar antes de tentar de novo
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self.in_flight >= int(self.concurrency):
+            return 0.05
+        if self.rpm and self._available_requests < 1:
+            return (1 - self._available_requests) * 60 / self.rpm
+
+        # Uma requisição maior que o TPM inteiro nunca caberia; limita a espera a um minuto
+        tokens = min(tokens, self.tpm) if self.tpm else tokens
+        if self.tpm and self._available_tokens < tokens:
+            return (tokens - self._available_tokens) * 60 / self.tpm
+
+        if self.rpm:
+            self._available_requests -= 1
+        if self.tpm:
+            self._available_tokens -= tokens
+        self.in_flight += 1
+        return 0.0
+
+    async def acquire(self, tokens: int):
+        """
+        Aguarda até haver vaga e cota para uma requisição
+
+        Args:
+            tokens: Tokens estimados da requisição (prompt + resposta máxima)
+        """
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, tokens: int, used_tokens: int = None, headers: Any = None, rate_limited: bool = False):
+        """
+        Libera a vaga de uma requisição e ajusta o limitador pelo resultado
+
+        Args:
+            tokens: Tokens reservados em acquire
+            used_tokens: Tokens efetivamente consumidos (opcional)
+            headers: Cabeçalhos HTTP da resposta (opcional)
+            rate_limited: A requisição recebeu 429
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+
+        # Devolve a diferença entre a estimativa e o consumo real
+        if used_tokens is not None and self.tpm:
+            self._available_tokens = min(self.tpm, self._available_tokens + max(0, tokens - used_tokens))
+
+        near_limit = self._update_from_headers(headers) if headers is not None else False
+
+        if rate_limited:
+            self.rate_limited += 1
+            self.concurrency = max(1.0, self.concurrency / 2)
+            retry_after = parse_reset_duration(headers.get('retry-after')) if headers is not None else 0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + (retry_after or 1.0))
+        elif not near_limit:
+            # Aumento aditivo: cerca de +1 a cada "janela" de respostas bem-sucedidas
+            self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+
+    def _update_from_headers(self, headers: Any) -> bool:
+        """
+        Sincroniza a cota com os cabeçalhos x-ratelimit-* da API
+
+        Returns:
+            True se a cota restante está abaixo de 10% do limite
+        """
+        def header_int(name: str) -> Optional[int]:
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        limit_requests = header_int('x-ratelimit-limit-requests')
+        limit_tokens = header_int('x-ratelimit-limit-tokens')
+        remaining_requests = header_int('x-ratelimit-remaining-requests')
+        remaining_tokens = header_int('x-ratelimit-remaining-tokens')
+
+        if limit_requests and limit_requests != self.rpm:
+            if not self.rpm:
+                self._available_requests = float(limit_requests)
+            self.rpm = limit_requests
+        if limit_tokens and limit_tokens != self.tpm:
+            if not self.tpm:
+                self._available_tokens = float(limit_tokens)
+            self.tpm = limit_tokens
+
+        near_limit = False
+        now = time.monotonic()
+        if remaining_requests is not None and self.rpm:
+            self._available_requests = min(self._available_requests, float(remaining_requests))
+            near_limit |= remaining_requests < 0.1 * self.rpm
+            if remaining_requests == 0:
+                reset = parse_reset_duration(headers.get('x-ratelimit-reset-requests'))
+                self._blocked_until = max(self._blocked_until, now + reset)
+        if remaining_tokens is not None and self.tpm:
+            self._available_tokens = min(self._available_tokens, float(remaining_tokens))
+            near_limit |= remaining_tokens < 0.1 * self.tpm
+
+        return near_limit
+
+class AnalysisError(Exception):
+    """Falha definitiva na análise de um currículo, após esgotar as tentativas"""
+
+    def __init__(self, message: str, attempts: int = 1):
+        super().__init__(message)
+        self.attempts = attempts
+
+class RetryPolicy:
+    """
+    Backoff exponencial com jitter e orçamento de novas tentativas
+
+    Além do limite por requisição, o total de novas tentativas fica limitado a
+    uma fração das requisições feitas, para que uma indisponibilidade da API
+    não multiplique a carga enviada a ela.
+    """
+
+    def __init__(self, max_retries: int = None, base_delay: float = None, max_delay: float = None,
+                 budget_ratio: float = 0.2, min_budget: int = 10):
+        self.max_retries = Config.ANALYSIS_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = Config.ANALYSIS_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = Config.ANALYSIS_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.requests = 0
+        self.retries = 0
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """
+        Indica se o erro é transitório
+
+        Args:
+            error: Exceção capturada
+
+        Returns:
+            True para limites de taxa, timeouts, falhas de conexão e erros 5xx
+        """
+        if isinstance(error, RateLimitError):
+            # Cota esgotada (insufficient_quota) não se resolve esperando
+            return getattr(error, 'code', None) != 'insufficient_quota'
+        if isinstance(error, (APIConnectionError, APITimeoutError, InternalServerError)):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in (408, 409) or error.status_code >= 500
+        return False
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        """
+        Decide se uma requisição que falhou deve ser repetida
+
+        Args:
+            error: Exceção capturada
+            attempt: Número da tentativa que falhou (1 = primeira)
+
+        Returns:
+            True se há nova tentativa (e ela é contabilizada no orçamento)
+        """
+        if attempt > self.max_retries or not self.is_retryable(error):
+            return False
+        if self.retries >= self.min_budget + self.budget_ratio * self.requests:
+            logger.warning("Orçamento de novas tentativas esgotado")
+            return False
+        self.retries += 1
+        return True
+
+    def next_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Tempo de espera antes da próxima tentativa ("full jitter")
+
+        Args:
+            error: Exceção capturada
+            attempt: Número da tentativa que falhou
+
+        Returns:
+            Segundos a aguardar, nunca menos que o retry-after informado pela API
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        response = getattr(error, 'response', None)
+        if response is not None:
+            delay = max(delay, parse_reset_duration(response.headers.get('retry-after')))
+        return min(delay, self.max_delay)
+
+class AnalyzerBackend(ABC):
+    """
+    Interface dos backends do analisador
+    
+    O analisador monta os prompts, interpreta as respostas e controla taxa e
+    novas tentativas; o backend decide apenas para onde vão as requisições de
+    chat completions (e os arquivos e lotes da Batch API).
+    """
+    
+    name = ''
+    
+    @abstractmethod
+    def client(self) -> OpenAI:
+        """Cria o cliente síncrono"""
     
-    def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
+    @abstractmethod
+    def async_client(self) -> AsyncOpenAI:
+        """Cria um cliente assíncrono (usado como gerenciador de contexto)"""
+    
+    def close(self):
+        """Libera os recursos do backend"""
+
+class OpenAIBackend(AnalyzerBackend):
+    """API da OpenAI ou qualquer servidor compatível (base_url)"""
+    
+    def __init__(self, api_key: str = None, base_url: str = None, max_retries: int = None):
+        api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OPENAI_API_KEY não encontrada nas variáveis de ambiente")
+        self.api_key = api_key
+        self.base_url = base_url or Config.OPENAI_BASE_URL
+        self.name = self.base_url or 'openai'
+        # None mantém as novas tentativas internas do SDK
+        self.max_retries = max_retries
+    
+    def _options(self) -> Dict[str, Any]:
+        options = {'api_key': self.api_key}
+        if self.base_url:
+            options['base_url'] = self.base_url
+        if self.max_retries is not None:
+            options['max_retries'] = self.max_retries
+        return options
+    
+    def client(self) -> OpenAI:
+        return OpenAI(**self._options())
+    
+    def async_client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(**self._options())
+
+class LocalServerBackend(OpenAIBackend):
+    """
+    Servidor local (mock_openai_server) iniciado no próprio processo
+    
+    Responde com notas determinísticas, latência sorteada e uma fração de
+    respostas 429, para medir vazão e latência do pipeline sem custo. As
+    novas tentativas internas do SDK ficam desligadas, para que os 429
+    cheguem ao limitador de taxa como chegariam da API real.
+    """
+    
+    def __init__(self, latency: str = None, rate_limit_ratio: float = None, retry_after: float = 1.0,
+                 seed: int = None):
+        from mock_openai_server import MockOpenAIServer, latency_distribution
+        
+        self.server = MockOpenAIServer(
+            latency=latency_distribution(Config.LOCAL_LATENCY if latency is None else latency, seed),
+            rate_limit_ratio=Config.LOCAL_RATE_LIMIT_RATIO if rate_limit_ratio is None else rate_limit_ratio,
+            retry_after=retry_after, seed=seed
+        )
+        self.server.start()
+        super().__init__(api_key='sk-local', base_url=self.server.base_url, max_retries=0)
+        self.name = 'local'
+    
+    def close(self):
+        self.server.stop()
+
+def create_analyzer_backend(name: str = None, **options) -> AnalyzerBackend:
+    """
+    Cria o backend do analisador configurado
+    
+    Args:
+        name: 'openai' ou 'local' (padrão: Config.ANALYZER_BACKEND)
+        **options: Parâmetros do backend (base_url para 'openai'; latency,
+            rate_limit_ratio, retry_after e seed para 'local')
+            
+    Returns:
+        Backend do analisador
+    """
+    name = name or Config.ANALYZER_BACKEND
+    if name == 'openai':
+        return OpenAIBackend(**options)
+    if name == 'local':
+        return LocalServerBackend(**options)
+    raise ValueError(f"backend do analisador desconhecido: {name}")
+
+class OpenAIAnalyzer:
+    """Classe para análise de currículos usando OpenAI"""
+    
+    def __init__(self, rpm_limit: int = None, tpm_limit: int = None, cache: AnalysisCache = None,
+                 structured_output: bool = None, backend: AnalyzerBackend = None, model: str = None,
+                 temperature: float = None, max_tokens: int = None, cascade_model: str = None,
+                 cascade_band: float = None):
+        # Padrão: API da OpenAI com OPENAI_API_KEY
+        self.backend = backend or OpenAIBackend()
+        self.client = self.backend.client()
+        
+        # Compartilhado por todas as análises assíncronas desta instância
+        self.rate_limiter = RateLimiter(rpm=rpm_limit, tpm=tpm_limit)
+        self.retry_policy = RetryPolicy()
+        self.model = model or Config.OPENAI_MODEL
+        self.temperature = Config.OPENAI_TEMPERATURE if temperature is None else temperature
+        # Teto de tokens da resposta de um candidato
+        self.max_tokens = Config.OPENAI_MAX_TOKENS if max_tokens is None else max_tokens
+        # Saída estruturada (None = conforme o modelo); sem ela, o modelo recebe o modo JSON e respostas inválidas geram AnalysisError
+        self.structured_output = structured_output
+        
+        # Cache opcional de respostas: reexecuções com os mesmos dados não chamam a API
+        self.cache = cache
+        
+        # Tokens de prompt do modo empacotado, comparados com a estimativa do modo individual
+        self.packing_stats = {
+            'requisicoes': 0, 'candidatos': 0, 'tamanho': 0, 'reanalisados': 0,
+            'tokens_prompt': 0, 'tokens_prompt_individual': 0
+        }
+        
+        # Notas por atributo reaproveitadas do cache e atributos reavaliados (atributo -> candidatos)
+        self.rescoring_stats = {'candidatos': 0, 'sem_requisicao': 0, 'notas_reaproveitadas': 0, 'reavaliados': {}}
+        
+        # Análises interpretadas, respostas inválidas e tempo total de interpretação
+        self.parse_stats = {'respostas': 0, 'falhas': 0, 'segundos': 0.0}
+        
+        # Duração (s) de cada requisição bem-sucedida à API, para os percentis de latência
+        self.request_latencies: List[float] = []
         
-        # Configurar cliente OpenAI com a sintaxe correta
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-3.5-turbo"
+        # Cascata: candidatos perto do corte são reanalisados por um modelo mais forte.
+        # O segundo nível tem limitador próprio, pois a API limita RPM/TPM por modelo.
+        cascade_model = Config.CASCADE_MODEL if cascade_model is None else cascade_model
+        self.cascade_band = Config.CASCADE_BAND if cascade_band is None else cascade_band
+        self.escalation: Optional['OpenAIAnalyzer'] = None
+        if cascade_model and cascade_model != self.model:
+            self.escalation = OpenAIAnalyzer(
+                cache=cache, structured_output=structured_output, backend=self.backend, model=cascade_model,
+                temperature=temperature, max_tokens=max_tokens, cascade_model=''
+            )
+        
+        # Comparação entre os níveis da cascata
+        self.cascade_stats = {
+            'analisados': 0, 'escalados': 0, 'falhas': 0, 'comparados': 0, 'notas_iguais': 0.0,
+            'decisoes_iguais': 0, 'diferenca': 0.0
+        }
     
     def parse_job_profile(self, profile_text: str) -> Dict[str, List[str]]:
         """
@@ -73,32 +503,285 @@ class OpenAIAnalyzer:
             'desejaveis': desired_attributes
         }
     
-    def analyze_cv(self, cv_text: str, job_profile: Dict[str, List[str]]) -> Dict[str, Any]:
+    @staticmethod
+    def _sanitize_cv_text(cv_text: str, max_length: int) -> str:
         """
-        Analisa um currículo em relação ao perfil da vaga
+        Prepara o texto do currículo para o prompt
         
         Args:
             cv_text: Texto do currículo
+            max_length: Limite de caracteres (0 = texto completo)
+            
+        Returns:
+            Texto sanitizado e truncado
+        """
+        # Sanitize input to prevent prompt injection and limit length
+        # Remove potential prompt injection markers
+        safe_cv_text = cv_text.replace("```", "").replace("System:", "").replace("User:", "")
+        
+        # Limit length strictly
+        if max_length and len(safe_cv_text) > max_length:
+            safe_cv_text = safe_cv_text[:max_length] + "... (truncated)"
+        
+        return safe_cv_text
+    
+    def _cache_key(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int,
+                   packed: bool = False) -> Optional[str]:
+        """Chave da análise no cache (None se o cache estiver desativado)"""
+        if self.cache is None:
+            return None
+        # Análises feitas em requisições empacotadas usam outro prompt e ficam separadas
+        prompt_version = f"{PROMPT_VERSION}-empacotado" if packed else PROMPT_VERSION
+        if self.uses_structured_output():
+            prompt_version += "-json-schema"
+        return self.cache.make_key(
+            self._sanitize_cv_text(cv_text, max_length), job_profile, self.model, self.temperature,
+            self._max_tokens(job_profile), prompt_version
+        )
+    
+    def _score_key(self, cv_text: str, max_length: int, source_text: str = None) -> Optional[str]:
+        """
+        Chave do currículo no cache de notas por atributo (None se o cache estiver desativado)
+        
+        Usa o texto extraído do documento (source_text), e não o texto enviado
+        no prompt: a compressão escolhe trechos pelos atributos do perfil, e a
+        chave precisa sobreviver a mudanças no perfil. Notas de textos
+        comprimidos ficam separadas das da linha de base com texto completo.
+        
+        Args:
+            cv_text: Texto enviado no prompt
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            source_text: Texto extraído do documento (padrão: cv_text)
+        """
+        if self.cache is None:
+            return None
+        if source_text is None:
+            source_text = cv_text
+        # Notas de requisições individuais e empacotadas são intercambiáveis
+        prompt_version = f"{PROMPT_VERSION}-json-schema" if self.uses_structured_output() else PROMPT_VERSION
+        return self.cache.make_candidate_key(source_text, self.model, self.temperature, prompt_version, max_length,
+                                             compressed=source_text != cv_text)
+    
+    @staticmethod
+    def _attribute_lists(job_profile: Dict[str, List[str]]) -> Tuple[str, str]:
+        """Linhas "- R1: atributo" dos atributos requeridos e desejáveis para o prompt"""
+        ids = compile_job_profile(job_profile)
+        required_attrs = '\n'.join(f"- {attr_id}: {attr}" for attr_id, attr in ids.items() if attr_id.startswith('R'))
+        desired_attrs = '\n'.join(f"- {attr_id}: {attr}" for attr_id, attr in ids.items() if attr_id.startswith('D'))
+        return required_attrs, desired_attrs
+    
+    def _max_tokens(self, job_profile: Dict[str, List[str]]) -> int:
+        """
+        Limite de tokens da resposta de um candidato
+        
+        Cada nota ("R12": 5,) ocupa poucos tokens; o restante cobre o resumo
+        de até 3 frases e a estrutura do JSON. O resultado não passa de
+        OPENAI_MAX_TOKENS.
+        """
+        return min(self.max_tokens, 150 + 8 * (len(job_profile['requeridos']) + len(job_profile['desejaveis'])))
+    
+    def uses_reasoning_parameters(self) -> bool:
+        """Indica se o modelo pede max_completion_tokens e não aceita ajuste de temperatura"""
+        return self.model.startswith(REASONING_MODELS)
+    
+    def uses_structured_output(self) -> bool:
+        """Indica se as requisições pedem saída estruturada (JSON Schema)"""
+        if self.structured_output is not None:
+            return self.structured_output
+        return self.model.startswith(STRUCTURED_OUTPUT_MODELS)
+    
+    @staticmethod
+    def _analysis_schema(job_profile: Dict[str, List[str]]) -> Dict[str, Any]:
+        """JSON Schema da análise de um candidato, com uma nota por identificador de atributo"""
+        ids = list(compile_job_profile(job_profile))
+        return {
+            'type': 'object',
+            'properties': {
+                'pontuacoes': {
+                    'type': 'object',
+                    'properties': {attr_id: {'type': 'integer', 'enum': [1, 2, 3, 4, 5]} for attr_id in ids},
+                    'required': ids,
+                    'additionalProperties': False
+                },
+                'resumo': {'type': 'string'}
+            },
+            'required': ['pontuacoes', 'resumo'],
+            'additionalProperties': False
+        }
+    
+    def _response_format(self, job_profile: Dict[str, List[str]], packed: bool = False) -> Dict[str, Any]:
+        """
+        Parâmetro response_format da requisição
+        
+        Args:
             job_profile: Perfil da vaga com atributos
+            packed: Resposta com vários candidatos
             
         Returns:
-            Dicionário com análise e pontuação
+            Formato com JSON Schema estrito, ou modo JSON se o modelo não aceitar saída estruturada
         """
-        try:
-            # Sanitize input to prevent prompt injection and limit length
-            # Remove potential prompt injection markers
-            safe_cv_text = cv_text.replace("```", "").replace("System:", "").replace("User:", "")
+        if not self.uses_structured_output():
+            # O prompt já pede JSON, exigência do modo json_object
+            return {'type': 'json_object'}
+        
+        schema = self._analysis_schema(job_profile)
+        name = 'analise_curriculo'
+        if packed:
+            schema['properties']['candidato'] = {'type': 'integer'}
+            schema['required'] = ['candidato'] + schema['required']
+            schema = {
+                'type': 'object',
+                'properties': {'candidatos': {'type': 'array', 'items': schema}},
+                'required': ['candidatos'],
+                'additionalProperties': False
+            }
+            name = 'analise_curriculos'
+        return {'type': 'json_schema', 'json_schema': {'name': name, 'strict': True, 'schema': schema}}
+    
+    @staticmethod
+    def _validate_analysis(data: Any, ids: Dict[str, str], extra_keys: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Valida e normaliza uma análise em uma única passagem
+        
+        As chaves das notas são identificadores (ou o texto exato do atributo) e
+        são convertidas nos nomes dos atributos; as notas viram inteiros de 1 a 5.
+        
+        Args:
+            data: Objeto JSON decodificado
+            ids: Identificadores dos atributos (compile_job_profile)
+            extra_keys: Chaves adicionais permitidas no objeto
             
-            # Limit length strictly
-            max_length = 3000
-            if len(safe_cv_text) > max_length:
-                safe_cv_text = safe_cv_text[:max_length] + "... (truncated)"
-
-            # Preparar prompt para análise
-            required_attrs = '\n'.join([f"- {attr}" for attr in job_profile['requeridos']])
-            desired_attrs = '\n'.join([f"- {attr}" for attr in job_profile['desejaveis']])
+        Returns:
+            Análise com 'pontuacoes' e 'resumo'
             
-            prompt = f"""
+        Raises:
+            ValueError: Chaves desconhecidas, notas ausentes ou não numéricas
+        """
+        if not isinstance(data, dict):
+            raise ValueError("a análise não é um objeto JSON")
+        unknown = set(data) - {'pontuacoes', 'resumo', *extra_keys}
+        if unknown:
+            raise ValueError(f"chaves desconhecidas: {', '.join(sorted(map(str, unknown)))}")
+        
+        raw_scores = data.get('pontuacoes')
+        if not isinstance(raw_scores, dict):
+            raise ValueError("'pontuacoes' ausente ou inválido")
+        summary = data.get('resumo', '')
+        if not isinstance(summary, str):
+            raise ValueError("'resumo' não é texto")
+        
+        names = set(ids.values())
+        scores = {}
+        for key, value in raw_scores.items():
+            attr = ids.get(key.strip().upper(), key if key in names else None)
+            if attr is None:
+                raise ValueError(f"atributo desconhecido: {key}")
+            if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                raise ValueError(f"nota inválida para {key}")
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"nota inválida para {key}") from None
+            if not math.isfinite(number):
+                raise ValueError(f"nota inválida para {key}")
+            scores[attr] = min(5, max(1, int(round(number))))
+        
+        if len(scores) < len(names):
+            missing = [attr_id for attr_id, attr in ids.items() if attr not in scores]
+            raise ValueError(f"notas ausentes: {', '.join(missing)}")
+        
+        return {'pontuacoes': scores, 'resumo': summary}
+    
+    @staticmethod
+    def _load_json(response_text: str) -> Any:
+        """Decodifica o JSON da resposta, removendo um eventual bloco de código markdown"""
+        response_text = response_text.strip()
+        if response_text.startswith('```'):
+            response_text = response_text.split('\n', 1)[1] if '\n' in response_text else ''
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        return json.loads(response_text)
+    
+    def _record_parse(self, started: float, count: int = 1, failures: int = 0):
+        """Acumula as métricas de interpretação das respostas"""
+        self.parse_stats['respostas'] += count
+        self.parse_stats['falhas'] += failures
+        self.parse_stats['segundos'] += time.perf_counter() - started
+    
+    def log_request_metrics(self):
+        """Registra o número de requisições, os percentis de latência e as respostas 429 de cada modelo"""
+        if self.request_latencies:
+            p50, p95, p99 = 1000 * np.percentile(self.request_latencies, [50, 95, 99])
+            logger.info(
+                f"Requisições ao modelo {self.model} ({self.backend.name}): {len(self.request_latencies)} concluídas, "
+                f"latência p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms; "
+                f"{self.rate_limiter.rate_limited} respostas 429"
+            )
+        if self.escalation is not None:
+            self.escalation.log_request_metrics()
+    
+    def log_cascade_metrics(self):
+        """Registra quantos candidatos foram escalados e a concordância entre os modelos"""
+        stats = self.cascade_stats
+        if self.escalation is None or not stats['analisados']:
+            return
+        message = (
+            f"Cascata {self.model} -> {self.escalation.model}: {stats['escalados']} de {stats['analisados']} "
+            f"candidatos na faixa de incerteza ({Config.MIN_SCORE_THRESHOLD} ± {self.cascade_band})"
+        )
+        if stats['falhas']:
+            message += f"; {stats['falhas']} reanálises falharam e mantiveram a análise de {self.model}"
+        if stats['comparados']:
+            message += (
+                f"; concordância entre os modelos: {100 * stats['notas_iguais'] / stats['comparados']:.1f}% das notas iguais, "
+                f"{stats['decisoes_iguais']} de {stats['comparados']} decisões iguais em relação ao corte, "
+                f"diferença média na pontuação total de {stats['diferenca'] / stats['comparados']:.2f}"
+            )
+        logger.info(message)
+    
+    def log_rescoring_metrics(self):
+        """Registra as notas por atributo reaproveitadas e os atributos reavaliados"""
+        stats = self.rescoring_stats
+        if stats['candidatos']:
+            reevaluated = ", ".join(f"'{attr}' ({count})" for attr, count in stats['reavaliados'].items())
+            logger.info(
+                f"Notas por atributo ({self.model}): {stats['notas_reaproveitadas']} notas reaproveitadas em "
+                f"{stats['candidatos']} candidatos, {stats['sem_requisicao']} sem nova requisição"
+                + (f"; atributos reavaliados (candidatos): {reevaluated}" if reevaluated else "")
+            )
+        if self.escalation is not None:
+            self.escalation.log_rescoring_metrics()
+    
+    def log_parse_metrics(self):
+        """Registra a taxa de respostas inválidas e o tempo médio de interpretação de cada modelo"""
+        stats = self.parse_stats
+        if stats['respostas']:
+            logger.info(
+                f"Respostas do modelo {self.model}: {stats['respostas']} análises interpretadas, "
+                f"{stats['falhas']} inválidas ({100 * stats['falhas'] / stats['respostas']:.1f}%), "
+                f"{1000 * stats['segundos'] / stats['respostas']:.2f} ms em média"
+            )
+        if self.escalation is not None:
+            self.escalation.log_parse_metrics()
+    
+    def _build_messages(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int) -> List[Dict[str, str]]:
+        """
+        Monta as mensagens enviadas ao modelo para analisar um currículo
+        
+        Args:
+            cv_text: Texto do currículo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres do currículo (0 = texto completo)
+            
+        Returns:
+            Lista de mensagens (system e user)
+        """
+        safe_cv_text = self._sanitize_cv_text(cv_text, max_length)
+
+        # Preparar prompt para análise
+        required_attrs, desired_attrs = self._attribute_lists(job_profile)
+        
+        prompt = f"""
 Você é um especialista em RH analisando currículos. Analise o seguinte currículo em relação ao perfil da vaga e forneça uma pontuação de 1 a 5 para cada atributo (5 = muito aderente, 1 = não aderente).
 
 PERFIL DA VAGA:
@@ -114,13 +797,13 @@ CURRÍCULO PARA ANÁLISE:
 
 INSTRUÇÕES:
 1. Para cada atributo requerido e desejável, atribua uma nota de 1 a 5
-2. Forneça um resumo das qualidades do candidato em relação ao perfil
+2. Forneça um resumo de até 3 frases das qualidades do candidato em relação ao perfil
 3. Seja objetivo e baseie-se apenas nas informações presentes no currículo
-4. Responda em formato JSON com a seguinte estrutura:
+4. Use os identificadores dos atributos (R1, D1...) como chaves e responda em formato JSON com a seguinte estrutura:
 {{
     "pontuacoes": {{
-        "atributo1": nota,
-        "atributo2": nota,
+        "R1": nota,
+        "D1": nota,
         ...
     }},
     "resumo": "Resumo das qualidades do candidato em relação ao perfil da vaga"
@@ -128,141 +811,803 @@ INSTRUÇÕES:
 
 Responda APENAS com o JSON, sem texto adicional.
 """
+        
+        return [
+            {"role": "system", "content": "Você é um especialista em RH que analisa currículos de forma objetiva e precisa."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_response(self, response_text: str, job_profile: Dict[str, List[str]], cache_key: str = None,
+                        score_key: str = None) -> Dict[str, Any]:
+        """
+        Converte a resposta do modelo em análise
+        
+        Args:
+            response_text: Conteúdo da resposta
+            job_profile: Perfil da vaga com atributos
+            cache_key: Chave para guardar a análise no cache (opcional)
+            score_key: Chave para guardar as notas no cache de notas por atributo (opcional)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um especialista em RH que analisa currículos de forma objetiva e precisa."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
-            )
+        Returns:
+            Dicionário com análise e pontuação
             
-            response_text = response.choices[0].message.content.strip()
+        Raises:
+            AnalysisError: Resposta inválida (o item vai para a fila de reprocessamento)
+        """
+        started = time.perf_counter()
+        try:
+            analysis = self._validate_analysis(self._load_json(response_text), compile_job_profile(job_profile))
+        except ValueError as e:
+            self._record_parse(started, failures=1)
+            logger.error(f"Resposta inválida do modelo: {e}")
+            # Avoid logging full response text if it might contain PII reflected from input
+            logger.debug(f"Resposta recebida (truncada): {response_text[:100]}...")
+            raise AnalysisError(f"resposta inválida do modelo: {e}")
+        
+        self._record_parse(started)
+        # Apenas respostas válidas são reaproveitadas
+        if cache_key is not None:
+            self.cache.put(cache_key, analysis)
+        if score_key is not None:
+            self.cache.put_scores(score_key, analysis)
+        return analysis
+    
+    def _request_params(self, job_profile: Dict[str, List[str]], messages: List[Dict[str, str]],
+                        max_tokens: int = None, packed: bool = False) -> Dict[str, Any]:
+        """
+        Parâmetros de chat.completions.create (também usados como corpo na Batch API)
+        
+        Args:
+            job_profile: Perfil da vaga com atributos
+            messages: Mensagens do prompt
+            max_tokens: Máximo de tokens da resposta (padrão: calculado pelo número de atributos)
+            packed: Requisição com vários candidatos
             
-            # Tentar extrair JSON da resposta
+        Returns:
+            Dicionário de parâmetros
+        """
+        max_tokens = self._max_tokens(job_profile) if max_tokens is None else max_tokens
+        params = {
+            'model': self.model,
+            'messages': messages,
+            'response_format': self._response_format(job_profile, packed)
+        }
+        if self.uses_reasoning_parameters():
+            params['max_completion_tokens'] = max_tokens
+        else:
+            params['max_tokens'] = max_tokens
+            params['temperature'] = self.temperature
+        return params
+    
+    @staticmethod
+    def _completion_tokens(params: Dict[str, Any]) -> int:
+        """Máximo de tokens da resposta pedido em uma requisição"""
+        return params.get('max_completion_tokens', params.get('max_tokens', 0))
+    
+    @staticmethod
+    def _prompt_tokens(messages: List[Dict[str, str]]) -> int:
+        """Estimativa de tokens das mensagens de um prompt"""
+        return sum(estimate_tokens(message['content']) for message in messages)
+    
+    def _build_packed_messages(self, cv_texts: List[str], job_profile: Dict[str, List[str]],
+                               max_length: int) -> List[Dict[str, str]]:
+        """
+        Monta as mensagens de uma requisição com vários currículos
+        
+        Instruções e atributos aparecem uma única vez; cada currículo recebe um
+        número e o modelo responde com uma lista de análises.
+        
+        Args:
+            cv_texts: Textos dos currículos
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres de cada currículo (0 = texto completo)
+            
+        Returns:
+            Lista de mensagens (system e user)
+        """
+        required_attrs, desired_attrs = self._attribute_lists(job_profile)
+        
+        # O marcador de separação é removido do texto para um currículo não se passar por outro
+        candidates = '\n\n'.join(
+            f"=== CANDIDATO {number} ===\n{self._sanitize_cv_text(cv_text, max_length).replace('===', '')}"
+            for number, cv_text in enumerate(cv_texts, 1)
+        )
+        
+        prompt = f"""
+Você é um especialista em RH analisando currículos. Analise cada um dos {len(cv_texts)} currículos abaixo em relação ao perfil da vaga e forneça uma pontuação de 1 a 5 para cada atributo (5 = muito aderente, 1 = não aderente).
+
+PERFIL DA VAGA:
+
+ATRIBUTOS REQUERIDOS:
+{required_attrs}
+
+ATRIBUTOS DESEJÁVEIS:
+{desired_attrs}
+
+CURRÍCULOS PARA ANÁLISE:
+{candidates}
+
+INSTRUÇÕES:
+1. Avalie cada candidato de forma independente, sem comparar com os demais
+2. Para cada atributo requerido e desejável, atribua uma nota de 1 a 5
+3. Forneça um resumo de até 3 frases das qualidades de cada candidato em relação ao perfil
+4. Seja objetivo e baseie-se apenas nas informações presentes em cada currículo
+5. Use os identificadores dos atributos (R1, D1...) como chaves e responda em formato JSON, com um objeto por candidato na mesma ordem:
+{{
+    "candidatos": [
+        {{
+            "candidato": 1,
+            "pontuacoes": {{
+                "R1": nota,
+                "D1": nota,
+                ...
+            }},
+            "resumo": "Resumo das qualidades do candidato em relação ao perfil da vaga"
+        }},
+        ...
+    ]
+}}
+
+Responda APENAS com o JSON, sem texto adicional.
+"""
+        
+        return [
+            {"role": "system", "content": "Você é um especialista em RH que analisa currículos de forma objetiva e precisa."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_packed_response(self, response_text: str, job_profile: Dict[str, List[str]],
+                               count: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Converte a resposta de uma requisição empacotada em análises
+        
+        Args:
+            response_text: Conteúdo da resposta
+            job_profile: Perfil da vaga com atributos
+            count: Número de currículos enviados
+            
+        Returns:
+            Análises na ordem dos currículos; None para candidatos ausentes ou inválidos
+        """
+        started = time.perf_counter()
+        analyses = [None] * count
+        try:
+            entries = self._load_json(response_text)
+        except ValueError as e:
+            self._record_parse(started, count, failures=count)
+            logger.error(f"Erro ao decodificar JSON da resposta empacotada: {e}")
+            return analyses
+        
+        if isinstance(entries, dict):
+            entries = entries.get('candidatos')
+        if not isinstance(entries, list):
+            entries = []
+        
+        ids = compile_job_profile(job_profile)
+        for entry in entries:
+            number = entry.get('candidato') if isinstance(entry, dict) else None
+            # Números fora do intervalo ou repetidos não são atribuídos a ninguém
+            if isinstance(number, bool) or not isinstance(number, int) or not 1 <= number <= count or analyses[number - 1] is not None:
+                continue
             try:
-                # Remover possíveis markdown code blocks
-                if response_text.startswith('```json'):
-                    response_text = response_text[7:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
+                analyses[number - 1] = self._validate_analysis(entry, ids, extra_keys=('candidato',))
+            except ValueError as e:
+                logger.warning(f"Análise do candidato {number} inválida na resposta empacotada: {e}")
+        
+        self._record_parse(started, count, failures=analyses.count(None))
+        return analyses
+    
+    def packing_size(self, cv_texts: List[str], job_profile: Dict[str, List[str]], max_length: int = 3000) -> int:
+        """
+        Calcula quantos currículos cabem em uma requisição empacotada
+        
+        O prompt fixo é contado uma vez; cada currículo soma o maior texto do
+        grupo e a resposta esperada. O total precisa caber na janela de contexto
+        do modelo (com 10% de margem) e as respostas no limite de saída.
+        
+        Args:
+            cv_texts: Textos dos currículos
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres de cada currículo (0 = texto completo)
+            
+        Returns:
+            Número de currículos por requisição (no mínimo 1)
+        """
+        if not cv_texts:
+            return 1
+        
+        overhead = self._prompt_tokens(self._build_packed_messages([], job_profile, max_length))
+        per_output = self._max_tokens(job_profile)
+        # Rótulo "=== CANDIDATO N ===" incluído
+        per_input = max(estimate_tokens(self._sanitize_cv_text(cv_text, max_length)) for cv_text in cv_texts) + 8
+        
+        size = (int(Config.MODEL_CONTEXT_TOKENS * 0.9) - overhead) // (per_input + per_output)
+        size = min(size, Config.MODEL_MAX_OUTPUT_TOKENS // per_output, Config.PACK_MAX_SIZE)
+        return max(1, size)
+    
+    def _analysis_error(self, error: Exception, attempts: int) -> 'AnalysisError':
+        """
+        Registra uma falha definitiva na análise
+        
+        Args:
+            error: Última exceção capturada
+            attempts: Número de tentativas realizadas
+            
+        Returns:
+            Exceção a ser propagada
+        """
+        if isinstance(error, AnalysisError):
+            return error
+        
+        if isinstance(error, RateLimitError):
+            logger.error(f"Erro de Cota/Limite na API OpenAI: {error}")
+        elif isinstance(error, APIError):
+            logger.error(f"Erro na API OpenAI: {error}")
+        else:
+            logger.error(f"Erro na análise do currículo: {str(error)}")
+        
+        message = f"{error.__class__.__name__}: {error}" if str(error) else error.__class__.__name__
+        return AnalysisError(message, attempts)
+    
+    def analyze_cv(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int = 3000) -> Dict[str, Any]:
+        """
+        Analisa um currículo em relação ao perfil da vaga
+        
+        Falhas transitórias da API são repetidas com backoff exponencial.
+        
+        Args:
+            cv_text: Texto do currículo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            
+        Returns:
+            Dicionário com análise e pontuação
+            
+        Raises:
+            AnalysisError: Se a análise falhar após esgotar as tentativas
+        """
+        cache_key = self._cache_key(cv_text, job_profile, max_length)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        params = self._request_params(job_profile, self._build_messages(cv_text, job_profile, max_length))
+        self.retry_policy.requests += 1
+        
+        for attempt in itertools.count(1):
+            try:
+                started = time.perf_counter()
+                response = self.client.chat.completions.create(**params)
+                self.request_latencies.append(time.perf_counter() - started)
                 
-                analysis = json.loads(response_text)
-                return analysis
+                return self._parse_response(response.choices[0].message.content, job_profile, cache_key,
+                                            self._score_key(cv_text, max_length))
                 
-            except json.JSONDecodeError as e:
-                logger.error(f"Erro ao decodificar JSON da resposta: {e}")
-                # Avoid logging full response text if it might contain PII reflected from input
-                logger.debug(f"Resposta recebida (truncada): {response_text[:100]}...")
+            except Exception as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise self._analysis_error(e, attempt) from e
                 
-                # Fallback: tentar extrair informações manualmente
-                return self._extract_analysis_fallback(response_text, job_profile)
+                delay = self.retry_policy.next_delay(e, attempt)
+                logger.warning(f"Tentativa {attempt} falhou ({e.__class__.__name__}); nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+    
+    async def analyze_cv_async(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int = 3000,
+                               client: AsyncOpenAI = None, source_text: str = None) -> Dict[str, Any]:
+        """
+        Versão assíncrona de analyze_cv
+        
+        Args:
+            cv_text: Texto do currículo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            client: Cliente assíncrono compartilhado (opcional)
+            source_text: Texto extraído do documento, se cv_text for uma versão comprimida (chave das notas por atributo)
+            
+        Returns:
+            Dicionário com análise e pontuação
+            
+        Raises:
+            AnalysisError: Se a análise falhar após esgotar as tentativas
+        """
+        if client is None:
+            async with self.backend.async_client() as client:
+                return await self.analyze_cv_async(cv_text, job_profile, max_length, client, source_text)
+        
+        cache_key = self._cache_key(cv_text, job_profile, max_length)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        params = self._request_params(job_profile, self._build_messages(cv_text, job_profile, max_length))
+        # O TPM da API conta o prompt e o máximo de tokens da resposta
+        estimated_tokens = self._prompt_tokens(params['messages']) + self._completion_tokens(params)
+        self.retry_policy.requests += 1
+        
+        response = await self._with_retries(lambda: self._request_async(client, params, estimated_tokens))
+        return self._parse_response(response.choices[0].message.content, job_profile, cache_key,
+                                    self._score_key(cv_text, max_length, source_text))
+    
+    async def _with_retries(self, send):
+        """
+        Executa uma requisição assíncrona repetindo falhas transitórias com backoff
+        
+        Args:
+            send: Função sem argumentos que cria a corrotina da requisição
+            
+        Returns:
+            Resposta da API
+            
+        Raises:
+            AnalysisError: Se a requisição falhar após esgotar as tentativas
+        """
+        for attempt in itertools.count(1):
+            try:
+                return await send()
+                
+            except Exception as e:
+                if not self.retry_policy.should_retry(e, attempt):
+                    raise self._analysis_error(e, attempt) from e
                 
+                delay = self.retry_policy.next_delay(e, attempt)
+                logger.warning(f"Tentativa {attempt} falhou ({e.__class__.__name__}); nova tentativa em {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _request_async(self, client: AsyncOpenAI, params: Dict[str, Any], estimated_tokens: int):
+        """
+        Envia uma requisição passando pelo limitador de taxa
+        
+        Args:
+            client: Cliente assíncrono
+            params: Parâmetros de chat.completions.create (_request_params)
+            estimated_tokens: Tokens reservados no limitador
+            
+        Returns:
+            Resposta da API já interpretada
+        """
+        await self.rate_limiter.acquire(estimated_tokens)
+        started = time.perf_counter()
+        try:
+            raw_response = await client.chat.completions.with_raw_response.create(**params)
         except RateLimitError as e:
-            logger.error(f"Erro de Cota/Limite na API OpenAI: {e}")
-            print("\n⚠️  ERRO CRÍTICO: Cota da API OpenAI excedida ou limite atingido.")
-            print("   Por favor, verifique seu plano e detalhes de cobrança em: https://platform.openai.com/account/billing")
-            print("   A análise continuará com valores padrão para não interromper o fluxo, mas os resultados não serão precisos.\n")
-            return self._create_default_analysis(job_profile)
+            self.rate_limiter.release(estimated_tokens, headers=e.response.headers, rate_limited=True)
+            raise
+        except Exception:
+            self.rate_limiter.release(estimated_tokens)
+            raise
+        
+        self.request_latencies.append(time.perf_counter() - started)
+        response = raw_response.parse()
+        usage = getattr(response, 'usage', None)
+        used_tokens = getattr(usage, 'total_tokens', None)
+        self.rate_limiter.release(
+            estimated_tokens,
+            used_tokens=used_tokens if isinstance(used_tokens, int) else None,
+            headers=raw_response.headers
+        )
+        return response
+    
+    def analyze_many(self, cv_texts: List[str], job_profile: Dict[str, List[str]], concurrency: int = None,
+                     max_length: int = 3000, pack_size: int = 1,
+                     source_texts: List[str] = None) -> List[Union[Dict[str, Any], 'AnalysisError']]:
+        """
+        Analisa vários currículos com requisições simultâneas à API
+        
+        Args:
+            cv_texts: Textos dos currículos
+            job_profile: Perfil da vaga com atributos
+            concurrency: Máximo de requisições em andamento (padrão: Config.ANALYSIS_CONCURRENCY)
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            pack_size: Currículos por requisição (1 = um por requisição; 0 = calculado pela janela de contexto)
+            source_texts: Textos extraídos dos documentos, quando cv_texts são versões comprimidas
+                (chaves das notas por atributo; padrão: os próprios cv_texts)
             
-        except APIError as e:
-            logger.error(f"Erro na API OpenAI: {e}")
-            return self._create_default_analysis(job_profile)
-
-        except Exception as e:
-            logger.error(f"Erro na análise do currículo: {str(e)}")
-            return self._create_default_analysis(job_profile)
+        Returns:
+            Análises na mesma ordem dos textos recebidos; currículos cuja análise
+            falhou definitivamente recebem um AnalysisError na sua posição
+        """
+        if not cv_texts:
+            return []
+        
+        concurrency = Config.ANALYSIS_CONCURRENCY if concurrency is None else concurrency
+        sources = None if source_texts is None else list(source_texts)
+        return asyncio.run(self._analyze_many(list(cv_texts), job_profile, max(1, concurrency), max_length, pack_size, sources))
     
-    def _extract_analysis_fallback(self, response_text: str, job_profile: Dict[str, List[str]]) -> Dict[str, Any]:
+    def analyze_many_profiles(self, groups: List[Tuple[List[str], Dict[str, List[str]]]], concurrency: int = None,
+                              max_length: int = 3000, pack_size: int = 1,
+                              source_texts: List[List[str]] = None) -> List[List[Union[Dict[str, Any], 'AnalysisError']]]:
         """
-        Extrai análise de forma manual quando o JSON falha
+        Analisa currículos de vários perfis de vaga com as mesmas requisições simultâneas
+        
+        As requisições de todos os perfis disputam a mesma concorrência e o mesmo
+        limitador de taxa, em vez de uma rodada de analyze_many por perfil.
         
         Args:
-            response_text: Resposta da API
-            job_profile: Perfil da vaga
+            groups: Pares (textos dos currículos, perfil da vaga)
+            concurrency: Máximo de requisições em andamento (padrão: Config.ANALYSIS_CONCURRENCY)
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            pack_size: Currículos por requisição (1 = um por requisição; 0 = calculado pela janela de contexto)
+            source_texts: Textos extraídos dos documentos de cada grupo, quando os textos são versões comprimidas
             
         Returns:
-            Análise extraída
+            Análises de cada grupo, na ordem recebida, com AnalysisError nas posições que falharam
         """
-        pontuacoes = {}
+        groups = [(list(cv_texts), job_profile) for cv_texts, job_profile in groups]
+        if not any(cv_texts for cv_texts, _ in groups):
+            return [[] for _ in groups]
         
-        # Tentar extrair pontuações usando regex
-        for attr in job_profile['requeridos'] + job_profile['desejaveis']:
-            # Buscar padrões como "atributo: 4" ou "atributo - 4"
-            pattern = rf'{re.escape(attr)}[:\-]\s*(\d)'
-            match = re.search(pattern, response_text, re.IGNORECASE)
-            if match:
-                pontuacoes[attr] = int(match.group(1))
-            else:
-                pontuacoes[attr] = 1  # Nota padrão
+        concurrency = Config.ANALYSIS_CONCURRENCY if concurrency is None else concurrency
+        sources = None if source_texts is None else [list(texts) for texts in source_texts]
+        return asyncio.run(self._analyze_groups(groups, max(1, concurrency), max_length, pack_size, sources))
+    
+    async def _analyze_many(self, cv_texts: List[str], job_profile: Dict[str, List[str]], concurrency: int,
+                            max_length: int, pack_size: int = 1,
+                            source_texts: List[str] = None) -> List[Union[Dict[str, Any], 'AnalysisError']]:
+        """Dispara as análises controladas pelo limitador e as reúne na ordem de entrada"""
+        sources = None if source_texts is None else [source_texts]
+        return (await self._analyze_groups([(cv_texts, job_profile)], concurrency, max_length, pack_size, sources))[0]
+    
+    async def _analyze_groups(self, groups: List[Tuple[List[str], Dict[str, List[str]]]], concurrency: int,
+                              max_length: int, pack_size: int = 1, source_texts: List[List[str]] = None
+                              ) -> List[List[Union[Dict[str, Any], 'AnalysisError']]]:
+        """
+        Dispara as análises de todos os grupos sob o mesmo limitador e as reúne na ordem de entrada
         
-        # Extrair resumo
-        resumo = "Análise automática realizada. Verifique manualmente para detalhes."
-        if "resumo" in response_text.lower():
-            resumo_match = re.search(r'resumo[:\-]\s*(.+?)(?:\n|$)', response_text, re.IGNORECASE | re.DOTALL)
-            if resumo_match:
-                resumo = resumo_match.group(1).strip()
+        source_texts traz, por grupo, o texto extraído de cada documento quando
+        os textos dos grupos são versões comprimidas; na falta dele, as notas
+        por atributo são indexadas pelos próprios textos.
+        """
+        limiter = self.rate_limiter
+        limiter.set_max_concurrency(concurrency)
+        rate_limited_before = limiter.rate_limited
+        if source_texts is None:
+            source_texts = [cv_texts for cv_texts, _ in groups]
         
-        return {
-            "pontuacoes": pontuacoes,
-            "resumo": resumo
-        }
+        # Cada currículo vai ao modelo apenas com os atributos ainda sem nota no cache;
+        # currículos com os mesmos atributos pendentes são analisados juntos
+        plans = [[self._rescoring_plan(cv_text, job_profile, max_length, source_text)
+                  for cv_text, source_text in zip(cv_texts, sources)]
+                 for (cv_texts, job_profile), sources in zip(groups, source_texts)]
+        requests = {}
+        for (cv_texts, _), sources, group_plans in zip(groups, source_texts, plans):
+            for cv_text, source_text, plan in zip(cv_texts, sources, group_plans):
+                if plan['perfil'] is not None:
+                    key = json.dumps(plan['perfil'], ensure_ascii=False, sort_keys=True)
+                    texts, _, request_sources = requests.setdefault(key, ([], plan['perfil'], []))
+                    plan['requisicao'] = (key, len(texts))
+                    texts.append(cv_text)
+                    request_sources.append(source_text)
+        
+        async def analyze_group(client: AsyncOpenAI, cv_texts: List[str], job_profile: Dict[str, List[str]],
+                                sources: List[str]):
+            if pack_size != 1:
+                return await self._analyze_packed(client, cv_texts, job_profile, max_length, pack_size, sources)
+            return await asyncio.gather(
+                *(self.analyze_cv_async(cv_text, job_profile, max_length, client, source_text)
+                  for cv_text, source_text in zip(cv_texts, sources)),
+                return_exceptions=True
+            )
+        
+        async with self.backend.async_client() as client:
+            responses = await asyncio.gather(
+                *(analyze_group(client, cv_texts, job_profile, sources) for cv_texts, job_profile, sources in requests.values())
+            )
+        responses = dict(zip(requests, responses))
+        
+        if limiter.rate_limited > rate_limited_before:
+            logger.warning(
+                f"{limiter.rate_limited - rate_limited_before} respostas 429 neste lote; "
+                f"concorrência ajustada para {int(limiter.concurrency)}"
+            )
+        
+        results = []
+        for (_, job_profile), group_plans in zip(groups, plans):
+            group_results = []
+            for plan in group_plans:
+                response = None
+                if 'requisicao' in plan:
+                    key, position = plan['requisicao']
+                    response = responses[key][position]
+                # Falhas ficam isoladas no candidato correspondente
+                if isinstance(response, Exception):
+                    group_results.append(self._analysis_error(response, 1))
+                else:
+                    group_results.append(self._merge_scores(plan, job_profile, response))
+            results.append(group_results)
+        
+        if self.escalation is not None:
+            await self._escalate(groups, concurrency, max_length, pack_size, results, source_texts)
+        return results
     
-    def _create_default_analysis(self, job_profile: Dict[str, List[str]]) -> Dict[str, Any]:
+    def _rescoring_plan(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int,
+                        source_text: str = None) -> Dict[str, Any]:
         """
-        Cria análise padrão quando há erro na API
+        Separa os atributos com nota já conhecida para o currículo dos que precisam ir ao modelo
         
         Args:
-            job_profile: Perfil da vaga
+            cv_text: Texto do currículo enviado no prompt
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            source_text: Texto extraído do documento, chave das notas por atributo (padrão: cv_text)
             
         Returns:
-            Análise padrão
+            'notas' conhecidas (atributo -> (nota, resumo)) e 'perfil' a enviar ao
+            modelo: o perfil completo, só os atributos sem nota, ou None se nada faltar
         """
-        pontuacoes = {}
+        score_key = self._score_key(cv_text, max_length, source_text)
+        known = self.cache.get_scores(score_key, job_profile['requeridos'] + job_profile['desejaveis']) if score_key else {}
+        if not known:
+            return {'notas': known, 'perfil': job_profile}
         
-        for attr in job_profile['requeridos'] + job_profile['desejaveis']:
-            pontuacoes[attr] = 1  # Nota mínima
+        missing = {category: [attr for attr in job_profile[category] if attr not in known] for category in ('requeridos', 'desejaveis')}
+        return {'notas': known, 'perfil': missing if missing['requeridos'] or missing['desejaveis'] else None}
+    
+    def _merge_scores(self, plan: Dict[str, Any], job_profile: Dict[str, List[str]],
+                      analysis: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Junta as notas reaproveitadas às recebidas do modelo
         
-        return {
-            "pontuacoes": pontuacoes,
-            "resumo": "Erro na análise automática. Verificação manual necessária."
+        O resumo é o da análise que produziu a maior parte das notas
+        reaproveitadas; os atributos enviados ao modelo ficam em 'reavaliados'.
+        
+        Args:
+            plan: Plano de _rescoring_plan
+            job_profile: Perfil completo da vaga
+            analysis: Análise dos atributos enviados ao modelo (None se nada foi enviado)
+            
+        Returns:
+            Análise com as notas de todos os atributos
+        """
+        known = plan['notas']
+        if not known:
+            return analysis
+        
+        received = (analysis or {}).get('pontuacoes', {})
+        merged = {
+            'pontuacoes': {},
+            'resumo': Counter(summary for _, summary in known.values()).most_common(1)[0][0]
         }
+        for attr in job_profile['requeridos'] + job_profile['desejaveis']:
+            if attr in known:
+                merged['pontuacoes'][attr] = known[attr][0]
+            elif attr in received:
+                merged['pontuacoes'][attr] = received[attr]
+        
+        stats = self.rescoring_stats
+        stats['candidatos'] += 1
+        stats['notas_reaproveitadas'] += len(known)
+        if plan['perfil'] is None:
+            stats['sem_requisicao'] += 1
+        else:
+            merged['reavaliados'] = plan['perfil']['requeridos'] + plan['perfil']['desejaveis']
+            for attr in merged['reavaliados']:
+                stats['reavaliados'][attr] = stats['reavaliados'].get(attr, 0) + 1
+        return merged
     
-    def calculate_total_score(self, analysis: Dict[str, Any], job_profile: Dict[str, List[str]]) -> float:
+    async def _escalate(self, groups: List[Tuple[List[str], Dict[str, List[str]]]], concurrency: int,
+                        max_length: int, pack_size: int, results: List[List[Union[Dict[str, Any], 'AnalysisError']]],
+                        source_texts: List[List[str]]):
         """
-        Calcula pontuação total ponderada
+        Reanalisa com o modelo da cascata os candidatos na faixa de incerteza
+        
+        Ficam na faixa as análises cuja pontuação total está a até cascade_band
+        de MIN_SCORE_THRESHOLD. A análise do modelo mais forte substitui a do
+        primeiro; se ela falhar, a do primeiro é mantida.
         
         Args:
-            analysis: Análise do currículo
-            job_profile: Perfil da vaga
+            groups: Pares (textos dos currículos, perfil da vaga)
+            concurrency: Máximo de requisições em andamento
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            pack_size: Currículos por requisição
+            results: Análises do primeiro modelo para cada grupo, atualizadas no lugar
+            source_texts: Textos extraídos dos documentos de cada grupo
+        """
+        threshold = Config.MIN_SCORE_THRESHOLD
+        stats = self.cascade_stats
+        first_scores = []
+        ambiguous = []
+        for (_, job_profile), group_results in zip(groups, results):
+            analyzed = [position for position, result in enumerate(group_results) if not isinstance(result, AnalysisError)]
+            totals = ScoreMatrix.from_analyses([group_results[position] for position in analyzed], job_profile).totals()
+            scores = dict(zip(analyzed, totals.tolist()))
+            first_scores.append(scores)
+            ambiguous.append([position for position, score in scores.items() if abs(score - threshold) <= self.cascade_band])
+            stats['analisados'] += len(scores)
+            stats['escalados'] += len(ambiguous[-1])
+        
+        if not any(ambiguous):
+            return
+        
+        logger.info(f"Cascata: reanalisando {sum(map(len, ambiguous))} candidatos com {self.escalation.model}")
+        escalated = await self.escalation._analyze_groups(
+            [([cv_texts[position] for position in positions], job_profile)
+             for (cv_texts, job_profile), positions in zip(groups, ambiguous)],
+            concurrency, max_length, pack_size,
+            [[sources[position] for position in positions] for sources, positions in zip(source_texts, ambiguous)]
+        )
+        
+        for (_, job_profile), group_results, scores, positions, analyses in zip(groups, results, first_scores, ambiguous, escalated):
+            for position, analysis in zip(positions, analyses):
+                if isinstance(analysis, AnalysisError):
+                    logger.warning(f"Reanálise com {self.escalation.model} falhou ({analysis}); mantida a análise de {self.model}")
+                    stats['falhas'] += 1
+                    continue
+                score = self.calculate_total_score(analysis, job_profile)
+                stats['comparados'] += 1
+                stats['notas_iguais'] += score_agreement(group_results[position], analysis, job_profile)
+                stats['decisoes_iguais'] += (scores[position] >= threshold) == (score >= threshold)
+                stats['diferenca'] += abs(score - scores[position])
+                group_results[position] = analysis
+    
+    async def _analyze_packed(self, client: AsyncOpenAI, cv_texts: List[str], job_profile: Dict[str, List[str]],
+                              max_length: int, pack_size: int, source_texts: List[str] = None) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Analisa os currículos em grupos, um grupo por requisição
+        
+        Candidatos ausentes ou inválidos na resposta, e grupos cuja requisição
+        falhou, são reanalisados individualmente.
+        
+        Args:
+            client: Cliente assíncrono
+            cv_texts: Textos dos currículos
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres de cada currículo (0 = texto completo)
+            pack_size: Currículos por requisição (0 = calculado pela janela de contexto)
+            source_texts: Textos extraídos dos documentos (padrão: os próprios cv_texts)
             
         Returns:
-            Pontuação total (0-5)
+            Análises (ou exceções) na ordem dos textos recebidos
+        """
+        if source_texts is None:
+            source_texts = cv_texts
+        results = [None] * len(cv_texts)
+        pending = []
+        for position, cv_text in enumerate(cv_texts):
+            cache_key = self._cache_key(cv_text, job_profile, max_length, packed=True)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[position] = cached
+            else:
+                pending.append((position, cache_key))
+        
+        if not pending:
+            return results
+        
+        if pack_size <= 0:
+            pack_size = self.packing_size([cv_texts[position] for position, _ in pending], job_profile, max_length)
+        self.packing_stats['tamanho'] = pack_size
+        
+        async def analyze_group(group: List[Tuple[int, Optional[str]]]):
+            texts = [cv_texts[position] for position, _ in group]
+            try:
+                analyses = await self._request_packed(client, texts, job_profile, max_length)
+            except AnalysisError as e:
+                logger.warning(f"Requisição com {len(group)} currículos falhou ({e}); analisando individualmente")
+                analyses = [None] * len(group)
+            
+            missing = []
+            for (position, cache_key), analysis in zip(group, analyses):
+                if analysis is None:
+                    missing.append(position)
+                    continue
+                results[position] = analysis
+                if cache_key is not None:
+                    self.cache.put(cache_key, analysis)
+                    self.cache.put_scores(self._score_key(cv_texts[position], max_length, source_texts[position]), analysis)
+            
+            if missing:
+                self.packing_stats['reanalisados'] += len(missing)
+                self.packing_stats['tokens_prompt'] += sum(
+                    self._prompt_tokens(self._build_messages(cv_texts[position], job_profile, max_length))
+                    for position in missing
+                )
+                singles = await asyncio.gather(
+                    *(self.analyze_cv_async(cv_texts[position], job_profile, max_length, client, source_texts[position])
+                      for position in missing),
+                    return_exceptions=True
+                )
+                for position, result in zip(missing, singles):
+                    results[position] = result
+        
+        groups = [pending[start:start + pack_size] for start in range(0, len(pending), pack_size)]
+        await asyncio.gather(*(analyze_group(group) for group in groups))
+        return results
+    
+    async def _request_packed(self, client: AsyncOpenAI, cv_texts: List[str],
+                              job_profile: Dict[str, List[str]], max_length: int) -> List[Optional[Dict[str, Any]]]:
         """
-        pontuacoes = analysis.get('pontuacoes', {})
+        Envia uma requisição com vários currículos
         
-        if not pontuacoes:
-            return 0.0
+        Args:
+            client: Cliente assíncrono
+            cv_texts: Textos dos currículos do grupo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres de cada currículo (0 = texto completo)
+            
+        Returns:
+            Análises na ordem dos currículos; None para candidatos ausentes na resposta
+            
+        Raises:
+            AnalysisError: Se a requisição falhar após esgotar as tentativas
+        """
+        messages = self._build_packed_messages(cv_texts, job_profile, max_length)
+        prompt_tokens = self._prompt_tokens(messages)
+        max_tokens = min(Config.MODEL_MAX_OUTPUT_TOKENS, self._max_tokens(job_profile) * len(cv_texts))
+        params = self._request_params(job_profile, messages, max_tokens, packed=True)
         
-        # Peso maior para atributos requeridos
-        total_score = 0
-        total_weight = 0
+        stats = self.packing_stats
+        stats['requisicoes'] += 1
+        stats['candidatos'] += len(cv_texts)
+        stats['tokens_prompt'] += prompt_tokens
+        stats['tokens_prompt_individual'] += sum(
+            self._prompt_tokens(self._build_messages(cv_text, job_profile, max_length)) for cv_text in cv_texts
+        )
+        self.retry_policy.requests += 1
         
-        # Atributos requeridos (peso 2)
-        for attr in job_profile['requeridos']:
-            if attr in pontuacoes:
-                total_score += pontuacoes[attr] * 2
-                total_weight += 2
+        response = await self._with_retries(
+            lambda: self._request_async(client, params, prompt_tokens + max_tokens)
+        )
+        return self._parse_packed_response(response.choices[0].message.content, job_profile, len(cv_texts))
+    
+    def lookup_cache(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int = 3000) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Consulta o cache de análises sem chamar a API
         
-        # Atributos desejáveis (peso 1)
-        for attr in job_profile['desejaveis']:
-            if attr in pontuacoes:
-                total_score += pontuacoes[attr] * 1
-                total_weight += 1
+        Args:
+            cv_text: Texto do currículo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            
+        Returns:
+            Tupla (chave no cache ou None se desativado, análise em cache ou None)
+        """
+        cache_key = self._cache_key(cv_text, job_profile, max_length)
+        if cache_key is None:
+            return None, None
+        return cache_key, self.cache.get(cache_key)
+    
+    def batch_request(self, cv_text: str, job_profile: Dict[str, List[str]], max_length: int = 3000) -> Dict[str, Any]:
+        """
+        Monta o corpo de /v1/chat/completions de uma análise, para a Batch API
         
-        if total_weight == 0:
-            return 0.0
+        Args:
+            cv_text: Texto do currículo
+            job_profile: Perfil da vaga com atributos
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            
+        Returns:
+            Corpo da requisição
+        """
+        return self._request_params(job_profile, self._build_messages(cv_text, job_profile, max_length))
+    
+    def parse_batch_response(self, content: str, job_profile: Dict[str, List[str]], cache_key: str = None) -> Dict[str, Any]:
+        """
+        Converte o conteúdo de uma resposta da Batch API em análise
         
-        return round(total_score / total_weight, 2)
+        Args:
+            content: Conteúdo da mensagem retornada pelo modelo
+            job_profile: Perfil da vaga com atributos
+            cache_key: Chave para guardar a análise no cache (opcional)
+            
+        Returns:
+            Dicionário com análise e pontuação
+        """
+        if cache_key is not None and self.cache is None:
+            cache_key = None
+        return self._parse_response(content, job_profile, cache_key)
+    
+    def calculate_total_score(self, analysis: Dict[str, Any], job_profile: Dict[str, List[str]]) -> float:
+        """
+        Calcula pontuação total ponderada (REQUIRED_WEIGHT e DESIRED_WEIGHT)
+        
+        Para muitos candidatos, monte uma ScoreMatrix e use totals().
+        
+        Args:
+            analysis: Análise do currículo
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Pontuação total (0-5)
+        """
+        return float(ScoreMatrix.from_analyses([analysis], job_profile).totals()[0])
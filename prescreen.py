@@ -0,0 +1,120 @@
+"""
+Pré-triagem lexical (BM25) dos currículos antes da análise pelo modelo
+"""
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+import logging
+from config import Config
+from text_utils import tokenize
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def attribute_query(job_profile: Dict[str, List[str]]) -> Dict[str, float]:
+    """
+    Monta a consulta BM25 a partir dos atributos da vaga
+
+    Cada atributo distribui o peso da sua categoria entre os seus termos, para
+    que atributos longos não dominem a pontuação.
+
+    Args:
+        job_profile: Perfil da vaga com atributos
+
+    Returns:
+        Dicionário termo -> peso
+    """
+    query = Counter()
+    for attributes, weight in ((job_profile['requeridos'], Config.REQUIRED_WEIGHT),
+                               (job_profile['desejaveis'], Config.DESIRED_WEIGHT)):
+        for attr in attributes:
+            terms = set(tokenize(attr))
+            for term in terms:
+                query[term] += weight / len(terms)
+    return dict(query)
+
+class BM25Index:
+    """Índice invertido em memória com pontuação BM25"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # termo -> (ids dos documentos, frequências do termo)
+        self._postings: Dict[str, tuple] = {}
+        self._lengths: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, text: str) -> int:
+        """
+        Indexa um documento
+
+        Args:
+            text: Texto sanitizado do currículo
+
+        Returns:
+            Id do documento no índice (ordem de inclusão)
+        """
+        doc_id = len(self._lengths)
+        tokens = tokenize(text)
+        self._lengths.append(len(tokens))
+        for term, frequency in Counter(tokens).items():
+            doc_ids, frequencies = self._postings.setdefault(term, ([], []))
+            doc_ids.append(doc_id)
+            frequencies.append(frequency)
+        return doc_id
+
+    def score(self, query: Dict[str, float]) -> np.ndarray:
+        """
+        Pontua todos os documentos contra a consulta
+
+        A pontuação é normalizada pelo máximo teórico da consulta (todos os
+        termos presentes com frequência muito alta), ficando entre 0 e 1.
+
+        Args:
+            query: Termos com seus pesos (attribute_query)
+
+        Returns:
+            Pontuação de cada documento, na ordem de inclusão
+        """
+        count = len(self._lengths)
+        scores = np.zeros(count)
+        if not count or not query:
+            return scores
+
+        lengths = np.asarray(self._lengths, dtype=float)
+        average = lengths.mean() or 1.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / average)
+
+        ideal = 0.0
+        for term, weight in query.items():
+            doc_ids, frequencies = self._postings.get(term, ((), ()))
+            idf = np.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            ideal += weight * idf * (self.k1 + 1)
+            if doc_ids:
+                ids = np.asarray(doc_ids)
+                tf = np.asarray(frequencies, dtype=float)
+                scores[ids] += weight * idf * tf * (self.k1 + 1) / (tf + norms[ids])
+
+        return scores / ideal if ideal > 0 else scores
+
+def select(scores: np.ndarray, top_n: int = 0, threshold: float = 0.0) -> List[int]:
+    """
+    Escolhe os documentos que seguem para a análise
+
+    Args:
+        scores: Pontuações da pré-triagem
+        top_n: Máximo de documentos (0 = sem limite)
+        threshold: Pontuação mínima (0 = sem mínimo)
+
+    Returns:
+        Índices escolhidos, na ordem original
+    """
+    order = np.argsort(-scores, kind='stable')
+    if threshold > 0:
+        order = order[scores[order] >= threshold]
+    if top_n > 0:
+        order = order[:top_n]
+    return sorted(order.tolist())
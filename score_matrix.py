@@ -0,0 +1,132 @@
+"""
+Matriz de notas dos candidatos (candidatos × atributos) com estatísticas vetorizadas
+"""
+from typing import Any, Dict, Iterable, List, Sequence
+import numpy as np
+import logging
+from config import Config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ScoreMatrix:
+    """
+    Notas de todos os candidatos em uma matriz int8 (candidatos × atributos)
+
+    As colunas seguem a ordem do perfil: requeridos e depois desejáveis. Nota 0
+    indica atributo sem nota, que fica fora da média ponderada e das
+    estatísticas do atributo. Montada uma vez após a análise, permite
+    recalcular pontuações e rankings com outros pesos sem percorrer as análises.
+    """
+
+    def __init__(self, scores: np.ndarray, job_profile: Dict[str, List[str]]):
+        self.scores = scores
+        self.attributes = job_profile['requeridos'] + job_profile['desejaveis']
+        self.required = np.arange(len(self.attributes)) < len(job_profile['requeridos'])
+
+    @classmethod
+    def from_analyses(cls, analyses: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> 'ScoreMatrix':
+        """
+        Monta a matriz a partir das análises
+
+        Notas acima de 5 são limitadas a 5 (a validação das respostas já as ajusta;
+        o limite protege análises montadas fora dela).
+
+        Args:
+            analyses: Análises com 'pontuacoes' (atributo -> nota)
+            job_profile: Perfil da vaga com atributos
+
+        Returns:
+            Matriz com uma linha por análise, na ordem recebida
+        """
+        attributes = job_profile['requeridos'] + job_profile['desejaveis']
+        rows = [
+            [pontuacoes.get(attr, 0) for attr in attributes]
+            for pontuacoes in ((analysis.get('pontuacoes') or {}) for analysis in analyses)
+        ]
+        scores = np.array(rows, dtype=np.int16).reshape(len(rows), len(attributes))
+        return cls(np.clip(scores, 0, 5).astype(np.int8), job_profile)
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+    def weights(self, required_weight: float = None, desired_weight: float = None) -> np.ndarray:
+        """
+        Peso de cada coluna
+
+        Args:
+            required_weight: Peso dos atributos requeridos (padrão: Config.REQUIRED_WEIGHT)
+            desired_weight: Peso dos atributos desejáveis (padrão: Config.DESIRED_WEIGHT)
+
+        Returns:
+            Vetor de pesos, um por atributo
+        """
+        required_weight = Config.REQUIRED_WEIGHT if required_weight is None else required_weight
+        desired_weight = Config.DESIRED_WEIGHT if desired_weight is None else desired_weight
+        return np.where(self.required, float(required_weight), float(desired_weight))
+
+    def totals(self, required_weight: float = None, desired_weight: float = None) -> np.ndarray:
+        """
+        Pontuação total ponderada de todos os candidatos
+
+        Args:
+            required_weight: Peso dos atributos requeridos (padrão: Config.REQUIRED_WEIGHT)
+            desired_weight: Peso dos atributos desejáveis (padrão: Config.DESIRED_WEIGHT)
+
+        Returns:
+            Pontuação de cada candidato (0-5, duas casas; 0 para quem não tem notas)
+        """
+        weights = self.weights(required_weight, desired_weight)
+        weighted = self.scores @ weights
+        total_weight = (self.scores > 0) @ weights
+        totals = np.divide(weighted, total_weight, out=np.zeros(len(self)), where=total_weight > 0)
+        return np.round(totals, 2)
+
+    def ranking(self, required_weight: float = None, desired_weight: float = None) -> np.ndarray:
+        """
+        Ordem dos candidatos da maior para a menor pontuação total
+
+        Args:
+            required_weight: Peso dos atributos requeridos (padrão: Config.REQUIRED_WEIGHT)
+            desired_weight: Peso dos atributos desejáveis (padrão: Config.DESIRED_WEIGHT)
+
+        Returns:
+            Índices das linhas; empates mantêm a ordem original
+        """
+        return np.argsort(-self.totals(required_weight, desired_weight), kind='stable')
+
+    def attribute_counts(self) -> np.ndarray:
+        """Número de candidatos com nota em cada atributo"""
+        return np.count_nonzero(self.scores, axis=0)
+
+    def attribute_means(self) -> np.ndarray:
+        """Nota média de cada atributo entre os candidatos com nota (NaN se ninguém tiver)"""
+        counts = self.attribute_counts()
+        sums = self.scores.sum(axis=0, dtype=np.int64)
+        return np.divide(sums, counts, out=np.full(len(self.attributes), np.nan), where=counts > 0)
+
+    def attribute_percentiles(self, percentiles: Sequence[float] = (25, 50, 75)) -> np.ndarray:
+        """
+        Percentis das notas de cada atributo entre os candidatos com nota
+
+        Como as notas são inteiros de 1 a 5, os percentis saem da distribuição
+        acumulada das contagens de cada nota, sem ordenar a matriz; o resultado é
+        a menor nota que alcança o percentil.
+
+        Args:
+            percentiles: Percentis desejados (0-100)
+
+        Returns:
+            Matriz (len(percentiles) × atributos); NaN para atributos sem nota
+        """
+        counts = np.stack([np.count_nonzero(self.scores == value, axis=0) for value in range(1, 6)])
+        cumulative = np.cumsum(counts, axis=0)
+        total = cumulative[-1]
+        result = np.full((len(percentiles), len(self.attributes)), np.nan)
+        for row, percentile in enumerate(percentiles):
+            target = np.maximum(1, np.ceil(total * percentile / 100))
+            # Primeira nota cuja contagem acumulada alcança o alvo
+            values = (cumulative < target).sum(axis=0) + 1
+            result[row] = np.where(total > 0, values, np.nan)
+        return result
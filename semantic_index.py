@@ -0,0 +1,239 @@
+"""
+Pré-seleção semântica: embeddings dos trechos dos currículos em um índice vetorial local
+"""
+import os
+import json
+import zlib
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+from config import Config
+from text_utils import tokenize
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza as linhas para norma 1 (similaridade de cosseno = produto escalar)"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+class EmbeddingBackend(ABC):
+    """Interface dos geradores de embeddings"""
+
+    # Identifica o modelo no índice; vetores de modelos diferentes não se misturam
+    name = ''
+    dimension = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Gera os embeddings dos textos
+
+        Args:
+            texts: Textos
+
+        Returns:
+            Matriz float32 (len(texts) x dimension) com linhas de norma 1
+        """
+
+class HashingEmbedding(EmbeddingBackend):
+    """
+    Embeddings locais e determinísticos por hashing de termos e bigramas
+
+    Não captura sinônimos como um modelo de linguagem, mas não depende de
+    rede e produz sempre os mesmos vetores, o que o torna adequado para testes.
+    """
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+        # A versão acompanha a tokenização; vetores antigos são descartados ao mudá-la
+        self.name = f"hashing-v2-{dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = zlib.crc32(feature.encode('utf-8'))
+                # O bit mais alto define o sinal, reduzindo o viés das colisões
+                vectors[row, digest % self.dimension] += 1.0 if digest & 0x80000000 else -1.0
+        return _normalize(vectors)
+
+class OpenAIEmbedding(EmbeddingBackend):
+    """Embeddings pela API da OpenAI"""
+
+    def __init__(self, client, model: str = None, batch_size: int = 256):
+        self.client = client
+        self.model = model or Config.EMBEDDING_MODEL
+        self.batch_size = batch_size
+        self.name = self.model
+        self.dimension = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(model=self.model, input=texts[start:start + self.batch_size])
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        if not rows:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        vectors = _normalize(np.asarray(rows, dtype=np.float32))
+        self.dimension = vectors.shape[1]
+        return vectors
+
+def create_backend(name: str = None, client=None) -> EmbeddingBackend:
+    """
+    Cria o gerador de embeddings configurado
+
+    Args:
+        name: 'local' ou 'openai' (padrão: Config.EMBEDDING_BACKEND)
+        client: Cliente OpenAI (obrigatório para 'openai')
+
+    Returns:
+        Gerador de embeddings
+    """
+    name = name or Config.EMBEDDING_BACKEND
+    if name == 'local':
+        return HashingEmbedding()
+    if name == 'openai':
+        if client is None:
+            raise ValueError("o backend 'openai' precisa de um cliente OpenAI")
+        return OpenAIEmbedding(client)
+    raise ValueError(f"backend de embeddings desconhecido: {name}")
+
+def embed_attributes(backend: EmbeddingBackend, job_profile: Dict[str, List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embeddings dos atributos da vaga e o peso de cada um
+
+    Args:
+        backend: Gerador de embeddings
+        job_profile: Perfil da vaga com atributos
+
+    Returns:
+        Tupla (embeddings dos atributos, pesos REQUIRED_WEIGHT/DESIRED_WEIGHT)
+    """
+    attributes = job_profile['requeridos'] + job_profile['desejaveis']
+    weights = np.array([Config.REQUIRED_WEIGHT] * len(job_profile['requeridos'])
+                       + [Config.DESIRED_WEIGHT] * len(job_profile['desejaveis']), dtype=float)
+    if not attributes:
+        return np.zeros((0, backend.dimension), dtype=np.float32), weights
+    return backend.embed(attributes), weights
+
+class VectorIndex:
+    """
+    Índice vetorial persistido em disco, com os vetores lidos por memory-map
+
+    Os vetores ficam em um arquivo float32 apenas acrescentado; o índice JSON
+    registra, para cada documento (hash do texto), a faixa de linhas dos seus
+    trechos. Documentos já indexados não geram novos embeddings.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, directory: str = None):
+        self.backend = backend
+        self.directory = directory or Config.SEMANTIC_INDEX_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors_file = os.path.join(self.directory, 'vetores.f32')
+        self._index_file = os.path.join(self.directory, 'indice.json')
+        self._matrix: Optional[np.memmap] = None
+        self.embedded = 0
+        self._load()
+
+    def _load(self):
+        """Lê o índice e descarta vetores de outro modelo ou gravados sem registro no índice"""
+        self.meta = {'modelo': self.backend.name, 'dimensao': 0, 'linhas': 0, 'documentos': {}}
+        if os.path.exists(self._index_file):
+            with open(self._index_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('modelo') == self.backend.name:
+                self.meta = meta
+            else:
+                logger.info(f"Índice vetorial de outro modelo ({meta.get('modelo')}); reconstruindo")
+
+        size = self.meta['linhas'] * self.meta['dimensao'] * 4
+        with open(self._vectors_file, 'ab') as f:
+            f.truncate(size)
+
+    def flush(self):
+        """Grava o índice; vetores acrescentados depois da última gravação são descartados na próxima abertura"""
+        temp_file = f"{self._index_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(temp_file, self._index_file)
+
+    def __len__(self) -> int:
+        return len(self.meta['documentos'])
+
+    @staticmethod
+    def document_key(text: str) -> str:
+        """Chave do documento no índice"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def add(self, key: str, chunks: List[str]):
+        """
+        Indexa os trechos de um documento, se ainda não estiver no índice
+
+        Args:
+            key: Chave do documento (document_key)
+            chunks: Trechos do documento
+        """
+        if key in self.meta['documentos'] or not chunks:
+            return
+
+        vectors = self.backend.embed(chunks)
+        if not self.meta['dimensao']:
+            self.meta['dimensao'] = vectors.shape[1]
+        with open(self._vectors_file, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        self.meta['documentos'][key] = [self.meta['linhas'], len(chunks)]
+        self.meta['linhas'] += len(chunks)
+        self.embedded += 1
+        self._matrix = None
+
+    def _vectors(self) -> np.ndarray:
+        """Matriz de todos os vetores, mapeada do disco"""
+        if self._matrix is None and self.meta['linhas']:
+            self._matrix = np.memmap(self._vectors_file, dtype=np.float32, mode='r',
+                                     shape=(self.meta['linhas'], self.meta['dimensao']))
+        return self._matrix
+
+    def score(self, keys: List[str], queries: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Similaridade de cada documento com o conjunto de consultas
+
+        Para cada consulta (atributo da vaga) vale o trecho mais parecido do
+        documento; a pontuação é a média ponderada dessas similaridades de cosseno.
+
+        Args:
+            keys: Documentos a pontuar
+            queries: Embeddings das consultas (linhas de norma 1)
+            weights: Peso de cada consulta
+
+        Returns:
+            Pontuação de cada documento (documentos ausentes do índice recebem 0)
+        """
+        scores = np.zeros(len(keys))
+        matrix = self._vectors()
+        if matrix is None or not len(queries):
+            return scores
+
+        for position, key in enumerate(keys):
+            entry = self.meta['documentos'].get(key)
+            if entry is None:
+                continue
+            start, count = entry
+            best = (matrix[start:start + count] @ queries.T).max(axis=0)
+            scores[position] = float(best @ weights) / float(weights.sum())
+        return scores
+
+    def close(self):
+        """Grava o índice e libera o memory-map"""
+        self.flush()
+        self._matrix = None
@@ -5,15 +5,28 @@ Aplicação principal que integra todos os módulos
 """
 import os
 import sys
+import json
 import argparse
+import itertools
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Tuple
 from pathlib import Path
+from datetime import datetime
 
 # Importar módulos locais
 from document_reader import DocumentReader
-from openai_analyzer import OpenAIAnalyzer
+from extraction_cache import ExtractionCache
+from analysis_cache import AnalysisCache
+from near_duplicates import NearDuplicateIndex
+from prescreen import BM25Index, attribute_query, select
+from semantic_index import VectorIndex, create_backend, embed_attributes
+from cv_compressor import CVCompressor, score_agreement
+from config import Config
+from openai_analyzer import OpenAIAnalyzer, AnalysisError, AnalyzerBackend, create_analyzer_backend
+from dead_letter import DeadLetterQueue
+from batch_analysis import BatchJob, BatchTransport, OpenAIBatchTransport
 from excel_generator import ExcelGenerator
+from score_matrix import ScoreMatrix
 
 # Configurar logging
 logging.basicConfig(
@@ -29,14 +42,77 @@ logger = logging.getLogger(__name__)
 class TalentScan:
     """Classe principal da aplicação TalentScan"""
     
-    def __init__(self):
-        self.document_reader = DocumentReader()
+    def __init__(self, workers: int = 1, use_cache: bool = True, rebuild_cache: bool = False, full_text: bool = False,
+                 extraction_timeout: float = None, extraction_memory_mb: int = None, isolate_extraction: bool = None,
+                 dedup_threshold: float = None, token_budget: int = None, compression_eval: int = 0,
+                 concurrency: int = None, rpm_limit: int = None, tpm_limit: int = None,
+                 dead_letter_file: str = None, use_analysis_cache: bool = True,
+                 batch_dir: str = None, batch_transport: BatchTransport = None, pack_size: int = 1,
+                 prescreen_top_n: int = None, prescreen_threshold: float = None,
+                 semantic_top_k: int = None, embedding_backend: str = None,
+                 analyzer_backend: AnalyzerBackend = None, cascade_model: str = None, cascade_band: float = None):
+        self.extraction_cache = ExtractionCache() if use_cache else None
+        if self.extraction_cache and rebuild_cache:
+            self.extraction_cache.clear()
+        
+        # Orçamento de tokens do currículo enviado ao modelo (0 desativa a compressão)
+        self.token_budget = Config.COMPRESSION_TOKEN_BUDGET if token_budget is None else token_budget
+        
+        # Com limite de tempo ou memória, cada documento é extraído em um processo isolado.
+        # Com compressão, o texto é extraído inteiro: o compressor escolhe os trechos
+        # relevantes em todo o documento, inclusive nas seções finais
+        self.document_reader = DocumentReader(
+            cache=self.extraction_cache,
+            full_text=full_text or self.token_budget > 0,
+            timeout=extraction_timeout,
+            max_memory_mb=extraction_memory_mb
+        )
+        if isolate_extraction is None:
+            isolate_extraction = bool(self.document_reader.timeout or self.document_reader.max_memory_mb)
+        elif not isolate_extraction and workers <= 1 and (self.document_reader.timeout or self.document_reader.max_memory_mb):
+            logger.warning("Extração sem isolamento: os limites de tempo e memória por arquivo não serão aplicados")
+        self.document_reader.isolate = isolate_extraction
+        self.workers = max(1, workers)
+        
+        # Limiar de similaridade para currículos quase duplicados (0 desativa)
+        self.dedup_threshold = Config.DEDUP_THRESHOLD if dedup_threshold is None else dedup_threshold
+        
+        # Pré-triagem BM25: só os melhores currículos seguem para o modelo (0 desativa cada critério)
+        self.prescreen_top_n = Config.PRESCREEN_TOP_N if prescreen_top_n is None else prescreen_top_n
+        self.prescreen_threshold = Config.PRESCREEN_THRESHOLD if prescreen_threshold is None else prescreen_threshold
+        
+        # Pré-seleção semântica: só os K currículos mais próximos dos atributos seguem para o modelo (0 desativa)
+        self.semantic_top_k = Config.SEMANTIC_TOP_K if semantic_top_k is None else semantic_top_k
+        self.embedding_backend = embedding_backend
+        
+        # Quantos currículos comprimidos também são analisados com o texto completo, para comparação
+        self.compression_eval = max(0, compression_eval)
+        
+        # Requisições simultâneas à API durante a análise
+        self.concurrency = max(1, Config.ANALYSIS_CONCURRENCY if concurrency is None else concurrency)
+        # Currículos por requisição (1 = um por requisição; 0 = calculado pela janela de contexto do modelo)
+        self.pack_size = max(0, pack_size)
+        
+        # Análises que falharam definitivamente, para reprocessamento com --retry-failed
+        self.dead_letter = DeadLetterQueue(dead_letter_file)
+        self.analysis_failures = []
+        
+        # Modo batch: diretório de estado e transporte (padrão: Batch API da OpenAI)
+        self.batch_dir = batch_dir
+        self.batch_transport = batch_transport
         self.openai_analyzer = None
         self.excel_generator = ExcelGenerator()
+        # Notas da última análise (candidatos × atributos), na ordem de candidates_data
+        self.score_matrix = None
+        
+        # Respostas da API reaproveitadas entre execuções
+        self.analysis_cache = AnalysisCache() if use_analysis_cache else None
         
         # Inicializar analisador OpenAI
         try:
-            self.openai_analyzer = OpenAIAnalyzer()
+            self.openai_analyzer = OpenAIAnalyzer(rpm_limit=rpm_limit, tpm_limit=tpm_limit, cache=self.analysis_cache,
+                                                  backend=analyzer_backend, cascade_model=cascade_model,
+                                                  cascade_band=cascade_band)
             logger.info("Analisador OpenAI inicializado com sucesso")
         except Exception as e:
             logger.error(f"Erro ao inicializar analisador OpenAI: {e}")
@@ -68,10 +144,10 @@ class TalentScan:
     
     def process_candidates(self, directory_path: str, job_profile: Dict[str, List[str]]) -> List[Dict[str, Any]]:
         """
-        Processa todos os currículos em um diretório
+        Processa todos os currículos em um diretório ou arquivo compactado
         
         Args:
-            directory_path: Caminho para o diretório com currículos
+            directory_path: Caminho para o diretório com currículos (ou .zip/.tar.gz)
             job_profile: Perfil da vaga
             
         Returns:
@@ -79,45 +155,458 @@ class TalentScan:
         """
         logger.info(f"Processando currículos em: {directory_path}")
         
-        # Ler documentos
-        documents = self.document_reader.read_directory(directory_path)
+        # Ler documentos sob demanda: cada currículo é analisado assim que extraído
+        file_paths = self.document_reader.list_inputs(directory_path)
         
-        if not documents:
+        if not file_paths:
             logger.warning("Nenhum documento encontrado no diretório")
             return []
         
-        logger.info(f"Encontrados {len(documents)} documentos para processar")
+        logger.info(f"Encontrados {len(file_paths)} arquivos para processar")
         
-        candidates_data = []
+        documents = self.document_reader.iter_documents(file_paths, workers=self.workers)
+        documents = self.semantic_shortlist(self.prescreen(documents, job_profile), job_profile)
+        candidates_data = self.analyze_documents(documents, job_profile)
         
-        for i, doc in enumerate(documents, 1):
-            logger.info(f"Analisando candidato {i}/{len(documents)}: {doc.get('arquivo', 'Desconhecido')}")
+        if self.document_reader.failed_files:
+            logger.warning(f"{len(self.document_reader.failed_files)} arquivos não puderam ser lidos")
+        
+        if self.extraction_cache:
+            logger.info(f"Cache de extração: {self.extraction_cache.hits} hits, {self.extraction_cache.misses} misses")
+        
+        return candidates_data
+    
+    def process_profiles(self, directory_path: str, job_profiles: List[Dict[str, List[str]]],
+                         profile_names: List[str]) -> List[Dict[str, Any]]:
+        """
+        Processa os currículos uma única vez para vários perfis de vaga
+        
+        A extração e os contatos são compartilhados; a pré-triagem e a
+        pré-seleção semântica são feitas por perfil, e as análises de todos os
+        pares (currículo, perfil) são agendadas juntas, sob a mesma concorrência
+        e o mesmo limitador de taxa.
+        
+        Args:
+            directory_path: Caminho para o diretório com currículos (ou .zip/.tar.gz)
+            job_profiles: Perfis das vagas
+            profile_names: Nome de cada perfil, usado no log
             
-            try:
-                # Analisar currículo
-                analysis = self.openai_analyzer.analyze_cv(doc['texto'], job_profile)
-                
-                # Calcular pontuação total
-                total_score = self.openai_analyzer.calculate_total_score(analysis, job_profile)
-                
-                candidate_data = {
-                    'contato': doc['contato'],
-                    'arquivo': doc['arquivo'],
-                    'analise': analysis,
-                    'pontuacao_total': total_score
-                }
-                
-                candidates_data.append(candidate_data)
+        Returns:
+            Resultado de cada perfil, na ordem de job_profiles (ver _analyze_pairs)
+        """
+        logger.info(f"Processando currículos em: {directory_path} ({len(job_profiles)} perfis de vaga)")
+        
+        file_paths = self.document_reader.list_inputs(directory_path)
+        
+        if not file_paths:
+            logger.warning("Nenhum documento encontrado no diretório")
+            return []
+        
+        logger.info(f"Encontrados {len(file_paths)} arquivos para processar")
+        
+        documents = self.document_reader.iter_documents(file_paths, workers=self.workers)
+        profiles = range(len(job_profiles))
+        if self.prescreen_top_n <= 0 and self.prescreen_threshold <= 0 and self.semantic_top_k <= 0:
+            # Sem seleção por perfil, cada currículo segue para todos os perfis assim que extraído
+            pairs = ((profile_index, doc) for doc in documents for profile_index in profiles)
+        else:
+            # A seleção grava a pontuação no documento, então cada perfil recebe suas cópias
+            documents = list(documents)
+            chosen = []
+            for job_profile, name in zip(job_profiles, profile_names):
+                copies = [dict(doc) for doc in documents]
+                positions = {id(doc): position for position, doc in enumerate(copies)}
+                logger.info(f"[{name}] Selecionando currículos")
+                selected = self.semantic_shortlist(self.prescreen(copies, job_profile), job_profile)
+                chosen.append({positions[id(doc)]: doc for doc in selected})
+            pairs = ((profile_index, chosen[profile_index][position])
+                     for position in range(len(documents)) for profile_index in profiles
+                     if position in chosen[profile_index])
+        
+        runs = self._analyze_pairs(pairs, job_profiles, profile_names)
+        
+        if self.document_reader.failed_files:
+            logger.warning(f"{len(self.document_reader.failed_files)} arquivos não puderam ser lidos")
+        
+        if self.extraction_cache:
+            logger.info(f"Cache de extração: {self.extraction_cache.hits} hits, {self.extraction_cache.misses} misses")
+        
+        return runs
+    
+    def prescreen(self, documents: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> Iterable[Dict[str, Any]]:
+        """
+        Pré-triagem BM25: mantém apenas os currículos mais aderentes aos atributos
+        
+        A pontuação depende do conjunto inteiro, então todos os documentos são
+        lidos antes da seleção. Com a pré-triagem desativada, os documentos
+        seguem sob demanda, sem passar por aqui.
+        
+        Args:
+            documents: Documentos com 'arquivo', 'texto' e 'contato'
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Documentos escolhidos, na ordem original, com a pontuação em 'pre_triagem'
+        """
+        if self.prescreen_top_n <= 0 and self.prescreen_threshold <= 0:
+            return documents
+        
+        documents = list(documents)
+        index = BM25Index()
+        for doc in documents:
+            index.add(doc['texto'])
+        
+        scores = index.score(attribute_query(job_profile))
+        selected = select(scores, self.prescreen_top_n, self.prescreen_threshold)
+        for position in selected:
+            documents[position]['pre_triagem'] = round(float(scores[position]), 3)
+        
+        logger.info(
+            f"Pré-triagem BM25: {len(selected)} de {len(documents)} currículos seguem para a análise"
+            + (f" (pontuação mínima entre os escolhidos: {min(scores[selected]):.3f})" if selected else "")
+        )
+        return [documents[position] for position in selected]
+    
+    def semantic_shortlist(self, documents: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> Iterable[Dict[str, Any]]:
+        """
+        Pré-seleção semântica: mantém os K currículos mais próximos dos atributos
+        
+        Os trechos de cada currículo são convertidos em embeddings e guardados
+        em um índice vetorial em disco; currículos já indexados em execuções
+        anteriores não geram novos embeddings.
+        
+        Args:
+            documents: Documentos com 'arquivo', 'texto' e 'contato'
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Documentos escolhidos, na ordem original, com a similaridade em 'similaridade_semantica'
+        """
+        if self.semantic_top_k <= 0:
+            return documents
+        
+        documents = list(documents)
+        backend = create_backend(self.embedding_backend, self.openai_analyzer.client)
+        index = VectorIndex(backend)
+        segmenter = CVCompressor()
+        try:
+            keys = []
+            for doc in documents:
+                key = VectorIndex.document_key(doc['texto'])
+                index.add(key, segmenter.segment(doc['texto']))
+                keys.append(key)
+            
+            scores = index.score(keys, *embed_attributes(backend, job_profile))
+        finally:
+            index.close()
+        
+        selected = select(scores, top_n=self.semantic_top_k)
+        for position in selected:
+            documents[position]['similaridade_semantica'] = round(float(scores[position]), 3)
+        
+        logger.info(
+            f"Pré-seleção semântica ({backend.name}): {len(selected)} de {len(documents)} currículos seguem para a análise; "
+            f"{index.embedded} currículos indexados nesta execução"
+        )
+        return [documents[position] for position in selected]
+    
+    def analyze_documents(self, documents: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """
+        Analisa documentos já extraídos, em lotes de requisições simultâneas
+        
+        Currículos cuja análise falha definitivamente vão para a fila de
+        reprocessamento (dead letter) e ficam fora do ranking.
+        
+        Args:
+            documents: Documentos com 'arquivo', 'texto' e 'contato'
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Lista com dados processados dos candidatos
+        """
+        return self._analyze_pairs(((0, doc) for doc in documents), [job_profile])[0]['candidatos']
+    
+    def _analyze_pairs(self, pairs: Iterable[Tuple[int, Dict[str, Any]]], job_profiles: List[Dict[str, List[str]]],
+                       profile_names: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Analisa pares (perfil, documento) em lotes, com requisições simultâneas de todos os perfis
+        
+        Cada perfil tem suas próprias duplicatas, falhas e estatísticas; o lote,
+        a concorrência e o limitador de taxa da API são compartilhados.
+        
+        Args:
+            pairs: Pares (posição do perfil em job_profiles, documento)
+            job_profiles: Perfis das vagas
+            profile_names: Nomes dos perfis, usados no log (opcional)
+            
+        Returns:
+            Resultado de cada perfil, na ordem de job_profiles: 'candidatos',
+            'matriz' (ScoreMatrix) e 'ignorados' (análises que falharam)
+        """
+        pairs = iter(pairs)
+        runs = [{
+            'perfil': job_profile,
+            'rotulo': f"[{profile_names[n]}] " if profile_names else '',
+            'contador': 0,
+            'candidatos': [],
+            # Currículos quase idênticos a um já analisado reaproveitam a análise dele
+            'dedup': NearDuplicateIndex(self.dedup_threshold) if self.dedup_threshold > 0 else None,
+            'analises': {},
+            'duplicatas': 0,
+            'chaves_com_falha': {},
+            'ignorados': [],
+            'tokens_economizados': 0,
+            'concordancias': [],
+            'linhas_de_base': []
+        } for n, job_profile in enumerate(job_profiles)]
+        
+        compressor = CVCompressor(self.token_budget) if self.token_budget > 0 else None
+        max_length = 0 if compressor is not None else 3000
+        
+        # Os currículos são analisados em lotes, com várias requisições simultâneas à API
+        batch_size = self.concurrency * 4
+        if self.pack_size != 1:
+            batch_size *= self.pack_size or Config.PACK_MAX_SIZE
+        
+        while True:
+            batch = list(itertools.islice(pairs, batch_size))
+            if not batch:
+                break
+            
+            # Separar duplicatas e preparar o texto enviado ao modelo, agrupado por perfil
+            prepared = []
+            cv_texts = {}
+            source_texts = {}
+            batch_keys = set()
+            for profile_index, doc in batch:
+                run = runs[profile_index]
+                run['contador'] += 1
+                i = run['contador']
+                logger.info(f"{run['rotulo']}Analisando candidato {i}: {doc.get('arquivo', 'Desconhecido')}")
                 
-                logger.info(f"Candidato {i} processado - Pontuação: {total_score}")
+                try:
+                    duplicate_of = run['dedup'].find_or_add(i, doc['texto']) if run['dedup'] is not None else None
+                    # O representante pode ter falhado na leitura; nesse caso o currículo é analisado normalmente
+                    if (duplicate_of not in run['analises'] and (profile_index, duplicate_of) not in batch_keys
+                            and duplicate_of not in run['chaves_com_falha']):
+                        duplicate_of = None
+                    
+                    item = {'perfil': profile_index, 'indice': i, 'doc': doc, 'duplicata_de': duplicate_of, 'stats': None, 'analise': None}
+                    if duplicate_of is None:
+                        if compressor is not None:
+                            cv_text, item['stats'] = compressor.compress(doc['texto'], run['perfil'])
+                        else:
+                            cv_text = doc['texto']
+                        texts = cv_texts.setdefault(profile_index, [])
+                        item['posicao'] = len(texts)
+                        texts.append(cv_text)
+                        # As notas por atributo são indexadas pelo texto extraído, que não muda com o perfil
+                        source_texts.setdefault(profile_index, []).append(doc['texto'])
+                        batch_keys.add((profile_index, i))
+                    prepared.append(item)
+                    
+                except Exception as e:
+                    logger.error(f"{run['rotulo']}Erro ao processar candidato {i}: {e}")
+            
+            # Analisar currículos do lote
+            batch_analyses = self._analyze_groups(cv_texts, job_profiles, max_length, self.pack_size, source_texts)
+            for item in prepared:
+                if item['duplicata_de'] is None:
+                    item['analise'] = batch_analyses[item['perfil']][item['posicao']]
+            
+            # Linha de base: alguns currículos comprimidos analisados também com o texto completo
+            evaluated = {}
+            for item in prepared:
+                stats = item['stats']
+                selected = evaluated.setdefault(item['perfil'], [])
+                if stats and stats['tokens_originais'] > stats['tokens_enviados'] and len(runs[item['perfil']]['concordancias']) + len(selected) < self.compression_eval:
+                    selected.append(item)
+            evaluated = {profile_index: items for profile_index, items in evaluated.items() if items}
+            if evaluated:
+                baselines = self._analyze_groups(
+                    {profile_index: [item['doc']['texto'] for item in items] for profile_index, items in evaluated.items()},
+                    job_profiles, 0
+                )
+                for profile_index, items in evaluated.items():
+                    for item, baseline in zip(items, baselines[profile_index]):
+                        if not isinstance(baseline, AnalysisError):
+                            item['linha_de_base'] = baseline
+            
+            for item in prepared:
+                i = item['indice']
+                run = runs[item['perfil']]
+                job_profile = run['perfil']
                 
-            except Exception as e:
-                logger.error(f"Erro ao processar candidato {i}: {e}")
-                continue
+                try:
+                    # Falha definitiva: o currículo vai para a fila de reprocessamento
+                    error = run['chaves_com_falha'].get(item['duplicata_de']) if item['duplicata_de'] is not None else item['analise']
+                    if isinstance(error, AnalysisError):
+                        if item['duplicata_de'] is None:
+                            run['chaves_com_falha'][i] = error
+                        self.dead_letter.add(item['doc'], job_profile, str(error), error.attempts)
+                        failure = {'arquivo': item['doc']['arquivo'], 'erro': f"análise falhou: {error}"}
+                        run['ignorados'].append(failure)
+                        self.analysis_failures.append(failure)
+                        logger.error(f"{run['rotulo']}Candidato {i} não pôde ser analisado ({error}); enviado para {self.dead_letter.path}")
+                        continue
+                    
+                    if item['duplicata_de'] is not None:
+                        representative = run['analises'][item['duplicata_de']]
+                        analysis = representative['analise']
+                        run['duplicatas'] += 1
+                        logger.info(f"{run['rotulo']}Candidato {i} é quase duplicata de {representative['arquivo']}; análise reaproveitada")
+                    else:
+                        analysis = item['analise']
+                    
+                    # O texto completo não é mantido; a pontuação total vem da matriz de notas, ao final
+                    candidate_data = {
+                        'contato': item['doc']['contato'],
+                        'arquivo': item['doc']['arquivo'],
+                        'analise': analysis
+                    }
+                    
+                    for key in ('caminho', 'pre_triagem', 'similaridade_semantica'):
+                        if key in item['doc']:
+                            candidate_data[key] = item['doc'][key]
+                    
+                    if item['stats'] is not None:
+                        saved = item['stats']['tokens_originais'] - item['stats']['tokens_enviados']
+                        candidate_data['tokens_economizados'] = saved
+                        run['tokens_economizados'] += saved
+                    
+                    if 'linha_de_base' in item:
+                        baseline = item['linha_de_base']
+                        agreement = score_agreement(analysis, baseline, job_profile)
+                        candidate_data['concordancia_texto_completo'] = agreement
+                        run['concordancias'].append(agreement)
+                        run['linhas_de_base'].append((len(run['candidatos']), baseline))
+                    
+                    if item['duplicata_de'] is not None:
+                        candidate_data['duplicata_de'] = run['analises'][item['duplicata_de']]['arquivo']
+                    elif run['dedup'] is not None:
+                        run['analises'][i] = candidate_data
+                    
+                    run['candidatos'].append(candidate_data)
+                    
+                    logger.info(f"{run['rotulo']}Candidato {i} processado")
+                    
+                except Exception as e:
+                    logger.error(f"{run['rotulo']}Erro ao processar candidato {i}: {e}")
+                    continue
+            
+            del batch, prepared, cv_texts
         
-        return candidates_data
+        for run in runs:
+            job_profile = run['perfil']
+            run['matriz'] = self.score_candidates(run['candidatos'], job_profile)
+            
+            if run['ignorados']:
+                logger.warning(
+                    f"{run['rotulo']}{len(run['ignorados'])} currículos não puderam ser analisados; "
+                    f"reprocesse com --retry-failed ({self.dead_letter.path})"
+                )
+            
+            if run['duplicatas']:
+                logger.info(f"{run['rotulo']}Quase duplicatas detectadas: {run['duplicatas']} (análises reaproveitadas)")
+            
+            if compressor is not None:
+                logger.info(f"{run['rotulo']}Compressão de currículos: {run['tokens_economizados']} tokens economizados (orçamento de {self.token_budget} por currículo)")
+            
+            if run['concordancias']:
+                totals = run['matriz'].totals()
+                baseline_totals = ScoreMatrix.from_analyses([baseline for _, baseline in run['linhas_de_base']], job_profile).totals()
+                score_deltas = [abs(totals[position] - baseline_total)
+                                for (position, _), baseline_total in zip(run['linhas_de_base'], baseline_totals)]
+                agreements = run['concordancias']
+                logger.info(
+                    f"{run['rotulo']}Concordância com o texto completo em {len(agreements)} currículos: "
+                    f"{100 * sum(agreements) / len(agreements):.1f}% das notas iguais, "
+                    f"diferença média na pontuação total de {sum(score_deltas) / len(score_deltas):.2f}"
+                )
+        
+        if self.pack_size != 1:
+            self._log_packing_stats()
+        
+        self.openai_analyzer.log_request_metrics()
+        self.openai_analyzer.log_cascade_metrics()
+        self.openai_analyzer.log_rescoring_metrics()
+        self.openai_analyzer.log_parse_metrics()
+        
+        if self.analysis_cache:
+            logger.info(f"Cache de análises: {self.analysis_cache.hits} hits, {self.analysis_cache.misses} misses")
+            logger.info(
+                f"Cache de notas por atributo: {self.analysis_cache.score_hits} hits, "
+                f"{self.analysis_cache.score_partial_hits} parciais, {self.analysis_cache.score_misses} misses"
+            )
+        
+        return runs
+    
+    def _analyze_groups(self, cv_texts: Dict[int, List[str]], job_profiles: List[Dict[str, List[str]]],
+                        max_length: int, pack_size: int = 1, source_texts: Dict[int, List[str]] = None) -> Dict[int, List[Any]]:
+        """
+        Analisa os textos do lote agrupados por perfil
+        
+        Args:
+            cv_texts: Textos a analisar por posição do perfil em job_profiles
+            job_profiles: Perfis das vagas
+            max_length: Limite de caracteres enviados ao modelo (0 = texto completo)
+            pack_size: Currículos por requisição
+            source_texts: Textos extraídos dos documentos, quando cv_texts foram comprimidos (padrão: cv_texts)
+            
+        Returns:
+            Análises (ou AnalysisError) por posição do perfil, na ordem dos textos
+        """
+        if not cv_texts:
+            return {}
+        
+        source_texts = cv_texts if source_texts is None else source_texts
+        options = {'concurrency': self.concurrency, 'max_length': max_length, 'pack_size': pack_size}
+        if len(cv_texts) == 1:
+            (profile_index, texts), = cv_texts.items()
+            return {profile_index: self.openai_analyzer.analyze_many(
+                texts, job_profiles[profile_index], source_texts=source_texts[profile_index], **options
+            )}
+        
+        # Vários perfis no mesmo lote: as requisições de todos disputam a mesma concorrência
+        results = self.openai_analyzer.analyze_many_profiles(
+            [(texts, job_profiles[profile_index]) for profile_index, texts in cv_texts.items()],
+            source_texts=[source_texts[profile_index] for profile_index in cv_texts], **options
+        )
+        return dict(zip(cv_texts, results))
     
-    def generate_report(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]], output_file: str = None, format: str = 'xlsx') -> str:
+    def score_candidates(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> ScoreMatrix:
+        """
+        Monta a matriz de notas e grava a pontuação total de cada candidato
+        
+        Args:
+            candidates_data: Dados dos candidatos com 'analise'
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Matriz de notas, na ordem de candidates_data (também em self.score_matrix)
+        """
+        self.score_matrix = ScoreMatrix.from_analyses((c['analise'] for c in candidates_data), job_profile)
+        for candidate, total in zip(candidates_data, self.score_matrix.totals().tolist()):
+            candidate['pontuacao_total'] = total
+        return self.score_matrix
+    
+    def _log_packing_stats(self):
+        """Registra os tokens de prompt por candidato do modo empacotado e do modo individual"""
+        stats = self.openai_analyzer.packing_stats
+        if not stats['candidatos']:
+            return
+        
+        packed = stats['tokens_prompt'] / stats['candidatos']
+        single = stats['tokens_prompt_individual'] / stats['candidatos']
+        logger.info(
+            f"Empacotamento: {stats['candidatos']} currículos em {stats['requisicoes']} requisições "
+            f"(até {stats['tamanho']} por requisição); {packed:.0f} tokens de prompt por candidato "
+            f"contra {single:.0f} no modo individual ({100 * (1 - packed / single):.0f}% a menos); "
+            f"{stats['reanalisados']} reanalisados individualmente"
+        )
+    
+    def generate_report(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]], output_file: str = None, format: str = 'xlsx', skipped_files: List[Dict[str, str]] = None,
+                        score_matrix: ScoreMatrix = None) -> str:
         """
         Gera relatório em Excel ou CSV
         
@@ -126,6 +615,8 @@ class TalentScan:
             job_profile: Perfil da vaga
             output_file: Nome do arquivo de saída
             format: Formato do arquivo ('xlsx' ou 'csv')
+            skipped_files: Arquivos ignorados na extração (opcional)
+            score_matrix: Matriz de notas dos candidatos (opcional; montada se ausente)
             
         Returns:
             Caminho do arquivo gerado
@@ -133,7 +624,10 @@ class TalentScan:
         logger.info(f"Gerando relatório {format.upper()}...")
         
         if format.lower() == 'csv':
-            return self.excel_generator.export_to_csv(candidates_data, job_profile, output_file)
+            csv_file = self.excel_generator.export_to_csv(candidates_data, job_profile, output_file)
+            if skipped_files:
+                self.excel_generator.export_skipped_to_csv(skipped_files, csv_file)
+            return csv_file
         
         # Gerar relatório principal (Excel)
         excel_file = self.excel_generator.create_analysis_report(
@@ -143,7 +637,11 @@ class TalentScan:
         )
         
         # Adicionar planilha de resumo
-        self.excel_generator.create_summary_sheet(candidates_data, job_profile)
+        self.excel_generator.create_summary_sheet(candidates_data, job_profile, score_matrix)
+        
+        # Adicionar planilha de arquivos ignorados
+        if skipped_files:
+            self.excel_generator.create_skipped_sheet(skipped_files)
         
         # Salvar novamente com a planilha de resumo
         self.excel_generator.workbook.save(excel_file)
@@ -151,12 +649,316 @@ class TalentScan:
         logger.info(f"Relatório gerado com sucesso: {excel_file}")
         return excel_file
     
+    def _report_results(self, candidates_data: List[Dict[str, Any]], job_profile: Dict[str, List[str]], output_file: str = None, format: str = 'xlsx',
+                        score_matrix: ScoreMatrix = None, analysis_failures: List[Dict[str, str]] = None):
+        """
+        Gera o relatório e registra as estatísticas finais
+        
+        Args:
+            candidates_data: Dados dos candidatos
+            job_profile: Perfil da vaga
+            output_file: Arquivo de saída (opcional)
+            format: Formato de saída ('xlsx' ou 'csv')
+            score_matrix: Matriz de notas destes candidatos (padrão: self.score_matrix)
+            analysis_failures: Análises que falharam (padrão: todas desta execução)
+        """
+        # Gerar relatório
+        skipped_files = self.document_reader.failed_files + (self.analysis_failures if analysis_failures is None else analysis_failures)
+        # Matriz montada ao final da análise destes candidatos
+        matrix = score_matrix if score_matrix is not None else self.score_matrix
+        if matrix is None:
+            matrix = self.score_candidates(candidates_data, job_profile)
+        excel_file = self.generate_report(candidates_data, job_profile, output_file, format, skipped_files, matrix)
+        
+        # Estatísticas finais
+        total_candidates = len(candidates_data)
+        if total_candidates > 0:
+            avg_score = float(matrix.totals().mean())
+            best_candidate = candidates_data[matrix.ranking()[0]]
+            
+            logger.info("=== ANÁLISE CONCLUÍDA ===")
+            logger.info(f"Total de candidatos processados: {total_candidates}")
+            logger.info(f"Pontuação média: {avg_score:.2f}")
+            logger.info(f"Melhor candidato: {best_candidate.get('contato', {}).get('nome', 'N/A')} - {best_candidate.get('pontuacao_total', 0)} pontos")
+            if skipped_files:
+                logger.info(f"Arquivos ignorados: {len(skipped_files)} (ver seção de ignorados no relatório)")
+            logger.info(f"Relatório salvo em: {excel_file}")
+        else:
+            logger.warning("Análise concluída, mas sem dados para estatísticas.")
+    
+    def _validate_inputs(self, cv_directory: str, profile_file: str):
+        """
+        Valida o caminho dos currículos e o arquivo de perfil, encerrando em caso de erro
+        
+        Args:
+            cv_directory: Diretório com currículos ou arquivo .zip/.tar.gz
+            profile_file: Arquivo com perfil da vaga
+        """
+        # Validar inputs
+        if not cv_directory or not isinstance(cv_directory, str):
+            logger.error("Diretório de currículos inválido")
+            sys.exit(1)
+        
+        if not profile_file or not isinstance(profile_file, str):
+            logger.error("Arquivo de perfil inválido")
+            sys.exit(1)
+        
+        # Verificar se diretório existe
+        if not os.path.exists(cv_directory):
+            logger.error(f"Diretório não encontrado: {cv_directory}")
+            sys.exit(1)
+        
+        is_archive = os.path.isfile(cv_directory) and self.document_reader.is_archive(cv_directory)
+        if not os.path.isdir(cv_directory) and not is_archive:
+            logger.error(f"O caminho especificado não é um diretório nem um arquivo compactado: {cv_directory}")
+            sys.exit(1)
+        
+        # Verificar se arquivo de perfil existe
+        if not os.path.exists(profile_file):
+            logger.error(f"Arquivo de perfil não encontrado: {profile_file}")
+            sys.exit(1)
+        
+        if not os.path.isfile(profile_file):
+            logger.error(f"O caminho do perfil não é um arquivo: {profile_file}")
+            sys.exit(1)
+    
+    def _batch_records(self, documents: Iterable[Dict[str, Any]], job_profile: Dict[str, List[str]]) -> Iterable[Dict[str, Any]]:
+        """
+        Converte os documentos em registros do lote (modo batch)
+        
+        Duplicatas e análises já em cache não geram requisições.
+        
+        Args:
+            documents: Documentos com 'arquivo', 'texto' e 'contato'
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Iterador de registros para BatchJob.prepare
+        """
+        dedup_index = NearDuplicateIndex(self.dedup_threshold) if self.dedup_threshold > 0 else None
+        compressor = CVCompressor(self.token_budget) if self.token_budget > 0 else None
+        max_length = 0 if compressor is not None else 3000
+        
+        for i, doc in enumerate(documents, 1):
+            record = {'id': f"cv-{i}", 'arquivo': doc['arquivo'], 'contato': doc['contato'], 'texto': doc['texto']}
+            for key in ('pre_triagem', 'similaridade_semantica'):
+                if key in doc:
+                    record[key] = doc[key]
+            
+            duplicate_of = dedup_index.find_or_add(record['id'], doc['texto']) if dedup_index is not None else None
+            if duplicate_of is not None:
+                record['duplicata_de'] = duplicate_of
+                yield record
+                continue
+            
+            cv_text = doc['texto']
+            if compressor is not None:
+                cv_text, stats = compressor.compress(doc['texto'], job_profile)
+                record['tokens_economizados'] = stats['tokens_originais'] - stats['tokens_enviados']
+            
+            cache_key, cached = self.openai_analyzer.lookup_cache(cv_text, job_profile, max_length)
+            if cached is not None:
+                record['analise'] = cached
+            else:
+                record['requisicao'] = self.openai_analyzer.batch_request(cv_text, job_profile, max_length)
+                record['chave_cache'] = cache_key
+            yield record
+    
+    def _ingest_batch(self, job: BatchJob, job_profile: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """
+        Importa as respostas de um lote terminado
+        
+        Args:
+            job: Lote com todos os envios em estado final
+            job_profile: Perfil da vaga
+            
+        Returns:
+            Lista com dados processados dos candidatos
+        """
+        results = {result['id']: result for result in job.iter_results()}
+        candidates_data = []
+        analyzed = {}
+        failed = {}
+        duplicates = 0
+        
+        for record in job.iter_candidates():
+            record_id = record['id']
+            analysis, error = record.get('analise'), None
+            
+            if analysis is None and record.get('duplicata_de'):
+                representative = analyzed.get(record['duplicata_de'])
+                if representative is not None:
+                    analysis = representative['analise']
+                    duplicates += 1
+                else:
+                    error = failed.get(record['duplicata_de'], "representante sem análise")
+            elif analysis is None:
+                result = results.get(record_id)
+                if result is None:
+                    error = "sem resposta no lote"
+                elif 'erro' in result:
+                    error = result['erro']
+                else:
+                    try:
+                        analysis = self.openai_analyzer.parse_batch_response(result['conteudo'], job_profile, record.get('chave_cache'))
+                    except AnalysisError as e:
+                        error = str(e)
+            
+            if error is not None:
+                failed[record_id] = error
+                self.dead_letter.add(record, job_profile, error)
+                self.analysis_failures.append({'arquivo': record['arquivo'], 'erro': f"análise falhou: {error}"})
+                continue
+            
+            candidate_data = {
+                'contato': record['contato'],
+                'arquivo': record['arquivo'],
+                'analise': analysis
+            }
+            for key in ('pre_triagem', 'similaridade_semantica'):
+                if key in record:
+                    candidate_data[key] = record[key]
+            if 'tokens_economizados' in record:
+                candidate_data['tokens_economizados'] = record['tokens_economizados']
+            if record.get('duplicata_de'):
+                candidate_data['duplicata_de'] = analyzed[record['duplicata_de']]['arquivo']
+            else:
+                analyzed[record_id] = candidate_data
+            
+            candidates_data.append(candidate_data)
+        
+        self.score_candidates(candidates_data, job_profile)
+        logger.info(f"Lote importado: {len(candidates_data)} candidatos analisados, {len(failed)} falhas")
+        self.openai_analyzer.log_parse_metrics()
+        if duplicates:
+            logger.info(f"Quase duplicatas detectadas: {duplicates} (análises reaproveitadas)")
+        if failed:
+            logger.warning(f"{len(failed)} currículos não puderam ser analisados; reprocesse com --retry-failed ({self.dead_letter.path})")
+        
+        return candidates_data
+    
+    def run_batch(self, cv_directory: str, profile_file: str, output_file: str = None, format: str = 'xlsx',
+                  poll_interval: float = None, max_wait: float = None):
+        """
+        Executa a análise pela Batch API (sem latência interativa, menor custo)
+        
+        Se houver um lote em andamento no diretório de estado, ele é retomado
+        e os currículos não são lidos novamente.
+        
+        Args:
+            cv_directory: Diretório com currículos ou arquivo .zip/.tar.gz
+            profile_file: Arquivo com perfil da vaga
+            output_file: Arquivo de saída (opcional)
+            format: Formato de saída ('xlsx' ou 'csv')
+            poll_interval: Intervalo entre consultas ao lote em segundos
+            max_wait: Tempo máximo de espera nesta execução (None = até terminar)
+        """
+        logger.info("=== INICIANDO TALENTSCAN (MODO BATCH) ===")
+        
+        try:
+            transport = self.batch_transport or OpenAIBatchTransport(self.openai_analyzer.client)
+            job = BatchJob(transport, self.batch_dir)
+            
+            if job.pending():
+                logger.info(f"Retomando lote em {job.state_dir} (fase: {job.state['fase']})")
+                job_profile = job.job_profile
+            else:
+                self._validate_inputs(cv_directory, profile_file)
+                job_profile = self.load_job_profile(profile_file)
+                
+                file_paths = self.document_reader.list_inputs(cv_directory)
+                if not file_paths:
+                    logger.warning("Nenhum documento encontrado no diretório")
+                    return
+                
+                documents = self.document_reader.iter_documents(file_paths, workers=self.workers)
+                documents = self.semantic_shortlist(self.prescreen(documents, job_profile), job_profile)
+                job.prepare(self._batch_records(documents, job_profile), job_profile)
+                
+                if self.document_reader.failed_files:
+                    logger.warning(f"{len(self.document_reader.failed_files)} arquivos não puderam ser lidos")
+            
+            if job.state['fase'] == 'preparado':
+                job.submit()
+            
+            if not job.wait(poll_interval, max_wait):
+                return
+            
+            candidates_data = self._ingest_batch(job, job_profile)
+            job.finish()
+            
+            if not candidates_data:
+                logger.warning("Nenhum candidato foi processado com sucesso")
+                return
+            
+            self._report_results(candidates_data, job_profile, output_file, format)
+            
+        except KeyboardInterrupt:
+            logger.info("\nOperação interrompida pelo usuário; execute novamente para retomar o lote")
+            sys.exit(0)
+        except Exception as e:
+            logger.critical(f"Erro crítico durante a execução em lote: {e}", exc_info=True)
+            sys.exit(1)
+    
+    def retry_failed(self, output_file: str = None, format: str = 'xlsx'):
+        """
+        Reprocessa apenas as análises que falharam em execuções anteriores
+        
+        As entradas da fila guardam o texto e o perfil da vaga, então os
+        arquivos originais não precisam ser lidos novamente. Análises que
+        falharem de novo voltam para a fila.
+        
+        Args:
+            output_file: Arquivo de saída (opcional)
+            format: Formato de saída ('xlsx' ou 'csv')
+        """
+        logger.info("=== REPROCESSANDO ANÁLISES PENDENTES ===")
+        
+        try:
+            entries = self.dead_letter.drain()
+            if not entries:
+                logger.info(f"Nenhuma análise pendente em {self.dead_letter.path}")
+                return
+            
+            # Um relatório por perfil de vaga presente na fila
+            groups = {}
+            for entry in entries:
+                key = json.dumps(entry['perfil'], sort_keys=True, ensure_ascii=False)
+                groups.setdefault(key, []).append(entry)
+            
+            logger.info(f"{len(entries)} análises pendentes, {len(groups)} perfil(is) de vaga")
+            
+            for n, group in enumerate(groups.values(), 1):
+                job_profile = group[0]['perfil']
+                group_output = output_file
+                if len(groups) > 1:
+                    base, extension = os.path.splitext(output_file or f"analise_reprocessada.{format}")
+                    group_output = f"{base}_{n}{extension}"
+                
+                # Cada relatório lista apenas as falhas do seu perfil
+                first_failure = len(self.analysis_failures)
+                candidates_data = self.analyze_documents(group, job_profile)
+                if candidates_data:
+                    self._report_results(candidates_data, job_profile, group_output, format,
+                                         analysis_failures=self.analysis_failures[first_failure:])
+                else:
+                    logger.warning("Nenhum candidato foi reprocessado com sucesso")
+            
+            self.dead_letter.commit()
+            
+        except KeyboardInterrupt:
+            logger.info("\nOperação interrompida pelo usuário")
+            sys.exit(0)
+        except Exception as e:
+            logger.critical(f"Erro crítico durante o reprocessamento: {e}", exc_info=True)
+            sys.exit(1)
+    
     def run(self, cv_directory: str, profile_file: str, output_file: str = None, format: str = 'xlsx'):
         """
         Executa o processo completo de análise
         
         Args:
-            cv_directory: Diretório com currículos
+            cv_directory: Diretório com currículos ou arquivo .zip/.tar.gz
             profile_file: Arquivo com perfil da vaga
             output_file: Arquivo de saída (opcional)
             format: Formato de saída ('xlsx' ou 'csv')
@@ -164,32 +966,7 @@ class TalentScan:
         logger.info("=== INICIANDO TALENTSCAN ===")
         
         try:
-            # Validar inputs
-            if not cv_directory or not isinstance(cv_directory, str):
-                logger.error("Diretório de currículos inválido")
-                sys.exit(1)
-                
-            if not profile_file or not isinstance(profile_file, str):
-                logger.error("Arquivo de perfil inválido")
-                sys.exit(1)
-
-            # Verificar se diretório existe
-            if not os.path.exists(cv_directory):
-                logger.error(f"Diretório não encontrado: {cv_directory}")
-                sys.exit(1)
-            
-            if not os.path.isdir(cv_directory):
-                logger.error(f"O caminho especificado não é um diretório: {cv_directory}")
-                sys.exit(1)
-            
-            # Verificar se arquivo de perfil existe
-            if not os.path.exists(profile_file):
-                logger.error(f"Arquivo de perfil não encontrado: {profile_file}")
-                sys.exit(1)
-                
-            if not os.path.isfile(profile_file):
-                logger.error(f"O caminho do perfil não é um arquivo: {profile_file}")
-                sys.exit(1)
+            self._validate_inputs(cv_directory, profile_file)
             
             # Carregar perfil da vaga
             job_profile = self.load_job_profile(profile_file)
@@ -201,22 +978,61 @@ class TalentScan:
                 logger.warning("Nenhum candidato foi processado com sucesso")
                 return
             
-            # Gerar relatório
-            excel_file = self.generate_report(candidates_data, job_profile, output_file, format)
+            self._report_results(candidates_data, job_profile, output_file, format)
             
-            # Estatísticas finais
-            total_candidates = len(candidates_data)
-            if total_candidates > 0:
-                avg_score = sum(c.get('pontuacao_total', 0) for c in candidates_data) / total_candidates
-                best_candidate = max(candidates_data, key=lambda x: x.get('pontuacao_total', 0))
-                
-                logger.info("=== ANÁLISE CONCLUÍDA ===")
-                logger.info(f"Total de candidatos processados: {total_candidates}")
-                logger.info(f"Pontuação média: {avg_score:.2f}")
-                logger.info(f"Melhor candidato: {best_candidate.get('contato', {}).get('nome', 'N/A')} - {best_candidate.get('pontuacao_total', 0)} pontos")
-                logger.info(f"Relatório salvo em: {excel_file}")
-            else:
-                logger.warning("Análise concluída, mas sem dados para estatísticas.")
+        except KeyboardInterrupt:
+            logger.info("\nOperação interrompida pelo usuário")
+            sys.exit(0)
+        except Exception as e:
+            logger.critical(f"Erro crítico durante a execução: {e}", exc_info=True)
+            sys.exit(1)
+
+    def run_profiles(self, cv_directory: str, profile_files: List[str], output_file: str = None, format: str = 'xlsx'):
+        """
+        Executa a análise dos mesmos currículos para vários perfis de vaga
+        
+        Gera um relatório por perfil (nome de saída com o sufixo _<perfil>) e um
+        relatório com a melhor vaga de cada candidato (sufixo _melhor_vaga).
+        
+        Args:
+            cv_directory: Diretório com currículos ou arquivo .zip/.tar.gz
+            profile_files: Arquivos com os perfis das vagas
+            output_file: Arquivo de saída base (opcional)
+            format: Formato de saída ('xlsx' ou 'csv')
+        """
+        logger.info(f"=== INICIANDO TALENTSCAN ({len(profile_files)} PERFIS) ===")
+        
+        try:
+            for profile_file in profile_files:
+                self._validate_inputs(cv_directory, profile_file)
+            
+            names = profile_names(profile_files)
+            job_profiles = [self.load_job_profile(profile_file) for profile_file in profile_files]
+            
+            runs = self.process_profiles(cv_directory, job_profiles, names)
+            
+            if not any(run['candidatos'] for run in runs):
+                logger.warning("Nenhum candidato foi processado com sucesso")
+                return
+            
+            if not output_file:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                output_file = f"analise_curriculos_{timestamp}.{format}"
+            base, extension = os.path.splitext(output_file)
+            extension = extension or f".{format}"
+            
+            for name, job_profile, run in zip(names, job_profiles, runs):
+                if not run['candidatos']:
+                    logger.warning(f"[{name}] Nenhum candidato foi processado com sucesso")
+                    continue
+                logger.info(f"=== PERFIL: {name} ===")
+                self._report_results(run['candidatos'], job_profile, f"{base}_{name}{extension}", format,
+                                     run['matriz'], run['ignorados'])
+            
+            best_fit_file = self.excel_generator.create_best_fit_report(
+                names, [run['candidatos'] for run in runs], f"{base}_melhor_vaga{extension}", format
+            )
+            logger.info(f"Melhor vaga de cada candidato salva em: {best_fit_file}")
             
         except KeyboardInterrupt:
             logger.info("\nOperação interrompida pelo usuário")
@@ -225,6 +1041,44 @@ class TalentScan:
             logger.critical(f"Erro crítico durante a execução: {e}", exc_info=True)
             sys.exit(1)
 
+def list_profile_files(paths: List[str]) -> List[str]:
+    """
+    Expande os caminhos de perfil: diretórios contribuem com seus arquivos .txt
+    
+    Args:
+        paths: Arquivos de perfil e/ou diretórios com arquivos de perfil
+        
+    Returns:
+        Arquivos de perfil, na ordem recebida (arquivos de cada diretório em ordem alfabética)
+    """
+    profile_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            profile_files.extend(sorted(str(file) for file in Path(path).glob('*.txt') if file.is_file()))
+        else:
+            profile_files.append(path)
+    return profile_files
+
+def profile_names(profile_files: List[str]) -> List[str]:
+    """
+    Nome de cada perfil (nome do arquivo sem extensão), usado nos relatórios
+    
+    Args:
+        profile_files: Arquivos de perfil
+        
+    Returns:
+        Nomes distintos, na ordem dos arquivos; repetidos recebem um sufixo numérico
+    """
+    names = []
+    for profile_file in profile_files:
+        name = base = Path(profile_file).stem
+        n = 1
+        while name in names:
+            n += 1
+            name = f"{base}_{n}"
+        names.append(name)
+    return names
+
 def main():
     """Função principal"""
     try:
@@ -235,20 +1089,30 @@ def main():
 Exemplos de uso:
   python talent_scan.py -c curriculos/ -p perfil_vaga.txt
   python talent_scan.py -c curriculos/ -p perfil_vaga.txt -o relatorio.xlsx
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --workers 8
+  python talent_scan.py -c curriculos/ -p backend.txt frontend.txt dados.txt -o triagem.xlsx
+  python talent_scan.py -c curriculos/ -p perfis/
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --concurrency 16
+  python talent_scan.py -c candidaturas.zip -p perfil_vaga.txt
+  python talent_scan.py --retry-failed
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --mode batch
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --token-budget 500 --compression-eval 10
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --backend local --local-latency lognormal:800,0.5 --local-429 0.05
+  python talent_scan.py -c curriculos/ -p perfil_vaga.txt --cascade-model gpt-4o --cascade-band 0.5
   python talent_scan.py --help
             """
         )
         
         parser.add_argument(
             '-c', '--curriculos',
-            required=True,
-            help='Diretório contendo os currículos (PDF e DOCX)'
+            help='Diretório ou arquivo compactado (.zip, .tar.gz) contendo os currículos (PDF, DOCX e TXT)'
         )
         
         parser.add_argument(
             '-p', '--perfil',
-            required=True,
-            help='Arquivo de texto com o perfil da vaga'
+            nargs='+',
+            help='Arquivo(s) de texto com o perfil da vaga, ou diretório com um .txt por vaga; '
+                 'com vários perfis, os currículos são lidos uma vez e cada vaga ganha seu relatório'
         )
         
         parser.add_argument(
@@ -263,6 +1127,189 @@ Exemplos de uso:
             help='Formato do arquivo de saída (padrão: xlsx)'
         )
         
+        parser.add_argument(
+            '--mode',
+            choices=['online', 'batch'],
+            default='online',
+            help='online: requisições interativas; batch: Batch API da OpenAI, retomável (padrão: online)'
+        )
+        
+        parser.add_argument(
+            '--batch-dir',
+            help='Diretório de estado do modo batch (padrão: BATCH_STATE_DIR)'
+        )
+        
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Intervalo em segundos entre consultas ao lote (padrão: BATCH_POLL_INTERVAL)'
+        )
+        
+        parser.add_argument(
+            '--max-wait',
+            type=float,
+            help='Tempo máximo de espera pelo lote nesta execução, em segundos (padrão: até terminar)'
+        )
+        
+        parser.add_argument(
+            '-w', '--workers',
+            type=int,
+            default=1,
+            help='Número de processos para leitura paralela dos currículos (padrão: 1)'
+        )
+        
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Número de análises simultâneas na API OpenAI (padrão: ANALYSIS_CONCURRENCY)'
+        )
+        
+        parser.add_argument(
+            '--rpm-limit',
+            type=int,
+            help='Requisições por minuto permitidas pela conta OpenAI (padrão: OPENAI_RPM_LIMIT; 0 = aprender pelos cabeçalhos)'
+        )
+        
+        parser.add_argument(
+            '--tpm-limit',
+            type=int,
+            help='Tokens por minuto permitidos pela conta OpenAI (padrão: OPENAI_TPM_LIMIT; 0 = aprender pelos cabeçalhos)'
+        )
+        
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Desativa o cache de extração de documentos'
+        )
+        
+        parser.add_argument(
+            '--no-analysis-cache',
+            action='store_true',
+            help='Desativa o cache de respostas da API (todas as análises são refeitas)'
+        )
+        
+        parser.add_argument(
+            '--rebuild-cache',
+            action='store_true',
+            help='Descarta o cache de extração e extrai todos os documentos novamente'
+        )
+        
+        parser.add_argument(
+            '--full-text',
+            action='store_true',
+            help='Extrai todas as páginas dos PDFs, sem o orçamento de caracteres'
+        )
+        
+        parser.add_argument(
+            '--extraction-timeout',
+            type=float,
+            help='Tempo máximo em segundos para extrair cada arquivo (padrão: EXTRACTION_TIMEOUT; 0 = sem limite)'
+        )
+        
+        parser.add_argument(
+            '--extraction-memory',
+            type=int,
+            help='Memória máxima em MB por processo de extração (padrão: EXTRACTION_MAX_MEMORY_MB; 0 = sem limite)'
+        )
+        
+        parser.add_argument(
+            '--no-isolation',
+            action='store_true',
+            help='Extrai os arquivos no próprio processo, sem os limites de tempo e memória (com --workers 1)'
+        )
+        
+        parser.add_argument(
+            '--dedup-threshold',
+            type=float,
+            help='Similaridade (0-1) a partir da qual currículos são tratados como duplicatas (padrão: DEDUP_THRESHOLD; 0 = desativa)'
+        )
+        
+        parser.add_argument(
+            '--prescreen-top',
+            type=int,
+            help='Pré-triagem BM25: envia ao modelo apenas os N currículos mais aderentes (padrão: PRESCREEN_TOP_N; 0 = desativa)'
+        )
+        
+        parser.add_argument(
+            '--prescreen-threshold',
+            type=float,
+            help='Pré-triagem BM25: pontuação mínima de 0 a 1 para enviar ao modelo (padrão: PRESCREEN_THRESHOLD; 0 = desativa)'
+        )
+        
+        parser.add_argument(
+            '--semantic-top',
+            type=int,
+            help='Pré-seleção semântica: envia ao modelo apenas os K currículos mais próximos dos atributos (padrão: SEMANTIC_TOP_K; 0 = desativa)'
+        )
+        
+        parser.add_argument(
+            '--embedding-backend',
+            choices=['local', 'openai'],
+            help='Gerador de embeddings da pré-seleção semântica (padrão: EMBEDDING_BACKEND)'
+        )
+        
+        parser.add_argument(
+            '--token-budget',
+            type=int,
+            help='Tokens por currículo enviados ao modelo após a compressão por relevância (padrão: COMPRESSION_TOKEN_BUDGET; 0 = desativa)'
+        )
+        
+        parser.add_argument(
+            '--compression-eval',
+            type=int,
+            default=0,
+            help='Analisa também com o texto completo os N primeiros currículos comprimidos e registra a concordância (padrão: 0)'
+        )
+        
+        parser.add_argument(
+            '--pack',
+            type=int,
+            nargs='?',
+            const=0,
+            default=1,
+            metavar='K',
+            help='Envia K currículos por requisição; sem K, calcula pela janela de contexto do modelo (padrão: 1 por requisição)'
+        )
+        
+        parser.add_argument(
+            '--backend',
+            choices=['openai', 'local'],
+            help='openai: API da OpenAI (ou OPENAI_BASE_URL); local: servidor simulado, sem custo, para testes de carga (padrão: ANALYZER_BACKEND)'
+        )
+        
+        parser.add_argument(
+            '--local-latency',
+            help='Backend local: latência das respostas em ms, ex.: fixed:500, uniform:200,900, lognormal:800,0.5 (padrão: LOCAL_LATENCY)'
+        )
+        
+        parser.add_argument(
+            '--local-429',
+            type=float,
+            help='Backend local: fração das requisições respondidas com 429 (padrão: LOCAL_RATE_LIMIT_RATIO)'
+        )
+        
+        parser.add_argument(
+            '--cascade-model',
+            help='Modelo mais forte que reanalisa os candidatos perto do corte; o primeiro passo usa OPENAI_MODEL (padrão: CASCADE_MODEL)'
+        )
+        
+        parser.add_argument(
+            '--cascade-band',
+            type=float,
+            help='Distância máxima da pontuação total até MIN_SCORE_THRESHOLD para reanalisar (padrão: CASCADE_BAND)'
+        )
+        
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Reprocessa apenas as análises que falharam em execuções anteriores (dispensa -c e -p)'
+        )
+        
+        parser.add_argument(
+            '--dead-letter',
+            help='Arquivo com as análises que falharam (padrão: DEAD_LETTER_FILE)'
+        )
+        
         parser.add_argument(
             '--verbose',
             action='store_true',
@@ -271,13 +1318,61 @@ Exemplos de uso:
         
         args = parser.parse_args()
         
+        # Um lote em andamento é retomado sem -c/-p
+        if not args.retry_failed and args.mode != 'batch' and (not args.curriculos or not args.perfil):
+            parser.error("os argumentos -c/--curriculos e -p/--perfil são obrigatórios (exceto com --retry-failed ou --mode batch)")
+        
+        profile_files = list_profile_files(args.perfil or [])
+        if args.perfil and not profile_files:
+            parser.error("nenhum arquivo de perfil (.txt) encontrado em -p/--perfil")
+        if args.mode == 'batch' and len(profile_files) > 1:
+            parser.error("o modo batch aceita um único perfil de vaga")
+        
         # Configurar nível de log
         if args.verbose:
             logging.getLogger().setLevel(logging.DEBUG)
         
+        backend = None
+        if (args.backend or Config.ANALYZER_BACKEND) == 'local':
+            backend = create_analyzer_backend('local', latency=args.local_latency, rate_limit_ratio=args.local_429)
+        
         # Criar e executar aplicação
-        app = TalentScan()
-        app.run(args.curriculos, args.perfil, args.output, args.format)
+        app = TalentScan(
+            workers=args.workers,
+            use_cache=not args.no_cache,
+            rebuild_cache=args.rebuild_cache,
+            full_text=args.full_text,
+            extraction_timeout=args.extraction_timeout,
+            extraction_memory_mb=args.extraction_memory,
+            isolate_extraction=False if args.no_isolation else None,
+            dedup_threshold=args.dedup_threshold,
+            token_budget=args.token_budget,
+            compression_eval=args.compression_eval,
+            concurrency=args.concurrency,
+            rpm_limit=args.rpm_limit,
+            tpm_limit=args.tpm_limit,
+            dead_letter_file=args.dead_letter,
+            use_analysis_cache=not args.no_analysis_cache,
+            batch_dir=args.batch_dir,
+            pack_size=args.pack,
+            prescreen_top_n=args.prescreen_top,
+            prescreen_threshold=args.prescreen_threshold,
+            semantic_top_k=args.semantic_top,
+            embedding_backend=args.embedding_backend,
+            analyzer_backend=backend,
+            cascade_model=args.cascade_model,
+            cascade_band=args.cascade_band
+        )
+        
+        if args.retry_failed:
+            app.retry_failed(args.output, args.format)
+        elif args.mode == 'batch':
+            app.run_batch(args.curriculos, profile_files[0] if profile_files else None, args.output, args.format,
+                          args.poll_interval, args.max_wait)
+        elif len(profile_files) > 1:
+            app.run_profiles(args.curriculos, profile_files, args.output, args.format)
+        else:
+            app.run(args.curriculos, profile_files[0], args.output, args.format)
         
     except Exception as e:
         print(f"Erro fatal: {e}")
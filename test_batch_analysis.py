@@ -0,0 +1,87 @@
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+from unittest.mock import patch
+from openai import OpenAI
+from batch_analysis import BatchJob, BatchTransport, OpenAIBatchTransport
+from mock_openai_server import MockOpenAIServer, keyword_responder
+from talent_scan import TalentScan
+
+PERFIL = "Requeridos:\n- Python\n- Kubernetes\nDesejáveis:\n- Docker\n"
+
+def responder(body):
+    if "Carla" in body['messages'][-1]['content']:
+        raise RuntimeError("falha simulada")
+    return keyword_responder(body)
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cv_dir = os.path.join(self.test_dir, "cvs")
+        os.makedirs(self.cv_dir)
+        cvs = {
+            "ana.txt": "Ana Souza\nDesenvolvedora Python com Kubernetes e Docker",
+            "bruno.txt": "Bruno Lima\nDesenvolvedor Python",
+            "carla.txt": "Carla Dias\nAnalista Python",
+        }
+        for name, text in cvs.items():
+            with open(os.path.join(self.cv_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        self.profile_file = os.path.join(self.test_dir, "perfil.txt")
+        with open(self.profile_file, "w", encoding="utf-8") as f:
+            f.write(PERFIL)
+
+        self.server = MockOpenAIServer(responder=responder, batch_polls=1)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.test_dir)
+
+    def _make_app(self):
+        transport = OpenAIBatchTransport(OpenAI(api_key="sk-test", base_url=self.server.base_url, max_retries=0))
+        app = TalentScan(
+            use_cache=False, use_analysis_cache=False, dedup_threshold=0, token_budget=0,
+            batch_dir=os.path.join(self.test_dir, "lote"), batch_transport=transport,
+            dead_letter_file=os.path.join(self.test_dir, "pendentes.jsonl")
+        )
+        app.document_reader.isolate = False
+        return app
+
+    def test_batch_run_resumes_and_ingests(self):
+        """Testa envio, retomada após interrupção e importação do resultado do lote"""
+        output = os.path.join(self.test_dir, "relatorio.csv")
+
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            # Primeira execução: envia o lote e para de esperar antes de ele terminar
+            self._make_app().run_batch(self.cv_dir, self.profile_file, output, 'csv', poll_interval=0, max_wait=0)
+            self.assertFalse(os.path.exists(output))
+
+            # Segunda execução: retoma o mesmo lote sem -c/-p e sem reenviar nada
+            app = self._make_app()
+            app.run_batch(None, None, output, 'csv', poll_interval=0)
+
+        self.assertEqual(self.server.requests.count("POST /v1/files"), 1)
+        self.assertEqual(self.server.requests.count("POST /v1/batches"), 1)
+
+        report = pd.read_csv(output, sep=';', encoding='utf-8-sig')
+        self.assertEqual(list(report['Arquivo']), ["ana.txt", "bruno.txt"])
+        self.assertEqual(list(report['Pontuação Total']), [5.0, 2.6])
+
+        # O currículo cuja requisição falhou vai para a fila de reprocessamento
+        self.assertEqual([e['arquivo'] for e in app.dead_letter.load()], ["carla.txt"])
+        self.assertFalse(BatchJob(None, os.path.join(self.test_dir, "lote")).pending())
+
+    def test_transport_interface_is_abstract(self):
+        """Testa se transportes que não implementam todas as operações do lote não podem ser criados"""
+        class UploadOnly(BatchTransport):
+            def upload(self, path):
+                return "file-1"
+
+        with self.assertRaises(TypeError):
+            UploadOnly()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+import shutil
+import re
+import tempfile
+from unittest.mock import AsyncMock, MagicMock, patch
+from analysis_cache import AnalysisCache
+from cv_compressor import CVCompressor, estimate_tokens, score_agreement
+from talent_scan import TalentScan
+from text_utils import tokenize
+
+JOB_PROFILE = {'requeridos': ['Python', 'Kubernetes'], 'desejaveis': ['Certificação AWS']}
+
+CV_LONGO = (
+    "CURRÍCULO\nAna Lima\nana@email.com\n\n"
+    "OBJETIVO:\n" + "Busco novos desafios em uma empresa dinâmica e inovadora. " * 15 + "\n\n"
+    "EXPERIÊNCIA PROFISSIONAL\nDesenvolvedora Python há 5 anos, com deploy em Kubernetes.\n\n"
+    "HOBBIES\n" + "Gosto de viajar, cozinhar e praticar esportes ao ar livre. " * 15 + "\n\n"
+    "CERTIFICAÇÕES\nCertificação AWS Solutions Architect Associate."
+)
+
+CV_VARIAS_AREAS = (
+    "CURRÍCULO\nBruno Reis\n\n"
+    "PYTHON\nDesenvolvimento de APIs em Python com testes automatizados e integração contínua.\n\n"
+    "SQL\nModelagem de bancos SQL, consultas otimizadas e migrações de dados em produção.\n\n"
+    "JAVA\nManutenção de sistemas legados em Java com Spring Boot e filas de mensagens.\n\n"
+    "OUTROS\n" + "Participação em eventos, voluntariado e cursos livres diversos. " * 6
+)
+
+class TestCVCompressor(unittest.TestCase):
+    def test_tokenize_folds_accents(self):
+        """Testa se acentos e flexões não impedem a correspondência de termos"""
+        self.assertEqual(tokenize("Certificação"), tokenize("certificacao"))
+        self.assertIn("c++", tokenize("Experiência com C++ e C#"))
+        self.assertNotIn("com", tokenize("Experiência com C++"))
+        self.assertEqual(tokenize("Node.js, ASP.NET e CI/CD"), ["node.js", "asp.net", "ci", "cd"])
+
+    def test_keeps_relevant_sections_within_budget(self):
+        """Testa se trechos relevantes, inclusive no fim do currículo, cabem no orçamento"""
+        compressor = CVCompressor(token_budget=60)
+        compressed, stats = compressor.compress(CV_LONGO, JOB_PROFILE)
+
+        self.assertLessEqual(estimate_tokens(compressed), 60)
+        self.assertIn("Kubernetes", compressed)
+        self.assertIn("Certificação AWS", compressed)
+        self.assertNotIn("esportes", compressed)
+        self.assertLess(compressed.index("Kubernetes"), compressed.index("Certificação AWS"))
+        self.assertEqual(stats['tokens_originais'], estimate_tokens(CV_LONGO))
+        self.assertEqual(stats['tokens_enviados'], estimate_tokens(compressed))
+
+    def test_short_cv_is_unchanged(self):
+        """Testa se currículos dentro do orçamento são enviados sem alteração"""
+        compressed, stats = CVCompressor(token_budget=1000).compress("Python e Kubernetes", JOB_PROFILE)
+        self.assertEqual(compressed, "Python e Kubernetes")
+        self.assertEqual(stats['tokens_originais'], stats['tokens_enviados'])
+
+    def test_score_agreement(self):
+        """Testa a fração de notas iguais entre duas análises"""
+        a = {'pontuacoes': {'Python': 5, 'Kubernetes': 4, 'Certificação AWS': 1}}
+        b = {'pontuacoes': {'Python': 5, 'Kubernetes': 3, 'Certificação AWS': 1}}
+        self.assertAlmostEqual(score_agreement(a, b, JOB_PROFILE), 2 / 3)
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_tokens_saved_and_agreement_are_reported(self, mock_analyzer_class):
+        """Testa se a economia de tokens e a concordância com o texto completo são registradas"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [{'pontuacoes': {'Python': 5}, 'resumo': 'Ótima'} for _ in texts]
+        analyzer.calculate_total_score.return_value = 5.0
+
+        test_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(test_dir, "ana.txt"), "w", encoding="utf-8") as f:
+                f.write(CV_LONGO)
+
+            app = TalentScan(use_cache=False, token_budget=60, compression_eval=1)
+            app.document_reader.isolate = False
+            candidates = app.process_candidates(test_dir, JOB_PROFILE)
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(analyzer.analyze_many.call_count, 2)
+        compressed_text = analyzer.analyze_many.call_args_list[0][0][0][0]
+        full_text = analyzer.analyze_many.call_args_list[1][0][0][0]
+        self.assertLessEqual(estimate_tokens(compressed_text), 60)
+        self.assertEqual(full_text, CV_LONGO)
+        self.assertGreater(candidates[0]['tokens_economizados'], 0)
+        self.assertEqual(candidates[0]['concordancia_texto_completo'], 1.0)
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_compression_extracts_the_whole_document(self, _):
+        """Testa se, com compressão, PDFs e DOCX são extraídos sem o orçamento de caracteres"""
+        self.assertIsNone(TalentScan(use_cache=False, token_budget=60).document_reader.char_budget)
+        with patch('document_reader.Config.EXTRACTION_CHAR_BUDGET', 6000):
+            self.assertEqual(TalentScan(use_cache=False, token_budget=0).document_reader.char_budget, 6000)
+
+    def test_profile_change_reuses_scores_of_compressed_cvs(self):
+        """Testa se, com compressão, mudar o perfil reavalia só os atributos novos mesmo com outro texto comprimido"""
+        prompts = []
+
+        async def create(**kwargs):
+            prompt = kwargs['messages'][1]['content']
+            prompts.append(prompt)
+            ids = re.findall(r'^- ([RD]\d+): ', prompt, re.MULTILINE)
+            scores = ", ".join(f'"{attr_id}": 4' for attr_id in ids)
+            response = MagicMock()
+            response.choices[0].message.content = f'{{"pontuacoes": {{{scores}}}, "resumo": "ok"}}'
+            raw_response = MagicMock()
+            raw_response.headers = {}
+            raw_response.parse.return_value = response
+            return raw_response
+
+        client = MagicMock()
+        client.chat.completions.with_raw_response.create = create
+        client_class = MagicMock()
+        client_class.return_value.__aenter__ = AsyncMock(return_value=client)
+        client_class.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        first = {'requeridos': ['Python', 'SQL'], 'desejaveis': []}
+        changed = {'requeridos': ['Python', 'SQL', 'Java', 'Spring'], 'desejaveis': []}
+        doc = {'arquivo': "bruno.txt", 'texto': CV_VARIAS_AREAS, 'contato': {}}
+        # O texto enviado ao modelo muda com o perfil
+        compressor = CVCompressor(token_budget=60)
+        self.assertNotEqual(compressor.compress(CV_VARIAS_AREAS, first)[0], compressor.compress(CV_VARIAS_AREAS, changed)[0])
+
+        test_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+                app = TalentScan(use_cache=False, use_analysis_cache=False, dedup_threshold=0, token_budget=60,
+                                 dead_letter_file=os.path.join(test_dir, "pendentes.jsonl"))
+            app.openai_analyzer.cache = AnalysisCache(os.path.join(test_dir, "analises.db"))
+            with patch('openai_analyzer.AsyncOpenAI', client_class):
+                app._analyze_pairs([(0, dict(doc))], [first])
+                candidate = app._analyze_pairs([(0, dict(doc))], [changed])[0]['candidatos'][0]
+            app.openai_analyzer.cache.close()
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual(re.findall(r'^- ([RD]\d+: .+)$', prompts[1], re.MULTILINE), ["R1: Java", "R2: Spring"])
+        self.assertEqual(candidate['analise']['reavaliados'], ['Java', 'Spring'])
+        self.assertEqual(candidate['analise']['pontuacoes'], {'Python': 4, 'SQL': 4, 'Java': 4, 'Spring': 4})
+
+if __name__ == '__main__':
+    unittest.main()
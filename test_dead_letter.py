@@ -0,0 +1,92 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from dead_letter import DeadLetterQueue
+from openai_analyzer import AnalysisError
+from talent_scan import TalentScan
+
+JOB_PROFILE = {'requeridos': ['Python'], 'desejaveis': []}
+
+class TestDeadLetter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.dead_letter_file = os.path.join(self.test_dir, "pendentes.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_drain_and_commit(self):
+        """Testa se entradas retiradas só são descartadas após o commit"""
+        queue = DeadLetterQueue(self.dead_letter_file)
+        queue.add({'arquivo': 'a.txt', 'texto': 'Python', 'contato': {}}, JOB_PROFILE, "timeout", 3)
+
+        self.assertEqual([e['arquivo'] for e in queue.drain()], ['a.txt'])
+        # Reprocessamento interrompido: a entrada continua disponível
+        self.assertEqual(len(DeadLetterQueue(self.dead_letter_file).load()), 1)
+
+        queue.commit()
+        self.assertEqual(queue.load(), [])
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_failed_analysis_is_replayed(self, mock_analyzer_class):
+        """Testa se falhas vão para a fila e são reprocessadas com --retry-failed"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.calculate_total_score.return_value = 4.0
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [
+            AnalysisError("APIConnectionError: indisponível", 6) if "Bruno" in text else {'pontuacoes': {'Python': 4}, 'resumo': 'ok'}
+            for text in texts
+        ]
+
+        cv_dir = os.path.join(self.test_dir, "cvs")
+        os.makedirs(cv_dir)
+        for name, text in (("ana.txt", "Ana Souza\nPython e Django"), ("bruno.txt", "Bruno Lima\nJava e Spring")):
+            with open(os.path.join(cv_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+
+        app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, dead_letter_file=self.dead_letter_file)
+        app.document_reader.isolate = False
+        candidates = app.process_candidates(cv_dir, JOB_PROFILE)
+
+        self.assertEqual([c['arquivo'] for c in candidates], ["ana.txt"])
+        self.assertEqual(app.analysis_failures[0]['arquivo'], "bruno.txt")
+        pending = app.dead_letter.load()
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(pending[0]['tentativas'], 6)
+        self.assertEqual(pending[0]['perfil'], JOB_PROFILE)
+
+        # A API voltou: o reprocessamento analisa só o currículo pendente
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [{'pontuacoes': {'Python': 4}, 'resumo': 'ok'} for _ in texts]
+        retry_app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, dead_letter_file=self.dead_letter_file)
+        output = os.path.join(self.test_dir, "reprocessado.csv")
+        retry_app.retry_failed(output, 'csv')
+
+        self.assertEqual(analyzer.analyze_many.call_args[0][0], ["Bruno Lima\nJava e Spring"])
+        self.assertTrue(os.path.exists(output))
+        self.assertEqual(retry_app.dead_letter.load(), [])
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_each_retry_report_lists_only_its_failures(self, mock_analyzer_class):
+        """Testa se o relatório de cada perfil reprocessado não repete as falhas dos perfis anteriores"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.calculate_total_score.return_value = 4.0
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [
+            AnalysisError("timeout", 3) if "Bruno" in text else {'pontuacoes': {}, 'resumo': 'ok'}
+            for text in texts
+        ]
+        queue = DeadLetterQueue(self.dead_letter_file)
+        other_profile = {'requeridos': ['Java'], 'desejaveis': []}
+        for name, text, profile in (("ana.txt", "Ana", JOB_PROFILE), ("bruno.txt", "Bruno", JOB_PROFILE),
+                                    ("carla.txt", "Carla", other_profile)):
+            queue.add({'arquivo': name, 'texto': text, 'contato': {}}, profile, "timeout", 3)
+
+        app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, dead_letter_file=self.dead_letter_file)
+        with patch.object(app, '_report_results') as report:
+            app.retry_failed(os.path.join(self.test_dir, "reprocessado.csv"), 'csv')
+
+        failures = [call.kwargs['analysis_failures'] for call in report.call_args_list]
+        self.assertEqual([[f['arquivo'] for f in group] for group in failures], [["bruno.txt"], []])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+import unittest
+import os
+import shutil
+import io
+import tarfile
+import tempfile
+import time
+import zipfile
+from unittest.mock import MagicMock, patch
+from docx import Document
+from document_reader import DocumentReader
+from extraction_cache import ExtractionCache
+
+class PathologicalReader(DocumentReader):
+    """Leitor que simula documentos que travam, estouram memória ou derrubam o processo"""
+    
+    def read_txt(self, file_path):
+        name = os.path.basename(file_path)
+        if name.startswith("trava"):
+            time.sleep(60)
+        elif name.startswith("memoria"):
+            bytearray(4 * 1024 * 1024 * 1024)
+        elif name.startswith("crash"):
+            os._exit(1)
+        return super().read_txt(file_path)
+
+class TestDocumentReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.reader = DocumentReader()
+        
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, filename, content):
+        path = os.path.join(self.test_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_read_directory_parallel_keeps_order(self):
+        """Testa se a leitura paralela mantém a ordem e ignora arquivos vazios"""
+        for i in range(6):
+            self._write(f"cv_{i}.txt", f"Candidato {i}\ncandidato{i}@email.com")
+        self._write("vazio.txt", "")
+        self._write("ignorado.xyz", "Formato não suportado")
+        
+        sequential = self.reader.read_directory(self.test_dir)
+        parallel = self.reader.read_directory(self.test_dir, workers=3)
+        
+        self.assertEqual([d['arquivo'] for d in sequential], [f"cv_{i}.txt" for i in range(6)])
+        self.assertEqual(sequential, parallel)
+        self.assertEqual(self.reader.failed_files, [])
+
+    def test_sanitize_text_removes_non_printable(self):
+        """Testa a sanitização com controles, espaços especiais e caracteres fora do BMP"""
+        dirty = "  João\x00 da\u200b Silva\xa0\n\tPython\U000E0001 🚀\r\n"
+        self.assertEqual(self.reader.sanitize_text(dirty), "João da Silva\n\tPython 🚀")
+        self.assertEqual(self.reader.sanitize_text("  Texto limpo\n"), "Texto limpo")
+
+    def test_extract_contact_info_many(self):
+        """Testa a extração de contatos em lote"""
+        texts = [
+            "Ana Lima\nana.lima@email.com\n(11) 98765-4321",
+            "CURRICULUM VITAE\nBruno Costa\nTelefone 21 3333-4444 bruno@email.com.br",
+            "",
+        ]
+        results = self.reader.extract_contact_info_many(texts)
+        
+        self.assertEqual(results[0], {'nome': 'Ana Lima', 'email': 'ana.lima@email.com', 'telefone': '(11) 98765-4321'})
+        self.assertEqual(results[1], {'nome': 'Bruno Costa', 'email': 'bruno@email.com.br', 'telefone': '21 3333-4444'})
+        self.assertEqual(results[2], {'nome': None, 'email': None, 'telefone': None})
+
+    def test_iter_directory_is_lazy(self):
+        """Testa se os documentos são extraídos sob demanda"""
+        for i in range(3):
+            self._write(f"cv_{i}.txt", f"Candidato {i}")
+        
+        with patch.object(DocumentReader, 'read_txt', side_effect=lambda path: "Texto") as read_txt:
+            documents = self.reader.iter_directory(self.test_dir)
+            self.assertEqual(read_txt.call_count, 0)
+            
+            first = next(documents)
+            self.assertEqual(first['arquivo'], "cv_0.txt")
+            self.assertEqual(read_txt.call_count, 1)
+            
+            self.assertEqual(len(list(documents)), 2)
+
+    @patch('document_reader.PyPDF2.PdfReader')
+    def test_read_pdf_stops_at_char_budget(self, mock_pdf_reader):
+        """Testa se a extração de PDF para ao atingir o orçamento de caracteres"""
+        pages = [MagicMock() for _ in range(40)]
+        for page in pages:
+            page.extract_text.return_value = "x" * 1000
+        mock_pdf_reader.return_value.is_encrypted = False
+        mock_pdf_reader.return_value.pages = pages
+        path = self._write("portfolio.pdf", "%PDF")
+        
+        reader = DocumentReader()
+        reader.char_budget = 2500
+        text = reader.read_pdf(path)
+        self.assertEqual(sum(p.extract_text.call_count for p in pages), 3)
+        self.assertEqual(len(text), 3002)
+        
+        full_reader = DocumentReader(full_text=True)
+        self.assertEqual(len(full_reader.read_pdf(path)), 40 * 1001 - 1)
+        self.assertNotEqual(reader.cache_version(), full_reader.cache_version())
+
+    def test_read_docx_includes_tables_and_headers(self):
+        """Testa a leitura direta do DOCX com cabeçalho e tabela"""
+        doc = Document()
+        doc.sections[0].header.paragraphs[0].text = "Carla Mendes - carla@email.com"
+        doc.add_paragraph("Experiência com Python")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Docker"
+        table.cell(0, 1).text = "Kubernetes"
+        path = os.path.join(self.test_dir, "cv.docx")
+        doc.save(path)
+        
+        text = self.reader.read_docx(path)
+        self.assertTrue(text.startswith("Carla Mendes - carla@email.com"))
+        for expected in ("Experiência com Python", "Docker", "Kubernetes"):
+            self.assertIn(expected, text)
+
+    def test_read_docx_text_box_not_duplicated(self):
+        """Testa se caixas de texto com fallback VML são lidas uma única vez"""
+        w = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+        mc = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+        box = '<w:txbxContent><w:p><w:r><w:t>Caixa de texto</w:t></w:r></w:p></w:txbxContent>'
+        xml = (
+            f'<w:document xmlns:w="{w}" xmlns:mc="{mc}"><w:body>'
+            f'<w:p><w:r><w:t>Antes</w:t><w:tab/><w:t>depois</w:t></w:r>'
+            f'<w:r><mc:AlternateContent><mc:Choice>{box}</mc:Choice>'
+            f'<mc:Fallback>{box}</mc:Fallback></mc:AlternateContent></w:r></w:p>'
+            f'</w:body></w:document>'
+        )
+        path = os.path.join(self.test_dir, "caixa.docx")
+        with zipfile.ZipFile(path, 'w') as package:
+            package.writestr('word/document.xml', xml)
+        
+        self.assertEqual(self.reader.read_docx(path), "Caixa de texto\nAntes\tdepois")
+
+    def _write_archive(self):
+        """Cria um .zip com um .tar.gz aninhado, um arquivo grande e um formato ignorado"""
+        nested = io.BytesIO()
+        with tarfile.open(fileobj=nested, mode='w:gz') as tar:
+            data = "Daniel Rocha\ndaniel@email.com".encode('utf-8')
+            info = tarfile.TarInfo("lote2/daniel.txt")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        
+        path = os.path.join(self.test_dir, "candidaturas.zip")
+        with zipfile.ZipFile(path, 'w') as package:
+            package.writestr("ana.txt", "Ana Lima\nana@email.com")
+            package.writestr("lote2.tar.gz", nested.getvalue())
+            package.writestr("grande.txt", "x" * 5000)
+            package.writestr("foto.jpg", b"\xff\xd8")
+        return path
+
+    def test_read_archive_in_memory(self):
+        """Testa a leitura de currículos dentro de arquivos compactados aninhados"""
+        path = self._write_archive()
+        self.reader.archive_max_member_bytes = 1024
+        
+        documents = self.reader.read_directory(path)
+        self.assertEqual(
+            [d['arquivo'] for d in documents],
+            ["candidaturas.zip/ana.txt", "candidaturas.zip/lote2.tar.gz/lote2/daniel.txt"]
+        )
+        self.assertEqual(documents[1]['contato']['email'], "daniel@email.com")
+        self.assertEqual(documents[0]['caminho'], os.path.join(self.test_dir, "candidaturas.zip/ana.txt"))
+        self.assertEqual([f['arquivo'] for f in self.reader.failed_files], ["candidaturas.zip/grande.txt"])
+        
+        self.assertEqual(self.reader.read_directory(path, workers=2), documents)
+        self.assertEqual(os.listdir(self.test_dir), ["candidaturas.zip"])
+
+    def test_isolated_extraction_skips_pathological_files(self):
+        """Testa se arquivos que travam, estouram memória ou derrubam o worker são ignorados"""
+        for name in ("a_ok.txt", "crash.txt", "memoria.txt", "trava.txt", "z_ok.txt"):
+            self._write(name, f"Conteúdo de {name}")
+        
+        reader = PathologicalReader(isolate=True, timeout=2, max_memory_mb=256)
+        start = time.monotonic()
+        documents = reader.read_directory(self.test_dir)
+        
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertEqual([d['arquivo'] for d in documents], ["a_ok.txt", "z_ok.txt"])
+        failures = {f['arquivo']: f['erro'] for f in reader.failed_files}
+        self.assertEqual(sorted(failures), ["crash.txt", "memoria.txt", "trava.txt"])
+        self.assertIn("tempo limite", failures["trava.txt"])
+        self.assertIn("memória", failures["memoria.txt"])
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_isolation_follows_extraction_limits(self, _):
+        """Testa se a extração só é isolada com limite de tempo ou memória, salvo quando desativada"""
+        from talent_scan import TalentScan
+        self.assertTrue(TalentScan(use_cache=False, extraction_timeout=30, extraction_memory_mb=0).document_reader.isolate)
+        self.assertFalse(TalentScan(use_cache=False, extraction_timeout=0, extraction_memory_mb=0).document_reader.isolate)
+        self.assertFalse(TalentScan(use_cache=False, isolate_extraction=False).document_reader.isolate)
+
+    def test_extraction_cache_skips_parsing(self):
+        """Testa se o cache evita uma nova extração de arquivos inalterados"""
+        path = self._write("cv.txt", "Maria Souza\nmaria@email.com\n(21) 98888-7777")
+        cache = ExtractionCache(os.path.join(self.test_dir, "cache", "extracao.db"))
+        reader = DocumentReader(cache=cache)
+        
+        first = reader.read_document(path)
+        with patch.object(DocumentReader, 'read_txt', side_effect=AssertionError("não deveria extrair")):
+            second = reader.read_document(path)
+        
+        self.assertEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        
+        # Conteúdo alterado gera uma nova chave
+        self._write("cv.txt", "Outro Candidato\noutro@email.com")
+        third = reader.read_document(path)
+        self.assertEqual(third['contato']['email'], "outro@email.com")
+        cache.close()
+
+    def test_extraction_cache_lru_eviction(self):
+        """Testa a remoção LRU quando o cache excede o limite de tamanho"""
+        cache = ExtractionCache(os.path.join(self.test_dir, "extracao.db"), max_size_mb=0)
+        cache.max_size_bytes = 250
+        
+        for i in range(3):
+            cache.put(f"hash{i}", "1", "x" * 100, {'nome': None})
+        
+        self.assertIsNone(cache.get("hash0", "1"))
+        self.assertIsNotNone(cache.get("hash2", "1"))
+        cache.close()
+
+    def test_extraction_cache_batches_access_updates(self):
+        """Testa se os acessos ficam em memória até o flush e ainda contam na ordem LRU"""
+        cache = ExtractionCache(os.path.join(self.test_dir, "extracao.db"), max_size_mb=0)
+        cache.max_size_bytes = 250
+        cache.put("hash0", "1", "x" * 100, {'nome': None})
+        cache.put("hash1", "1", "x" * 100, {'nome': None})
+        query = "SELECT ultimo_acesso FROM extracoes WHERE chave = 'hash0:1'"
+        stored = cache._connect().execute(query).fetchone()[0]
+        
+        self.assertIsNotNone(cache.get("hash0", "1"))
+        self.assertEqual(cache._connect().execute(query).fetchone()[0], stored)
+        
+        cache.put("hash2", "1", "x" * 100, {'nome': None})
+        self.assertIsNotNone(cache.get("hash0", "1"))
+        self.assertIsNone(cache.get("hash1", "1"))
+        cache.flush()
+        self.assertGreater(cache._connect().execute(query).fetchone()[0], stored)
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
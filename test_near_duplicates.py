@@ -0,0 +1,56 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from near_duplicates import NearDuplicateIndex
+from talent_scan import TalentScan
+
+CV_BASE = (
+    "Maria Oliveira\nmaria@email.com\n(11) 91234-5678\n"
+    "Desenvolvedora Python com 6 anos de experiência em Django, Flask e FastAPI. "
+    "Atuou com PostgreSQL, Redis, Docker e Kubernetes em projetos de grande escala. "
+    "Experiência com AWS (EC2, S3, Lambda), CI/CD com GitHub Actions e testes automatizados com pytest. "
+    "Liderou equipe de quatro pessoas utilizando Scrum. Inglês avançado. "
+    "Formação em Ciência da Computação pela Universidade Federal. Certificação AWS Solutions Architect."
+)
+
+class TestNearDuplicates(unittest.TestCase):
+    def test_edited_copy_is_detected(self):
+        """Testa se uma versão levemente editada é reconhecida como duplicata"""
+        index = NearDuplicateIndex(threshold=0.7)
+        edited = CV_BASE.replace("6 anos", "7 anos") + " Disponível para início imediato."
+        other = "João Souza\nAnalista contábil com experiência em SAP, conciliação bancária e fechamento fiscal."
+        
+        self.assertIsNone(index.find_or_add("original", CV_BASE))
+        self.assertEqual(index.find_or_add("editado", edited), "original")
+        self.assertIsNone(index.find_or_add("outro", other))
+        self.assertIsNone(index.find_or_add("vazio", ""))
+        self.assertEqual(len(index), 2)
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_duplicates_are_scored_once(self, mock_analyzer_class):
+        """Testa se a análise do representante é reaproveitada pelas duplicatas"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [{'pontuacoes': {'Python': 5}, 'resumo': 'Ótima'} for _ in texts]
+        analyzer.calculate_total_score.return_value = 5.0
+        
+        test_dir = tempfile.mkdtemp()
+        try:
+            for name, text in (("a.txt", CV_BASE), ("b.txt", CV_BASE + " Atualizado em 2024.")):
+                with open(os.path.join(test_dir, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+            
+            app = TalentScan(use_cache=False, dedup_threshold=0.7)
+            app.document_reader.isolate = False
+            candidates = app.process_candidates(test_dir, {'requeridos': ['Python'], 'desejaveis': []})
+        finally:
+            shutil.rmtree(test_dir)
+        
+        self.assertEqual(len(analyzer.analyze_many.call_args_list[0][0][0]), 1)
+        self.assertEqual([c['pontuacao_total'] for c in candidates], [5.0, 5.0])
+        self.assertNotIn('duplicata_de', candidates[0])
+        self.assertEqual(candidates[1]['duplicata_de'], "a.txt")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,507 @@
+import unittest
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import httpx2
+from unittest.mock import AsyncMock, MagicMock, patch
+from openai import RateLimitError
+from analysis_cache import AnalysisCache
+from config import Config
+from mock_openai_server import latency_distribution
+from openai_analyzer import (
+    OpenAIAnalyzer, AnalysisError, AnalyzerBackend, RateLimiter, RetryPolicy, compile_job_profile,
+    create_analyzer_backend, parse_reset_duration
+)
+
+JOB_PROFILE = {'requeridos': ['Python'], 'desejaveis': ['Docker']}
+
+def fake_response(content, headers=None):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    raw_response = MagicMock()
+    raw_response.headers = headers or {}
+    raw_response.parse.return_value = response
+    return raw_response
+
+def rate_limit_error(retry_after):
+    request = httpx2.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    response = httpx2.Response(429, headers={'retry-after': retry_after}, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+class TestAnalyzeMany(unittest.TestCase):
+    def setUp(self):
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            self.analyzer = OpenAIAnalyzer()
+        self.analyzer.retry_policy.base_delay = 0.01
+
+    def _patch_async_client(self, create):
+        client = MagicMock()
+        client.chat.completions.with_raw_response.create = create
+        client_class = MagicMock()
+        client_class.return_value.__aenter__ = AsyncMock(return_value=client)
+        client_class.return_value.__aexit__ = AsyncMock(return_value=False)
+        return patch('openai_analyzer.AsyncOpenAI', client_class)
+
+    def test_results_keep_input_order_with_bounded_concurrency(self):
+        """Testa se os resultados voltam na ordem de entrada sem exceder a concorrência"""
+        state = {'ativas': 0, 'pico': 0}
+
+        async def create(**kwargs):
+            nota = int(kwargs['messages'][1]['content'].split("CV-")[1][0])
+            state['ativas'] += 1
+            state['pico'] = max(state['pico'], state['ativas'])
+            # Respostas mais rápidas para os últimos currículos
+            await asyncio.sleep(0.01 * (6 - nota))
+            state['ativas'] -= 1
+            return fake_response(f'{{"pontuacoes": {{"Python": {nota}, "Docker": 1}}, "resumo": "ok"}}')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many([f"CV-{n}" for n in range(1, 6)], JOB_PROFILE, concurrency=2)
+
+        self.assertEqual([r['pontuacoes']['Python'] for r in results], [1, 2, 3, 4, 5])
+        self.assertEqual(state['pico'], 2)
+
+    def test_failures_are_isolated(self):
+        """Testa se a falha de um currículo não afeta os demais"""
+        async def create(**kwargs):
+            if "falha" in kwargs['messages'][1]['content']:
+                raise RuntimeError("conexão perdida")
+            return fake_response('{"pontuacoes": {"Python": 5, "Docker": 4}, "resumo": "ok"}')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many(["bom", "falha", "bom"], JOB_PROFILE, concurrency=3)
+
+        self.assertEqual(results[0]['pontuacoes']['Python'], 5)
+        self.assertIsInstance(results[1], AnalysisError)
+        self.assertIn("conexão perdida", str(results[1]))
+        self.assertEqual(results[2]['pontuacoes']['Python'], 5)
+
+    def test_many_profiles_share_concurrency(self):
+        """Testa se os perfis são analisados juntos, sem exceder a concorrência compartilhada"""
+        state = {'ativas': 0, 'pico': 0}
+        go_profile = {'requeridos': ['Go'], 'desejaveis': []}
+
+        async def create(**kwargs):
+            content = kwargs['messages'][1]['content']
+            state['ativas'] += 1
+            state['pico'] = max(state['pico'], state['ativas'])
+            await asyncio.sleep(0.01)
+            state['ativas'] -= 1
+            if "GO-" in content:
+                return fake_response('{"pontuacoes": {"Go": 3}, "resumo": "go"}')
+            return fake_response('{"pontuacoes": {"Python": 5, "Docker": 4}, "resumo": "python"}')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many_profiles(
+                [(["PY-1", "PY-2", "PY-3"], JOB_PROFILE), (["GO-1"], go_profile), ([], go_profile)], concurrency=3
+            )
+
+        self.assertEqual([[r['resumo'] for r in group] for group in results], [["python"] * 3, ["go"], []])
+        self.assertEqual(results[1][0]['pontuacoes'], {'Go': 3})
+        self.assertEqual(state['pico'], 3)
+
+    def test_cascade_escalates_only_ambiguous_candidates(self):
+        """Testa se apenas candidatos perto do corte são reanalisados pelo modelo mais forte"""
+        notas = {'fraco': 1, 'duvida': 2, 'forte': 5}
+        calls = []
+
+        async def create(**kwargs):
+            calls.append(kwargs['model'])
+            if kwargs['model'] == 'gpt-4o':
+                return fake_response('{"pontuacoes": {"Python": 1, "Docker": 1}, "resumo": "revisado"}')
+            nota = next(n for nome, n in notas.items() if nome in kwargs['messages'][1]['content'])
+            return fake_response(f'{{"pontuacoes": {{"Python": {nota}, "Docker": {nota}}}, "resumo": "ok"}}')
+
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            analyzer = OpenAIAnalyzer(model='gpt-3.5-turbo', cascade_model='gpt-4o', cascade_band=0.5)
+        with self._patch_async_client(create), patch('openai_analyzer.Config.MIN_SCORE_THRESHOLD', 2.0):
+            results = analyzer.analyze_many(["fraco", "duvida", "forte"], JOB_PROFILE)
+
+        self.assertEqual(calls.count('gpt-4o'), 1)
+        self.assertEqual([r['resumo'] for r in results], ["ok", "revisado", "ok"])
+        stats = analyzer.cascade_stats
+        self.assertEqual((stats['analisados'], stats['escalados'], stats['decisoes_iguais']), (3, 1, 0))
+        self.assertEqual(stats['diferenca'], 1.0)
+        self.assertEqual(len(analyzer.escalation.request_latencies), 1)
+
+        # As métricas do modelo da cascata aparecem no log junto com as do primeiro
+        with self.assertLogs('openai_analyzer', level='INFO') as logs:
+            analyzer.log_parse_metrics()
+        self.assertEqual([line.split(':')[2] for line in logs.output],
+                         ["Respostas do modelo gpt-3.5-turbo", "Respostas do modelo gpt-4o"])
+
+    def test_rate_limit_halves_concurrency(self):
+        """Testa se respostas 429 reduzem a concorrência do limitador compartilhado"""
+        calls = {'n': 0}
+
+        async def create(**kwargs):
+            calls['n'] += 1
+            if calls['n'] == 1:
+                raise rate_limit_error('0.01')
+            return fake_response('{"pontuacoes": {"Python": 5, "Docker": 4}, "resumo": "ok"}')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many(["a", "b"], JOB_PROFILE, concurrency=8)
+
+        self.assertEqual(self.analyzer.rate_limiter.rate_limited, 1)
+        self.assertLess(self.analyzer.rate_limiter.concurrency, 8)
+        self.assertEqual(results[0]['pontuacoes']['Python'], 5)
+        self.assertEqual(results[1]['pontuacoes']['Python'], 5)
+
+    def test_permanent_failure_after_retries(self):
+        """Testa se erros transitórios persistentes viram AnalysisError após esgotar as tentativas"""
+        self.analyzer.retry_policy.max_retries = 2
+        calls = {'n': 0}
+
+        async def create(**kwargs):
+            calls['n'] += 1
+            raise rate_limit_error('0')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many(["a"], JOB_PROFILE)
+
+        self.assertEqual(calls['n'], 3)
+        self.assertIsInstance(results[0], AnalysisError)
+        self.assertEqual(results[0].attempts, 3)
+
+    def test_cached_analyses_skip_the_api(self):
+        """Testa se uma reexecução com os mesmos dados não chama a API"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            self.analyzer.cache = AnalysisCache(os.path.join(test_dir, "analises.db"))
+            calls = {'n': 0}
+
+            async def create(**kwargs):
+                calls['n'] += 1
+                return fake_response('{"pontuacoes": {"Python": 4, "Docker": 2}, "resumo": "ok"}')
+
+            with self._patch_async_client(create):
+                first = self.analyzer.analyze_many(["CV A", "CV B"], JOB_PROFILE)
+                second = self.analyzer.analyze_many(["CV A", "CV B"], JOB_PROFILE)
+                # Outro modelo não reaproveita as respostas
+                self.analyzer.model = "gpt-4o-mini"
+                self.analyzer.analyze_many(["CV A"], JOB_PROFILE)
+
+            self.assertEqual(first, second)
+            self.assertEqual(calls['n'], 3)
+            # A segunda execução é atendida pelas notas por atributo; o cache de análises só vê as requisições
+            self.assertEqual((self.analyzer.cache.hits, self.analyzer.cache.misses), (0, 3))
+            self.assertEqual((self.analyzer.cache.score_hits, self.analyzer.cache.score_partial_hits,
+                              self.analyzer.cache.score_misses), (2, 0, 3))
+            self.analyzer.cache.close()
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_profile_change_rescores_only_new_attributes(self):
+        """Testa se, com o perfil alterado, só os atributos novos vão ao modelo e as demais notas são reaproveitadas"""
+        test_dir = tempfile.mkdtemp()
+        try:
+            self.analyzer.cache = AnalysisCache(os.path.join(test_dir, "analises.db"))
+            prompts = []
+
+            async def create(**kwargs):
+                prompt = str(kwargs['messages'])
+                prompts.append(prompt)
+                if "Docker" in prompt:
+                    return fake_response('{"pontuacoes": {"Python": 4, "Docker": 2}, "resumo": "completo"}')
+                return fake_response('{"candidatos": [' + ", ".join(
+                    f'{{"candidato": {n}, "pontuacoes": {{"Kubernetes": 5}}, "resumo": "parcial"}}' for n in (1, 2)
+                ) + ']}')
+
+            changed = {'requeridos': ['Python'], 'desejaveis': ['Kubernetes']}
+            with self._patch_async_client(create):
+                self.analyzer.analyze_many(["CV A", "CV B"], JOB_PROFILE)
+                results = self.analyzer.analyze_many(["CV A", "CV B"], changed, pack_size=2)
+                unchanged = self.analyzer.analyze_many(["CV A"], {'requeridos': ['  Python'], 'desejaveis': []})
+
+            self.assertEqual(len(prompts), 3)
+            self.assertNotIn("Python", prompts[2])
+            self.assertEqual(results[0]['pontuacoes'], {'Python': 4, 'Kubernetes': 5})
+            self.assertEqual((results[0]['resumo'], results[0]['reavaliados']), ("completo", ['Kubernetes']))
+            self.assertEqual(unchanged[0], {'pontuacoes': {'  Python': 4}, 'resumo': "completo"})
+            cache = self.analyzer.cache
+            self.assertEqual((cache.score_hits, cache.score_partial_hits, cache.score_misses), (1, 2, 2))
+            stats = self.analyzer.rescoring_stats
+            self.assertEqual((stats['candidatos'], stats['sem_requisicao'], stats['reavaliados']), (3, 1, {'Kubernetes': 2}))
+            self.analyzer.cache.close()
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_packed_mode_reruns_missing_candidates(self):
+        """Testa se candidatos ausentes na resposta empacotada são reanalisados individualmente"""
+        prompts = []
+
+        async def create(**kwargs):
+            prompt = kwargs['messages'][1]['content']
+            prompts.append(prompt)
+            if "=== CANDIDATO" in prompt:
+                # O candidato 2 não volta e o 3 vem sem notas
+                return fake_response(
+                    '[{"candidato": 1, "pontuacoes": {"Python": 5, "Docker": 1}, "resumo": "a"},'
+                    ' {"candidato": 3, "resumo": "c"},'
+                    ' {"candidato": 4, "pontuacoes": {"Python": 2, "Docker": 2}, "resumo": "d"}]'
+                )
+            return fake_response('{"pontuacoes": {"Python": 3, "Docker": 3}, "resumo": "individual"}')
+
+        with self._patch_async_client(create):
+            results = self.analyzer.analyze_many(["CV A", "CV B", "CV C", "CV D"], JOB_PROFILE, pack_size=4)
+
+        self.assertEqual([r['pontuacoes']['Python'] for r in results], [5, 3, 3, 2])
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual(prompts[0].count("=== CANDIDATO"), 4)
+        stats = self.analyzer.packing_stats
+        self.assertEqual((stats['requisicoes'], stats['candidatos'], stats['reanalisados']), (1, 4, 2))
+        self.assertLess(stats['tokens_prompt'], stats['tokens_prompt_individual'])
+
+    def test_packing_size_fits_context_window(self):
+        """Testa se o tamanho automático do grupo respeita a janela de contexto e o limite configurado"""
+        with patch('openai_analyzer.Config.MODEL_CONTEXT_TOKENS', 4000), patch('openai_analyzer.Config.PACK_MAX_SIZE', 50):
+            short = self.analyzer.packing_size(["x" * 400] * 10, JOB_PROFILE, max_length=0)
+            long = self.analyzer.packing_size(["x" * 4000] * 10, JOB_PROFILE, max_length=0)
+            single = self.analyzer.packing_size(["x" * 40000], JOB_PROFILE, max_length=0)
+
+        self.assertGreater(short, long)
+        self.assertGreaterEqual(long, 1)
+        self.assertEqual(single, 1)
+        with patch('openai_analyzer.Config.PACK_MAX_SIZE', 3):
+            self.assertEqual(self.analyzer.packing_size(["x" * 40] * 10, JOB_PROFILE), 3)
+
+class TestCompiledProfile(unittest.TestCase):
+    def setUp(self):
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            self.analyzer = OpenAIAnalyzer()
+        self.profile = {'requeridos': ['Experiência com Python em produção', 'Inglês fluente'], 'desejaveis': ['Docker']}
+
+    def test_prompt_and_response_use_ids(self):
+        """Testa se o prompt lista os atributos por identificador e a resposta é convertida para os nomes"""
+        self.assertEqual(compile_job_profile(self.profile),
+                         {'R1': 'Experiência com Python em produção', 'R2': 'Inglês fluente', 'D1': 'Docker'})
+
+        prompt = self.analyzer._build_messages("CV", self.profile, 3000)[1]['content']
+        self.assertIn("- R1: Experiência com Python em produção", prompt)
+        self.assertIn("- D1: Docker", prompt)
+
+        analysis = self.analyzer._parse_response(
+            '{"pontuacoes": {"R1": 5, "r2": 3, "D1": 2}, "resumo": "ok"}', self.profile
+        )
+        self.assertEqual(analysis['pontuacoes'],
+                         {'Experiência com Python em produção': 5, 'Inglês fluente': 3, 'Docker': 2})
+        self.assertEqual(self.analyzer.calculate_total_score(analysis, self.profile), 3.6)
+
+    def test_max_tokens_follow_attribute_count(self):
+        """Testa se o limite de tokens da resposta acompanha o número de atributos"""
+        small = self.analyzer.batch_request("CV", JOB_PROFILE)['max_tokens']
+        large = self.analyzer.batch_request("CV", {'requeridos': [f"Atributo {n}" for n in range(20)], 'desejaveis': []})['max_tokens']
+        self.assertLess(small, large)
+        self.assertLess(large, 1000)
+
+class TestResponseValidation(unittest.TestCase):
+    def setUp(self):
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            self.analyzer = OpenAIAnalyzer()
+
+    def test_scores_are_clamped(self):
+        """Testa se as notas são convertidas em inteiros de 1 a 5"""
+        analysis = self.analyzer._parse_response('```json\n{"pontuacoes": {"R1": 7, "D1": "0.4"}, "resumo": "ok"}\n```', JOB_PROFILE)
+        self.assertEqual(analysis, {'pontuacoes': {'Python': 5, 'Docker': 1}, 'resumo': 'ok'})
+        self.assertEqual(self.analyzer.parse_stats['respostas'], 1)
+        self.assertEqual(self.analyzer.parse_stats['falhas'], 0)
+
+    def test_invalid_responses(self):
+        """Testa se chaves desconhecidas invalidam a resposta, com ou sem saída estruturada"""
+        invalid = '{"pontuacoes": {"R1": 4, "D1": 2, "R9": 5}, "resumo": "ok"}'
+
+        self.analyzer.structured_output = True
+        with self.assertRaises(AnalysisError):
+            self.analyzer._parse_response(invalid, JOB_PROFILE)
+
+        self.analyzer.structured_output = False
+        for response in (invalid, '"R1": 9, "D1" - 0', 'Resumo: não sei avaliar'):
+            with self.assertRaises(AnalysisError):
+                self.analyzer._parse_response(response, JOB_PROFILE)
+        with self.assertRaises(ValueError):
+            self.analyzer._validate_analysis({'pontuacoes': {'R1': 4}, 'resumo': 'sem D1'}, compile_job_profile(JOB_PROFILE))
+        self.assertEqual(self.analyzer.parse_stats['falhas'], 4)
+
+    def test_structured_output_follows_model(self):
+        """Testa se o JSON Schema só é pedido a modelos com saída estruturada e o modo JSON aos demais"""
+        self.assertEqual(self.analyzer.batch_request("CV", JOB_PROFILE)['response_format'], {'type': 'json_object'})
+
+        self.analyzer.model = "gpt-4o-mini"
+        response_format = self.analyzer.batch_request("CV", JOB_PROFILE)['response_format']
+        schema = response_format['json_schema']['schema']
+        self.assertTrue(response_format['json_schema']['strict'])
+        self.assertEqual(schema['properties']['pontuacoes']['required'], ['R1', 'D1'])
+        self.assertFalse(schema['properties']['pontuacoes']['additionalProperties'])
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_key_normalizes_profile(self):
+        """Testa se a ordem e os espaços dos atributos não mudam a chave"""
+        key = AnalysisCache.make_key("cv", {'requeridos': ['Python', 'SQL'], 'desejaveis': []}, "m", 0.3, 1000, "1")
+        same = AnalysisCache.make_key("cv", {'requeridos': ['SQL ', ' Python'], 'desejaveis': []}, "m", 0.3, 1000, "1")
+        other = AnalysisCache.make_key("cv", {'requeridos': ['Python', 'SQL'], 'desejaveis': []}, "m", 0.3, 1000, "2")
+        self.assertEqual(key, same)
+        self.assertNotEqual(key, other)
+
+    def test_ttl_and_size_eviction(self):
+        """Testa a expiração por TTL e a remoção LRU ao exceder o tamanho"""
+        cache = AnalysisCache(os.path.join(self.test_dir, "analises.db"), max_size_mb=1, ttl_hours=1)
+        cache.put("velha", {'resumo': 'x'})
+        cache._connect().execute("UPDATE analises SET criado_em = ?", (time.time() - 7200,))
+        self.assertIsNone(cache.get("velha"))
+
+        cache.max_size_bytes = 250
+        for n in range(5):
+            cache.put(f"k{n}", {'resumo': 'y' * 80})
+        self.assertIsNone(cache.get("k0"))
+        self.assertIsNotNone(cache.get("k4"))
+        self.assertLessEqual(cache._total_size, 250)
+        cache.close()
+
+    def test_scores_share_size_limit_and_ttl(self):
+        """Testa se as notas por atributo contam no tamanho, saem por LRU junto com as análises e expiram a cada gravação"""
+        cache = AnalysisCache(os.path.join(self.test_dir, "analises.db"), max_size_mb=1, ttl_hours=1)
+        cache.put_scores("velho", {'pontuacoes': {'Python': 3}, 'resumo': 'x'})
+        cache._connect().execute("UPDATE notas_atributos SET criado_em = ?", (time.time() - 7200,))
+        cache.put_scores("novo", {'pontuacoes': {'Python': 4}, 'resumo': 'y' * 80})
+        self.assertEqual(cache._connect().execute("SELECT COUNT(*) FROM notas_atributos").fetchone()[0], 1)
+        self.assertEqual(cache._total_size, cache._stored_size(cache._connect()))
+
+        self.assertEqual(cache.get_scores("novo", ['Python', 'Docker']), {'Python': (4, 'y' * 80)})
+        self.assertEqual(cache.get_scores("novo", [' Python']), {' Python': (4, 'y' * 80)})
+        self.assertEqual(cache.get_scores("outro", ['Python']), {})
+        self.assertEqual((cache.score_hits, cache.score_partial_hits, cache.score_misses), (1, 1, 1))
+
+        cache.max_size_bytes = cache._total_size + 100
+        cache.put("k0", {'resumo': 'z' * 80})
+        cache.get_scores("novo", ['Python'])
+        cache.put("k1", {'resumo': 'z' * 80})
+        self.assertIsNone(cache.get("k0"))
+        self.assertIn('Python', cache.get_scores("novo", ['Python']))
+        self.assertLessEqual(cache._total_size, cache.max_size_bytes)
+        self.assertEqual(cache._total_size, cache._stored_size(cache._connect()))
+        cache.close()
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_only_transient_errors_are_retried(self):
+        """Testa a classificação de erros transitórios"""
+        policy = RetryPolicy(max_retries=3)
+        self.assertTrue(policy.should_retry(rate_limit_error('1'), 1))
+        self.assertFalse(policy.should_retry(rate_limit_error('1'), 4))
+        self.assertFalse(policy.should_retry(ValueError("JSON inválido"), 1))
+
+    def test_retry_budget(self):
+        """Testa se o orçamento limita o total de novas tentativas"""
+        policy = RetryPolicy(max_retries=10, budget_ratio=0.5, min_budget=1)
+        policy.requests = 4
+        allowed = sum(policy.should_retry(rate_limit_error('1'), 1) for _ in range(10))
+        self.assertEqual(allowed, 3)
+
+    def test_delay_respects_retry_after(self):
+        """Testa se o backoff nunca é menor que o retry-after e respeita o teto"""
+        policy = RetryPolicy(base_delay=0.01, max_delay=30)
+        self.assertGreaterEqual(policy.next_delay(rate_limit_error('2'), 1), 2)
+        self.assertLessEqual(policy.next_delay(rate_limit_error('120'), 1), 30)
+
+class TestRateLimiter(unittest.TestCase):
+    def test_parse_reset_duration(self):
+        """Testa a leitura dos formatos de duração usados nos cabeçalhos"""
+        self.assertAlmostEqual(parse_reset_duration("20ms"), 0.02)
+        self.assertAlmostEqual(parse_reset_duration("6m0s"), 360)
+        self.assertAlmostEqual(parse_reset_duration("1.5"), 1.5)
+        self.assertEqual(parse_reset_duration(None), 0)
+
+    def test_aimd(self):
+        """Testa aumento aditivo após sucessos e redução multiplicativa após 429"""
+        limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=8)
+        limiter.concurrency = 4.0
+        for _ in range(4):
+            limiter.release(100)
+        self.assertGreater(limiter.concurrency, 4.9)
+
+        limiter.release(100, headers={'retry-after': '0'}, rate_limited=True)
+        self.assertLess(limiter.concurrency, 2.6)
+
+    def test_token_budget_blocks_until_refill(self):
+        """Testa se o TPM aprendido pelos cabeçalhos segura novas requisições"""
+        limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=8)
+        self.assertEqual(limiter._reserve(500), 0)
+        limiter.release(500, headers={
+            'x-ratelimit-limit-requests': '60',
+            'x-ratelimit-limit-tokens': '1000',
+            'x-ratelimit-remaining-requests': '59',
+            'x-ratelimit-remaining-tokens': '300',
+        })
+        self.assertEqual((limiter.rpm, limiter.tpm), (60, 1000))
+
+        # Restam ~300 tokens: uma requisição de 500 precisa esperar ~12s de reposição
+        wait = limiter._reserve(500)
+        self.assertGreater(wait, 10)
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual(limiter._reserve(200), 0)
+
+class TestBackends(unittest.TestCase):
+    def test_model_settings_come_from_config(self):
+        """Testa se modelo, temperatura e teto de tokens vêm de OPENAI_MODEL, OPENAI_TEMPERATURE e OPENAI_MAX_TOKENS"""
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}), \
+             patch.object(Config, 'OPENAI_MODEL', 'gpt-4o-mini'), \
+             patch.object(Config, 'OPENAI_TEMPERATURE', 0.0), \
+             patch.object(Config, 'OPENAI_MAX_TOKENS', 160):
+            params = OpenAIAnalyzer().batch_request("CV", JOB_PROFILE)
+
+        self.assertEqual((params['model'], params['temperature'], params['max_tokens']), ('gpt-4o-mini', 0.0, 160))
+        self.assertEqual(params['response_format']['type'], 'json_schema')
+
+    def test_reasoning_models_get_completion_tokens_without_temperature(self):
+        """Testa se modelos de raciocínio recebem max_completion_tokens e nenhuma temperatura"""
+        with patch.dict(os.environ, {'OPENAI_API_KEY': 'sk-test'}):
+            for model in ('gpt-5-mini', 'o3', 'o4-mini'):
+                params = OpenAIAnalyzer(model=model).batch_request("CV", JOB_PROFILE)
+                self.assertNotIn('max_tokens', params)
+                self.assertNotIn('temperature', params)
+                self.assertGreater(params['max_completion_tokens'], 0)
+
+    def test_backend_interface_is_abstract(self):
+        """Testa se backends sem os clientes síncrono e assíncrono não podem ser criados"""
+        class SyncOnly(AnalyzerBackend):
+            def client(self):
+                return MagicMock()
+
+        with self.assertRaises(TypeError):
+            SyncOnly()
+
+    def test_latency_distribution(self):
+        """Testa se as latências do servidor local são reproduzíveis pela semente e se especificações inválidas são recusadas"""
+        self.assertEqual(latency_distribution('fixed:5')(), 0.005)
+        first, second = latency_distribution('lognormal:800,0.5', seed=1), latency_distribution('lognormal:800,0.5', seed=1)
+        self.assertEqual([first() for _ in range(5)], [second() for _ in range(5)])
+        self.assertTrue(all(0.1 <= latency_distribution('uniform:100,200')() <= 0.2 for _ in range(20)))
+        with self.assertRaises(ValueError):
+            latency_distribution('normal:800')
+
+    def test_local_backend_with_injected_rate_limits(self):
+        """Testa a análise contra o servidor local com respostas 429: todas concluídas, notas determinísticas"""
+        backend = create_analyzer_backend('local', latency='uniform:1,5', rate_limit_ratio=0.3, retry_after=0.01, seed=7)
+        try:
+            analyzer = OpenAIAnalyzer(backend=backend)
+            analyzer.retry_policy.base_delay = 0.01
+            results = analyzer.analyze_many(["Python e Docker", "Python"] * 5, JOB_PROFILE, concurrency=4)
+        finally:
+            backend.close()
+
+        self.assertEqual([r['pontuacoes'] for r in results[:2]], [{'Python': 5, 'Docker': 5}, {'Python': 5, 'Docker': 1}])
+        self.assertTrue(all(isinstance(r, dict) for r in results))
+        self.assertGreater(backend.server.rate_limited, 0)
+        self.assertEqual(analyzer.rate_limiter.rate_limited, backend.server.rate_limited)
+        self.assertEqual(len(analyzer.request_latencies), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from excel_generator import ExcelGenerator
+from unittest.mock import patch
+from prescreen import BM25Index, attribute_query, select
+from talent_scan import TalentScan, list_profile_files
+
+JOB_PROFILE = {'requeridos': ['Experiência com Python', 'Gestão de projetos'], 'desejaveis': ['Certificação AWS']}
+
+CVS = {
+    "ana.txt": "Ana Lima\nDesenvolvedora Python, gestão de projetos ágeis e certificação AWS.",
+    "bruno.txt": "Bruno Reis\nDesenvolvedor python júnior.",
+    "carla.txt": "Carla Souza\nAnalista contábil com experiência em conciliação bancária.",
+}
+
+class TestPrescreen(unittest.TestCase):
+    def test_bm25_ranks_with_accent_folding(self):
+        """Testa se a pontuação favorece quem cobre mais atributos, ignorando acentos"""
+        index = BM25Index()
+        for text in CVS.values():
+            index.add(text)
+        index.add("GESTAO DE PROJETOS e certificacao aws")
+
+        scores = index.score(attribute_query(JOB_PROFILE))
+        self.assertEqual(len(index), 4)
+        self.assertGreater(scores[0], scores[1])
+        self.assertGreater(scores[1], scores[2])
+        self.assertGreater(scores[3], 0)
+        self.assertTrue(np.all((scores >= 0) & (scores <= 1)))
+
+    def test_select_top_n_and_threshold(self):
+        """Testa a seleção pelos N melhores e pela pontuação mínima, preservando a ordem original"""
+        scores = np.array([0.2, 0.9, 0.5, 0.7])
+        self.assertEqual(select(scores, top_n=2), [1, 3])
+        self.assertEqual(select(scores, threshold=0.5), [1, 2, 3])
+        self.assertEqual(select(scores, top_n=1, threshold=0.95), [])
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_only_top_candidates_are_analyzed(self, mock_analyzer_class):
+        """Testa se apenas os escolhidos chegam ao modelo e se a pontuação vai para o relatório"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [{'pontuacoes': {}, 'resumo': 'ok'} for _ in texts]
+        analyzer.calculate_total_score.return_value = 3.0
+
+        test_dir = tempfile.mkdtemp()
+        try:
+            for name, text in CVS.items():
+                with open(os.path.join(test_dir, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+
+            app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, prescreen_top_n=2)
+            app.document_reader.isolate = False
+            candidates = app.process_candidates(test_dir, JOB_PROFILE)
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(len(analyzer.analyze_many.call_args[0][0]), 2)
+        self.assertEqual([c['arquivo'] for c in candidates], ["ana.txt", "bruno.txt"])
+        self.assertGreater(candidates[0]['pre_triagem'], candidates[1]['pre_triagem'])
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_each_profile_gets_its_own_shortlist_and_report(self, mock_analyzer_class):
+        """Testa se vários perfis compartilham a leitura, têm pré-triagens próprias e geram o relatório de melhor vaga"""
+        profiles = {'python': JOB_PROFILE, 'contabil': {'requeridos': ['Conciliação bancária'], 'desejaveis': []}}
+        analyzer = mock_analyzer_class.return_value
+        analyzer.parse_job_profile.side_effect = lambda text: profiles[text.strip()]
+        analyzer.analyze_many_profiles.side_effect = lambda groups, **kwargs: [
+            [{'pontuacoes': {attr: len(profile['requeridos']) + 2 for attr in profile['requeridos']}, 'resumo': 'ok'} for _ in texts]
+            for texts, profile in groups
+        ]
+
+        test_dir = tempfile.mkdtemp()
+        try:
+            cv_dir = os.path.join(test_dir, "cvs")
+            profile_dir = os.path.join(test_dir, "perfis")
+            os.makedirs(cv_dir)
+            os.makedirs(profile_dir)
+            for name, text in CVS.items():
+                with open(os.path.join(cv_dir, name), "w", encoding="utf-8") as f:
+                    f.write(text)
+            for name in profiles:
+                with open(os.path.join(profile_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+                    f.write(name)
+
+            app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, prescreen_top_n=1)
+            app.document_reader.isolate = False
+            with patch.object(app.document_reader, 'iter_documents', wraps=app.document_reader.iter_documents) as reads:
+                app.run_profiles(cv_dir, list_profile_files([profile_dir]), os.path.join(test_dir, "triagem.csv"), 'csv')
+
+            self.assertEqual(reads.call_count, 1)
+            self.assertEqual(analyzer.analyze_many_profiles.call_count, 1)
+            for name in profiles:
+                self.assertTrue(os.path.exists(os.path.join(test_dir, f"triagem_{name}.csv")))
+            best_fit = pd.read_csv(os.path.join(test_dir, "triagem_melhor_vaga.csv"), sep=';', encoding='utf-8-sig')
+        finally:
+            shutil.rmtree(test_dir)
+
+        self.assertEqual(list(best_fit['Arquivo']), ["ana.txt", "carla.txt"])
+        self.assertEqual(list(best_fit['Melhor Vaga']), ["python", "contabil"])
+        self.assertEqual(list(best_fit['Pontuação Total']), [4.0, 3.0])
+
+    def test_best_fit_keeps_same_named_files_apart(self):
+        """Testa se arquivos de mesmo nome em pastas diferentes são candidatos distintos e se falta de nome usa o arquivo"""
+        python = [{'arquivo': "cv.pdf", 'caminho': "a/cv.pdf", 'contato': {'nome': None}, 'pontuacao_total': 4.0}]
+        contabil = [
+            {'arquivo': "cv.pdf", 'caminho': "a/cv.pdf", 'contato': {'nome': None}, 'pontuacao_total': 2.0},
+            {'arquivo': "cv.pdf", 'caminho': "b.zip/cv.pdf", 'contato': {'nome': "Bruno Reis"}, 'pontuacao_total': 3.0},
+        ]
+        best_fit = ExcelGenerator()._create_best_fit_dataframe(['python', 'contabil'], [python, contabil])
+
+        self.assertEqual(list(best_fit['Nome']), ["cv.pdf", "Bruno Reis"])
+        self.assertEqual(list(best_fit['Melhor Vaga']), ["python", "contabil"])
+        self.assertEqual(list(best_fit['Pontuação - contabil']), [2.0, 3.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from unittest.mock import patch
+from config import Config
+from score_matrix import ScoreMatrix
+
+JOB_PROFILE = {'requeridos': ['Python', 'SQL'], 'desejaveis': ['Docker']}
+
+class TestScoreMatrix(unittest.TestCase):
+    def test_totals_use_configured_weights(self):
+        """Testa se a pontuação total usa REQUIRED_WEIGHT/DESIRED_WEIGHT e ignora atributos sem nota"""
+        analyses = [
+            {'pontuacoes': {'Python': 5, 'SQL': 3, 'Docker': 2}},
+            {'pontuacoes': {'Python': 4}},
+            {'pontuacoes': {}},
+            {'pontuacoes': {'Docker': 9}},
+        ]
+        matrix = ScoreMatrix.from_analyses(analyses, JOB_PROFILE)
+        self.assertEqual(matrix.scores.dtype, np.int8)
+        self.assertEqual(matrix.totals().tolist(), [3.6, 4.0, 0.0, 5.0])
+
+        with patch.object(Config, 'REQUIRED_WEIGHT', 1), patch.object(Config, 'DESIRED_WEIGHT', 3):
+            self.assertEqual(matrix.totals().tolist(), [2.8, 4.0, 0.0, 5.0])
+
+    def test_ranking_under_new_weights(self):
+        """Testa se o ranking muda ao recalcular com outros pesos, mantendo empates na ordem original"""
+        matrix = ScoreMatrix.from_analyses([
+            {'pontuacoes': {'Python': 5, 'SQL': 5, 'Docker': 1}},
+            {'pontuacoes': {'Python': 3, 'SQL': 3, 'Docker': 5}},
+            {'pontuacoes': {'Python': 3, 'SQL': 3, 'Docker': 5}},
+        ], JOB_PROFILE)
+        self.assertEqual(matrix.ranking().tolist(), [0, 1, 2])
+        self.assertEqual(matrix.ranking(required_weight=1, desired_weight=10).tolist(), [1, 2, 0])
+
+    def test_attribute_statistics_match_numpy(self):
+        """Testa médias e percentis por atributo contra o cálculo direto, desconsiderando notas ausentes"""
+        rng = np.random.default_rng(3)
+        scores = rng.integers(0, 6, size=(500, 3)).astype(np.int8)
+        scores[:, 2] = 0
+        matrix = ScoreMatrix(scores, JOB_PROFILE)
+
+        means = matrix.attribute_means()
+        percentiles = matrix.attribute_percentiles((10, 50, 90))
+        for column in range(2):
+            present = scores[scores[:, column] > 0, column]
+            self.assertAlmostEqual(means[column], present.mean())
+            np.testing.assert_array_equal(percentiles[:, column], np.percentile(present, [10, 50, 90], method='inverted_cdf'))
+        self.assertTrue(np.isnan(means[2]))
+        self.assertTrue(np.isnan(percentiles[:, 2]).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -52,7 +52,7 @@ class TestSecurityRobustness(unittest.TestCase):
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
         mock_response = MagicMock()
-        mock_response.choices[0].message.content = '{"pontuacoes": {}, "resumo": "Test"}'
+        mock_response.choices[0].message.content = '{"pontuacoes": {"R1": 3, "D1": 2}, "resumo": "Test"}'
         mock_client.chat.completions.create.return_value = mock_response
         
         # Configurar API key para não falhar no init
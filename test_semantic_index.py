@@ -0,0 +1,99 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from unittest.mock import patch
+from config import Config
+from semantic_index import EmbeddingBackend, HashingEmbedding, VectorIndex, embed_attributes
+from talent_scan import TalentScan
+
+JOB_PROFILE = {'requeridos': ['Desenvolvimento web Python'], 'desejaveis': ['Inglês avançado']}
+
+class SynonymEmbedding(EmbeddingBackend):
+    """Gerador de teste que reconhece "Django" como desenvolvimento web Python"""
+    name = 'sinonimos'
+    dimension = 3
+
+    def embed(self, texts):
+        rows = []
+        for text in texts:
+            text = text.lower()
+            rows.append([
+                1.0 if 'django' in text or 'web python' in text else 0.0,
+                1.0 if 'inglês' in text or 'english' in text else 0.0,
+                0.1
+            ])
+        vectors = np.asarray(rows, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class TestSemanticIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_hashing_embedding_is_deterministic(self):
+        """Testa se o gerador local produz vetores de norma 1, sempre iguais, e mais próximos para textos parecidos"""
+        backend = HashingEmbedding()
+        vectors = backend.embed(["Desenvolvedor Python com Django", "desenvolvedor python e django", "Contador fiscal"])
+        np.testing.assert_array_equal(vectors, backend.embed(["Desenvolvedor Python com Django", "desenvolvedor python e django", "Contador fiscal"]))
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+        self.assertGreater(vectors[0] @ vectors[1], vectors[0] @ vectors[2])
+
+    def test_embedding_interface_is_abstract(self):
+        """Testa se geradores sem embed não podem ser criados"""
+        class Unnamed(EmbeddingBackend):
+            name = 'sem-embed'
+
+        with self.assertRaises(TypeError):
+            Unnamed()
+
+    def test_index_is_persisted_and_memory_mapped(self):
+        """Testa se o índice é reaproveitado entre execuções e descartado ao trocar de modelo"""
+        backend = SynonymEmbedding()
+        index = VectorIndex(backend, self.test_dir)
+        keys = [VectorIndex.document_key(text) for text in ("django", "contabilidade")]
+        index.add(keys[0], ["Projetos em Django", "Fluent English"])
+        index.add(keys[1], ["Contabilidade"])
+        index.close()
+
+        reopened = VectorIndex(backend, self.test_dir)
+        reopened.add(keys[0], ["Projetos em Django"])
+        self.assertEqual((len(reopened), reopened.embedded), (2, 0))
+        self.assertIsInstance(reopened._vectors(), np.memmap)
+
+        scores = reopened.score(keys + ["ausente"], *embed_attributes(backend, JOB_PROFILE))
+        self.assertGreater(scores[0], 0.9)
+        self.assertLess(scores[1], 0.2)
+        self.assertEqual(scores[2], 0)
+        reopened.close()
+
+        self.assertEqual(len(VectorIndex(HashingEmbedding(), self.test_dir)), 0)
+
+    @patch('talent_scan.OpenAIAnalyzer')
+    def test_only_top_k_are_analyzed(self, mock_analyzer_class):
+        """Testa se apenas os K currículos mais próximos chegam ao modelo"""
+        analyzer = mock_analyzer_class.return_value
+        analyzer.analyze_many.side_effect = lambda texts, profile, **kwargs: [{'pontuacoes': {}, 'resumo': 'ok'} for _ in texts]
+        analyzer.calculate_total_score.return_value = 3.0
+
+        cv_dir = os.path.join(self.test_dir, "cvs")
+        os.makedirs(cv_dir)
+        for name, text in (("ana.txt", "Ana\nSistemas em Django e inglês avançado"), ("bia.txt", "Bia\nAnalista contábil")):
+            with open(os.path.join(cv_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+
+        with patch.object(Config, 'SEMANTIC_INDEX_DIR', os.path.join(self.test_dir, "vetores")), \
+             patch('talent_scan.create_backend', return_value=SynonymEmbedding()):
+            app = TalentScan(use_cache=False, dedup_threshold=0, token_budget=0, semantic_top_k=1)
+            app.document_reader.isolate = False
+            candidates = app.process_candidates(cv_dir, JOB_PROFILE)
+
+        self.assertEqual(len(analyzer.analyze_many.call_args[0][0]), 1)
+        self.assertEqual(candidates[0]['arquivo'], "ana.txt")
+        self.assertGreater(candidates[0]['similaridade_semantica'], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
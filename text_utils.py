@@ -0,0 +1,68 @@
+"""
+Funções de normalização e tokenização de texto em português
+"""
+import re
+import unicodedata
+from typing import List
+
+_WORD_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+
+# Palavras muito frequentes que não ajudam a medir relevância (já sem acentos)
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela dele do dos e em entre era essa esse esta este
+eu ela ele elas eles foi for ha isso ja la lhe mais mas me mesmo muito na nas nem
+no nos nossa nosso num numa o os ou para pela pelas pelo pelos por qual quando que
+quem se sem ser seu seus sua suas sao tambem te tem ter um uma umas uns
+anos ano experiencia conhecimento conhecimentos
+the and of in to for with on at by an or
+""".split())
+
+def fold_accents(text: str) -> str:
+    """
+    Remove acentos e converte para minúsculas
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Texto sem acentos, em minúsculas
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def stem(token: str) -> str:
+    """
+    Radical simplificado: trunca palavras longas para casar flexões
+    (ex.: "automatizados" e "automatizacao")
+
+    Termos técnicos com ".", "+" ou "#" (ex.: "node.js", "asp.net") não são truncados.
+
+    Args:
+        token: Palavra normalizada
+
+    Returns:
+        Radical da palavra
+    """
+    if len(token) <= 6 or any(char in token for char in '.+#'):
+        return token
+    return token[:6]
+
+def tokenize(text: str, remove_stopwords: bool = True) -> List[str]:
+    """
+    Quebra o texto em termos normalizados (sem acento, minúsculos, radicalizados)
+
+    Termos técnicos com ".", "+" ou "#", como "c++", "c#" e "node.js", são
+    preservados inteiros. A barra separa termos: "ci/cd" vira "ci" e "cd",
+    tanto no currículo quanto no atributo.
+
+    Args:
+        text: Texto original
+        remove_stopwords: Remove palavras muito frequentes
+
+    Returns:
+        Lista de termos na ordem em que aparecem
+    """
+    tokens = _WORD_RE.findall(fold_accents(text))
+    if remove_stopwords:
+        tokens = [token for token in tokens if token not in STOPWORDS]
+    return [stem(token) for token in tokens]